@@ -1,25 +1,181 @@
-from fastapi import APIRouter, HTTPException, Path, Query
+import asyncio
+import json
+import math
+from collections.abc import AsyncGenerator, AsyncIterator
+
+from fastapi import (
+    APIRouter,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from loguru import logger
 from pyparsing import Any
+from starlette.background import BackgroundTask
 
+from app.core.config import settings
+from app.core.logger_config import hot_logger
+from app.schemas.enum import FINAL_STATUSES, NotificationChannel, NotificationPriority, NotificationStatus
 from app.schemas.notification_schemas import (
+    NotificationBatchResponse,
+    NotificationEvent,
     NotificationRequest,
     NotificationResponse,
 )
-from app.services.notification_service import notification_service
+from app.services.batch_service import batch_service
+from app.services.dispatcher import QueueFullError, notification_dispatcher
+from app.services.event_broker import EventFilters, Subscription, TooManySubscribersError, event_broker
+from app.services.idempotency import IdempotencyConflictError, idempotency_service
+from app.services.notification_service import NotificationNotCancellableError, notification_service
+from app.services.rate_limiter import RateLimitExceededError, rate_limiter
+from app.services.recipient_service import recipient_service
+from app.services.template_service import template_service
+from app.services.webhook_service import tenant_of
+from app.storage.base import HistoryFilters, decode_cursor, encode_cursor
+from app.utils.responses import JSONArrayResponse
 
 router = APIRouter()
 
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/json-seq')
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return ValueError(f'Некорректная строка NDJSON: {e.msg}')
+
+
+async def _read_batch_items(request: Request) -> list[Any]:
+    """Читает элементы пакета из JSON-массива или потока NDJSON"""
+    content_type = request.headers.get('content-type', '')
+    if not content_type.startswith(NDJSON_CONTENT_TYPES):
+        try:
+            items = json.loads(await request.body())
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Некорректный JSON: {e.msg}')
+        if not isinstance(items, list):
+            raise ValueError('Ожидается массив уведомлений')
+        return items
+
+    items = []
+    buffer = b''
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        items.extend(_parse_ndjson_line(line) for line in lines if line.strip())
+        if len(items) > settings.BATCH_MAX_ITEMS:
+            break
+    if buffer.strip():
+        items.append(_parse_ndjson_line(buffer))
+    return items
+
+
+async def _subscribe(filters: EventFilters) -> tuple[Subscription, NotificationEvent | None]:
+    """
+    Подписка на события и текущее состояние уведомления при подписке по ID.
+
+    Состояние читается после подписки, поэтому переход между чтением и подпиской не теряется.
+    """
+    subscription = event_broker.subscribe(filters)
+    if filters.notification_id is None:
+        return subscription, None
+    record = await notification_service.store.get(filters.notification_id)
+    if record is None:
+        event_broker.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail='notification_not_found')
+    return subscription, NotificationEvent.from_history(record)
+
+
+async def _stream_events(
+    subscription: Subscription, initial: NotificationEvent | None
+) -> AsyncGenerator[tuple[str, str] | None]:
+    """
+    Пары (тип, JSON) событий подписки; None - пора отправить keepalive.
+
+    Подписка по ID завершается итоговым статусом уведомления, отключённая за переполнение - событием overflow.
+    """
+    try:
+        if initial is not None:
+            yield initial.type, initial.model_dump_json()
+            if initial.status in FINAL_STATUSES:
+                return
+        while True:
+            try:
+                item = await asyncio.wait_for(subscription.get(), settings.EVENTS_KEEPALIVE_SECONDS)
+            except TimeoutError:
+                yield None
+                continue
+            if item is None:
+                if subscription.overflowed:
+                    yield 'overflow', '{"type":"overflow"}'
+                return
+            event, message = item
+            yield event.type, message
+            if subscription.filters.notification_id is not None and event.status in FINAL_STATUSES:
+                return
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+async def _submit(request: NotificationRequest, api_key: str | None) -> NotificationResponse:
+    delay = await rate_limiter.check(request, api_key)
+    if request.scheduled:
+        return await notification_service.schedule(request)
+    if delay > 0:
+        return await notification_service.defer(request, delay)
+    if settings.DISPATCH_MODE != 'sync':
+        return await notification_dispatcher.submit(request)
+    return await notification_service.send_notification(request)
+
 
 @router.post(
     '/notifications',
     response_model=NotificationResponse,
     summary='Отправить уведомление',
 )
-async def send_notification(request: NotificationRequest) -> NotificationResponse:
+async def send_notification(
+    request: NotificationRequest,
+    response: Response,
+    idempotency_key: str | None = Header(
+        default=None,
+        alias='Idempotency-Key',
+        max_length=255,
+        description='Повтор с тем же ключом не отправляется заново',
+    ),
+    api_key: str | None = Header(
+        default=None, alias='X-API-Key', max_length=255, description='Ключ клиента для лимитов'
+    ),
+) -> NotificationResponse:
     try:
-        logger.info(f'Получен запрос на отправку уведомления: {request.email}')
-        return await notification_service.send_notification(request)
+        hot_logger.info('Получен запрос на отправку уведомления: {}', request.recipient_id or request.email)
+        await recipient_service.apply(request)
+        template_service.apply(request)
+        request.tenant = tenant_of(api_key)
+        result, replayed = await idempotency_service.submit(request, idempotency_key, lambda: _submit(request, api_key))
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        if settings.DISPATCH_MODE != 'sync' or result.status != NotificationStatus.SENT:
+            response.status_code = status.HTTP_202_ACCEPTED
+        return result
+    except RateLimitExceededError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=429, detail=f'rate_limited: {e.limit}', headers={'Retry-After': str(math.ceil(e.retry_after))}
+        )
+    except IdempotencyConflictError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=422, detail='idempotency_key_reused')
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail='queue_full')
     except ValueError as e:
         logger.error(f'Ошибка валидации данных: {e!s}')
         raise HTTPException(status_code=422, detail=str(e))
@@ -28,6 +184,118 @@ async def send_notification(request: NotificationRequest) -> NotificationRespons
         raise HTTPException(status_code=500, detail='internal_error')
 
 
+@router.post(
+    '/notifications/batch',
+    response_model=NotificationBatchResponse,
+    summary='Пакетная отправка уведомлений',
+    openapi_extra={
+        'requestBody': {
+            'content': {
+                'application/json': {
+                    'schema': {'type': 'array', 'items': {'$ref': '#/components/schemas/NotificationRequest'}}
+                },
+                'application/x-ndjson': {'schema': {'type': 'string'}},
+            },
+            'required': True,
+        },
+    },
+)
+async def send_notification_batch(
+    request: Request,
+    response: Response,
+    api_key: str | None = Header(
+        default=None, alias='X-API-Key', max_length=255, description='Ключ клиента для лимитов'
+    ),
+) -> NotificationBatchResponse:
+    try:
+        items = await _read_batch_items(request)
+    except ValueError as e:
+        logger.error(f'Ошибка чтения пакета: {e!s}')
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f'batch_too_large: max {settings.BATCH_MAX_ITEMS}')
+
+    try:
+        logger.info(f'Получен пакет из {len(items)} уведомлений')
+        if settings.DISPATCH_MODE != 'sync':
+            response.status_code = status.HTTP_202_ACCEPTED
+        return await batch_service.send_batch(items, api_key)
+    except Exception as e:
+        logger.error(f'Ошибка пакетной отправки: {e!s}')
+        raise HTTPException(status_code=500, detail='internal_error')
+
+
+@router.get(
+    '/notifications/events',
+    response_class=StreamingResponse,
+    summary='Поток событий статусов (SSE)',
+)
+async def stream_notification_events(
+    notification_id: str | None = Query(default=None, description='ID уведомления'),
+    batch_id: str | None = Query(default=None, description='ID пакета'),
+    status_filter: NotificationStatus | None = Query(default=None, alias='status', description='Статус'),
+    channel: NotificationChannel | None = Query(default=None, description='Канал'),
+    priority: NotificationPriority | None = Query(default=None, description='Приоритет'),
+    api_key: str | None = Header(
+        default=None, alias='X-API-Key', max_length=255, description='Ключ клиента: события только своих уведомлений'
+    ),
+) -> StreamingResponse:
+    filters = EventFilters(tenant_of(api_key), notification_id, batch_id, status_filter, channel, priority)
+    try:
+        subscription, initial = await _subscribe(filters)
+    except TooManySubscribersError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail='too_many_subscribers')
+
+    async def body() -> AsyncIterator[str]:
+        async for item in _stream_events(subscription, initial):
+            yield ': keepalive\n\n' if item is None else f'event: {item[0]}\ndata: {item[1]}\n\n'
+
+    return StreamingResponse(
+        body(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        # Отписка на случай, если клиент отключился до начала потока
+        background=BackgroundTask(event_broker.unsubscribe, subscription),
+    )
+
+
+@router.websocket('/notifications/ws')
+async def notification_events_websocket(
+    websocket: WebSocket,
+    notification_id: str | None = Query(default=None),
+    batch_id: str | None = Query(default=None),
+    status_filter: NotificationStatus | None = Query(default=None, alias='status'),
+    channel: NotificationChannel | None = Query(default=None),
+    priority: NotificationPriority | None = Query(default=None),
+    api_key: str | None = Header(default=None, alias='X-API-Key', max_length=255),
+) -> None:
+    """Поток событий статусов по WebSocket: JSON-сообщения с теми же фильтрами, что у SSE"""
+    filters = EventFilters(tenant_of(api_key), notification_id, batch_id, status_filter, channel, priority)
+    try:
+        subscription, initial = await _subscribe(filters)
+    except TooManySubscribersError as e:
+        logger.warning(str(e))
+        await websocket.close(code=1013, reason='too_many_subscribers')
+        return
+    except HTTPException as e:
+        await websocket.close(code=4404, reason=str(e.detail))
+        return
+
+    stream = _stream_events(subscription, initial)
+    try:
+        await websocket.accept()
+        async for item in stream:
+            await websocket.send_text('{"type":"keepalive"}' if item is None else item[1])
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await stream.aclose()
+        event_broker.unsubscribe(subscription)
+
+
 @router.get(
     '/notifications/{notification_id}',
     response_model=NotificationResponse | None,
@@ -49,6 +317,27 @@ async def get_notification_status(
         raise HTTPException(status_code=500, detail='internal_error')
 
 
+@router.post(
+    '/notifications/{notification_id}/cancel',
+    response_model=NotificationResponse,
+    summary='Отменить отложенное уведомление',
+)
+async def cancel_notification(
+    notification_id: str = Path(..., description='ID уведомления'),
+) -> NotificationResponse:
+    try:
+        response = await notification_service.cancel(notification_id)
+    except NotificationNotCancellableError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=409, detail='not_cancellable')
+    except Exception as e:
+        logger.error(f'Ошибка отмены уведомления: {e!s}')
+        raise HTTPException(status_code=500, detail='internal_error')
+    if response is None:
+        raise HTTPException(status_code=404, detail='notification_not_found')
+    return response
+
+
 @router.get(
     '/notifications',
     response_model=list[NotificationResponse],
@@ -56,13 +345,41 @@ async def get_notification_status(
 )
 async def get_notification_history(
     limit: int = Query(default=50, ge=1, le=1000, description='Количество уведомлений'),
-) -> list[NotificationResponse]:
+    before: str | None = Query(default=None, description='Уведомления старше курсора из X-Next-Cursor'),
+    after: str | None = Query(default=None, description='Уведомления новее курсора из X-Prev-Cursor'),
+    status_filter: NotificationStatus | None = Query(default=None, alias='status', description='Статус'),
+    channel: NotificationChannel | None = Query(default=None, description='Канал из запроса'),
+    priority: NotificationPriority | None = Query(default=None, description='Приоритет'),
+    recipient: str | None = Query(default=None, description='Email, телефон или Telegram ID получателя'),
+) -> JSONArrayResponse:
+    """Страница собирается из готового JSON уведомлений, минуя валидацию и сериализацию по response_model"""
+    if before is not None and after is not None:
+        raise HTTPException(status_code=422, detail='Можно указать только один из курсоров before и after')
     try:
-        return await notification_service.get_notification_history(limit=limit)
+        before_key = decode_cursor(before) if before is not None else None
+        after_key = decode_cursor(after) if after is not None else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    filters = HistoryFilters(status=status_filter, channel=channel, priority=priority, recipient=recipient)
+    try:
+        records = await notification_service.get_notification_history(
+            limit=limit,
+            before=before_key,
+            after=after_key,
+            filters=filters,
+        )
     except Exception as e:
         logger.error(f'Ошибка получения истории уведомлений: {e!s}')
         raise HTTPException(status_code=500, detail='internal_error')
 
+    headers = {}
+    if records:
+        headers['X-Prev-Cursor'] = encode_cursor(records[0].created_at, records[0].id)
+        if len(records) == limit:
+            headers['X-Next-Cursor'] = encode_cursor(records[-1].created_at, records[-1].id)
+    return JSONArrayResponse([notification_service.response_json(record) for record in records], headers=headers)
+
 
 @router.post(
     '/notifications/test',
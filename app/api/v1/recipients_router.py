@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Path, Response, status
+
+from app.schemas.recipient_schemas import RecipientCreate, RecipientResponse
+from app.services.recipient_service import recipient_service
+
+router = APIRouter()
+
+
+@router.post(
+    '/recipients',
+    response_model=RecipientResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary='Зарегистрировать получателя',
+)
+async def create_recipient(recipient: RecipientCreate) -> RecipientResponse:
+    try:
+        return await recipient_service.register(recipient)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.put(
+    '/recipients/{recipient_id}',
+    response_model=RecipientResponse,
+    summary='Зарегистрировать или обновить получателя с заданным ID',
+)
+async def put_recipient(
+    recipient: RecipientCreate,
+    recipient_id: str = Path(..., max_length=255, description='ID получателя'),
+) -> RecipientResponse:
+    try:
+        return await recipient_service.register(recipient, recipient_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@router.get(
+    '/recipients/{recipient_id}',
+    response_model=RecipientResponse,
+    summary='Получить получателя',
+)
+async def get_recipient(recipient_id: str = Path(..., description='ID получателя')) -> RecipientResponse:
+    recipient = await recipient_service.get(recipient_id)
+    if recipient is None:
+        raise HTTPException(status_code=404, detail='recipient_not_found')
+    return recipient
+
+
+@router.delete(
+    '/recipients/{recipient_id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='Удалить получателя',
+)
+async def delete_recipient(recipient_id: str = Path(..., description='ID получателя')) -> Response:
+    if not await recipient_service.delete(recipient_id):
+        raise HTTPException(status_code=404, detail='recipient_not_found')
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
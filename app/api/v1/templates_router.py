@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Path, status
+
+from app.schemas.template_schemas import TemplateCreate, TemplateResponse
+from app.services.template_service import template_service
+
+router = APIRouter()
+
+
+@router.post(
+    '/templates',
+    response_model=TemplateResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary='Зарегистрировать шаблон уведомления',
+)
+async def create_template(template: TemplateCreate) -> TemplateResponse:
+    return template_service.register(template)
+
+
+@router.get(
+    '/templates/{template_id}',
+    response_model=TemplateResponse,
+    summary='Получить шаблон уведомления',
+)
+async def get_template(template_id: str = Path(..., description='ID шаблона')) -> TemplateResponse:
+    template = template_service.get(template_id)
+    if template is None:
+        raise HTTPException(status_code=404, detail='template_not_found')
+    return template
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Header, HTTPException, Path, Response, status
+
+from app.schemas.webhook_schemas import WebhookCreate, WebhookCreated, WebhookResponse
+from app.services.webhook_service import WebhookLimitExceededError, tenant_of, webhook_service
+
+router = APIRouter()
+
+
+def _tenant(api_key: str | None) -> str:
+    tenant = tenant_of(api_key)
+    if tenant is None:
+        raise HTTPException(status_code=401, detail='api_key_required')
+    return tenant
+
+
+@router.post(
+    '/webhooks',
+    response_model=WebhookCreated,
+    status_code=status.HTTP_201_CREATED,
+    summary='Подписаться на итоговые статусы уведомлений',
+)
+async def create_webhook(
+    webhook: WebhookCreate,
+    api_key: str | None = Header(default=None, alias='X-API-Key', max_length=255, description='Ключ клиента'),
+) -> WebhookCreated:
+    try:
+        return await webhook_service.register(_tenant(api_key), webhook)
+    except WebhookLimitExceededError as e:
+        raise HTTPException(status_code=409, detail=f'webhook_limit_exceeded: {e!s}')
+
+
+@router.get(
+    '/webhooks',
+    response_model=list[WebhookResponse],
+    summary='Подписки клиента на webhooks',
+)
+async def list_webhooks(
+    api_key: str | None = Header(default=None, alias='X-API-Key', max_length=255, description='Ключ клиента'),
+) -> list[WebhookResponse]:
+    return list(await webhook_service.list_webhooks(_tenant(api_key)))
+
+
+@router.get(
+    '/webhooks/{webhook_id}',
+    response_model=WebhookResponse,
+    summary='Получить подписку на webhook',
+)
+async def get_webhook(
+    webhook_id: str = Path(..., description='ID подписки'),
+    api_key: str | None = Header(default=None, alias='X-API-Key', max_length=255, description='Ключ клиента'),
+) -> WebhookResponse:
+    webhook = await webhook_service.get(_tenant(api_key), webhook_id)
+    if webhook is None:
+        raise HTTPException(status_code=404, detail='webhook_not_found')
+    return webhook
+
+
+@router.delete(
+    '/webhooks/{webhook_id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary='Удалить подписку на webhook',
+)
+async def delete_webhook(
+    webhook_id: str = Path(..., description='ID подписки'),
+    api_key: str | None = Header(default=None, alias='X-API-Key', max_length=255, description='Ключ клиента'),
+) -> Response:
+    if not await webhook_service.delete(_tenant(api_key), webhook_id):
+        raise HTTPException(status_code=404, detail='webhook_not_found')
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
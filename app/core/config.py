@@ -11,8 +11,130 @@ class Settings(BaseSettings):
     # Общие настройки
     DEBUG: bool = True
     LOG_LEVEL: str = 'INFO'
+    LOG_FORMAT: str = 'text'  # text, json
+    LOG_ENQUEUE: bool = True
+    LOG_SAMPLE_RATE_INFO: float = 1.0
+    LOG_SAMPLE_RATE_DEBUG: float = 1.0
     MAX_RETRY_ATTEMPTS: int = 3
     RETRY_DELAY: int = 2
+    RETRY_BACKOFF_FACTOR: float = 2.0
+    RETRY_MAX_DELAY: float = 60.0
+    RETRY_JITTER: bool = True
+
+    # Настройки очереди отправки
+    DISPATCH_MODE: str = 'queue'  # sync, queue, shared (доставка в процессах python -m app.worker)
+    DISPATCH_WORKERS: int = 10
+    DISPATCH_URGENT_RESERVED_WORKERS: int = 2
+    DISPATCH_QUEUE_MAX_SIZE: int = 10000
+    DISPATCH_SHUTDOWN_TIMEOUT: float = 10.0
+
+    # Настройки общей очереди для DISPATCH_MODE=shared
+    WORK_QUEUE_BACKEND: str = 'sqlite'
+    WORK_QUEUE_SQLITE_PATH: str = 'data/work_queue.db'
+    WORK_QUEUE_VISIBILITY_TIMEOUT: float = 60.0
+    WORK_QUEUE_POLL_INTERVAL_MS: float = 100.0
+    WORK_QUEUE_PREFETCH: int = 10
+    WORK_QUEUE_MAX_DELIVERIES: int = 5
+    WORKER_PROCESSES: int = 1
+
+    # Настройки приоритетного планировщика
+    SCHEDULER_WEIGHT_URGENT: int = 8
+    SCHEDULER_WEIGHT_HIGH: int = 4
+    SCHEDULER_WEIGHT_NORMAL: int = 2
+    SCHEDULER_WEIGHT_LOW: int = 1
+    SCHEDULER_AGING_SECONDS: float = 30.0
+
+    # Настройки потока событий статусов (SSE, WebSocket)
+    EVENTS_BUFFER_SIZE: int = 1000
+    EVENTS_MAX_SUBSCRIBERS: int = 10000
+    EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Настройки отложенной отправки (send_at, delay)
+    DELAYED_TICK_MS: float = 100.0
+    DELAYED_WHEEL_SLOTS: int = 256
+    DELAYED_WHEEL_LEVELS: int = 4
+    DELAYED_RELEASE_BATCH: int = 500
+    DELAYED_MAX_DAYS: float = 365.0
+
+    # Настройки хранилища уведомлений
+    STORAGE_BACKEND: str = 'memory'  # memory, sqlite
+    STORAGE_SQLITE_PATH: str = 'data/notifications.db'
+    STORAGE_BATCH_SIZE: int = 500
+    STORAGE_FLUSH_INTERVAL_MS: float = 50.0
+    STORAGE_MEMORY_MAX_ITEMS: int = 100000
+    STORAGE_RETENTION_DAYS: float = 30.0
+    STORAGE_PRUNE_INTERVAL_SECONDS: float = 3600.0
+    STORAGE_RESPONSE_CACHE_SIZE: int = 50000  # JSON итоговых состояний для страниц истории
+
+    # Настройки пакетной отправки
+    BATCH_MAX_ITEMS: int = 100000
+    BATCH_CONCURRENCY: int = 100
+
+    # Настройки circuit breaker каналов
+    CIRCUIT_FAILURE_RATE_THRESHOLD: float = 0.5
+    CIRCUIT_WINDOW_SECONDS: int = 30
+    CIRCUIT_MIN_CALLS: int = 10
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+
+    # Настройки стратегии hedged: задержка перед запуском следующего канала
+    HEDGE_DELAY_SECONDS: float = 1.0  # пока по каналу меньше HEDGE_MIN_SAMPLES замеров
+    HEDGE_QUANTILE: float = 0.95  # 0 - всегда HEDGE_DELAY_SECONDS
+    HEDGE_MIN_SAMPLES: int = 20
+
+    # Настройки идемпотентности: заголовок Idempotency-Key и подавление дубликатов по содержимому
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_MAX_KEYS: int = 100000
+    IDEMPOTENCY_CONTENT_DEDUP_SECONDS: float = 0.0  # 0 - отключено
+
+    # Настройки шаблонов
+    TEMPLATE_CACHE_SIZE: int = 1024
+
+    # Реестр получателей
+    RECIPIENT_BACKEND: str = 'memory'  # memory, sqlite (общий для воркеров uvicorn)
+    RECIPIENT_SQLITE_PATH: str = 'data/recipients.db'
+    RECIPIENT_CACHE_SIZE: int = 10000
+    RECIPIENT_CACHE_TTL_SECONDS: float = 300.0  # срок, за который другой процесс увидит изменение
+    RECIPIENT_COUNTRY_CODE: str = '7'  # код страны для номеров без него
+    RECIPIENT_TRUNK_PREFIX: str = '8'  # национальный префикс, заменяемый кодом страны
+
+    # Webhooks итоговых статусов (регистрации по X-API-Key)
+    WEBHOOK_BACKEND: str = 'memory'  # memory, sqlite (общий для воркеров uvicorn и процессов доставки)
+    WEBHOOK_SQLITE_PATH: str = 'data/webhooks.db'
+    WEBHOOK_CACHE_SIZE: int = 10000
+    WEBHOOK_CACHE_TTL_SECONDS: float = 30.0  # срок, за который другой процесс увидит изменение
+    WEBHOOK_MAX_PER_TENANT: int = 10
+    WEBHOOK_QUEUE_MAX_SIZE: int = 100000
+    WEBHOOK_BATCH_SIZE: int = 100
+    WEBHOOK_BATCH_LINGER_MS: float = 200.0
+    WEBHOOK_WORKERS: int = 8
+    WEBHOOK_MAX_CONNECTIONS: int = 32
+    WEBHOOK_TIMEOUT: float = 10.0
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_DELAY: float = 1.0
+    WEBHOOK_RETRY_BACKOFF_FACTOR: float = 2.0
+    WEBHOOK_RETRY_MAX_DELAY: float = 300.0
+    WEBHOOK_SHUTDOWN_TIMEOUT: float = 5.0
+
+    # Настройки ограничения частоты приёма уведомлений (0 - без ограничения)
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_BACKEND: str = 'memory'  # memory, sqlite (общий для воркеров uvicorn)
+    RATE_LIMIT_SQLITE_PATH: str = 'data/rate_limits.db'
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_POLICY: str = 'reject'  # reject, defer
+    RATE_LIMIT_MAX_DEFER_SECONDS: float = 300.0
+    RATE_LIMIT_API_KEY_PER_MINUTE: float = 600.0
+    RATE_LIMIT_RECIPIENT_PER_HOUR: float = 20.0
+    RATE_LIMIT_EMAIL_PER_MINUTE: float = 0.0
+    RATE_LIMIT_SMS_PER_MINUTE: float = 60.0
+    RATE_LIMIT_TELEGRAM_PER_MINUTE: float = 0.0
+
+    # Настройки outbox: журнал принятых уведомлений для восстановления после перезапуска
+    OUTBOX_ENABLED: bool = False
+    OUTBOX_DIR: str = 'data/outbox'
+    OUTBOX_SEGMENT_BYTES: int = 16777216
+    OUTBOX_FSYNC: bool = True
+    OUTBOX_COMMIT_DELAY_MS: float = 0.0  # ожидание перед групповой фиксацией
 
     # Email настройки
     EMAIL_ENABLED: bool = True
@@ -21,14 +143,57 @@ class Settings(BaseSettings):
     EMAIL_USERNAME: str | None = None
     EMAIL_PASSWORD: str | None = None
     EMAIL_USE_TLS: bool = True
+    EMAIL_BACKEND: str = 'mock'  # mock, smtp
+    EMAIL_FROM: str | None = None
+    EMAIL_TIMEOUT: float = 30.0
+    EMAIL_POOL_SIZE: int = 5
+    EMAIL_POOL_IDLE_TIMEOUT: float = 60.0
+    EMAIL_POOL_MAX_MESSAGES_PER_CONNECTION: int = 100
+    EMAIL_POOL_HEALTH_CHECK_INTERVAL: float = 30.0
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_BATCH_LINGER_MS: float = 20.0
 
     # SMS настройки
     SMS_ENABLED: bool = True
     SMS_PROVIDER: str = 'mock'
+    SMS_MAX_SEGMENTS: int = 3  # для сообщений по шаблону
+    SMS_BATCH_SIZE: int = 100
+    SMS_BATCH_LINGER_MS: float = 20.0
 
     # Telegram настройки
     TELEGRAM_ENABLED: bool = True
     TELEGRAM_BOT_TOKEN: str | None = None
+    TELEGRAM_BACKEND: str = 'mock'  # mock, api
+    TELEGRAM_API_URL: str = 'https://api.telegram.org'
+    TELEGRAM_TIMEOUT: float = 10.0
+    TELEGRAM_MAX_CONNECTIONS: int = 20
+    TELEGRAM_GLOBAL_RATE: float = 30.0
+    TELEGRAM_GLOBAL_BURST: float = 30.0
+    TELEGRAM_PER_CHAT_RATE: float = 1.0
+    TELEGRAM_PER_CHAT_BURST: float = 1.0
+    TELEGRAM_MAX_RETRY_AFTER: float = 60.0
+    TELEGRAM_MAX_RATE_LIMITED_ATTEMPTS: int = 5
+    TELEGRAM_BATCH_SIZE: int = 30
+    TELEGRAM_BATCH_LINGER_MS: float = 10.0
+
+    # Адаптивный лимит одновременных обращений к провайдеру (отдельный для каждого канала)
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_ALGORITHM: str = 'gradient'  # gradient, aimd
+    CONCURRENCY_INITIAL_LIMIT: int = 20
+    CONCURRENCY_MIN_LIMIT: int = 1
+    CONCURRENCY_MAX_LIMIT: int = 200
+    CONCURRENCY_BACKOFF: float = 0.9  # множитель лимита при перегрузке
+    CONCURRENCY_RTT_TOLERANCE: float = 1.5  # gradient: допустимый рост задержки без снижения лимита
+    CONCURRENCY_SLOW_CALL_MS: float = 5000.0  # aimd: более медленное обращение снижает лимит
+
+    # Mock-провайдеры каналов (EMAIL_BACKEND, SMS_PROVIDER, TELEGRAM_BACKEND = mock)
+    MOCK_SEED: int | None = None  # задан - задержки и ошибки воспроизводятся
+    MOCK_LATENCY: str = 'uniform'  # constant, uniform, lognormal
+    MOCK_LATENCY_MIN_MS: float = 100.0
+    MOCK_LATENCY_MAX_MS: float = 500.0
+    MOCK_FAILURE_RATE: float = 0.2
+    MOCK_ERROR_TYPES: str = 'reject'  # через запятую: reject, timeout, unavailable
+    MOCK_TIMEOUT_MS: float = 1000.0
 
     model_config = SettingsConfigDict(env_file=str(PATH_TO_ENV), extra='ignore')
 
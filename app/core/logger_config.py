@@ -1,12 +1,20 @@
 import inspect
+import json
 import logging
 import os
 import sys
+import traceback
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
 
+# Логгер для частых событий на пути отправки. INFO/DEBUG-записи прореживаются
+# по LOG_SAMPLE_RATE_*; сообщения передаются шаблоном с аргументами, чтобы не
+# форматировать их при отключённом уровне
+hot_logger = logger.bind(sampled=True)
+
 
 class InterceptHandler(logging.Handler):
     def emit(self, record: logging.LogRecord) -> None:
@@ -30,12 +38,54 @@ class InterceptHandler(logging.Handler):
         logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
 
 
+def json_format(record: Any) -> str:
+    """Одна JSON-строка на запись: служебные поля, сообщение и привязанный контекст (bind)"""
+    payload = {
+        'time': record['time'].isoformat(),
+        'level': record['level'].name,
+        'logger': record['name'],
+        'function': record['function'],
+        'line': record['line'],
+        'message': record['message'],
+    }
+    payload.update((key, value) for key, value in record['extra'].items() if key != 'json' and key[0] != '_')
+    if record['exception'] is not None:
+        payload['exception'] = ''.join(traceback.format_exception(*record['exception']))
+    record['extra']['json'] = json.dumps(payload, ensure_ascii=False, default=str)
+    return '{extra[json]}\n'
+
+
+def sampling_filter(rates: dict[str, float]) -> Callable[[Any], bool]:
+    """
+    Пропускает каждую N-ю запись hot_logger уровня из rates (N = 1 / rate).
+
+    Записи без метки sampled и уровни, которых нет в rates, проходят всегда. Решение
+    принимается один раз на запись и сохраняется в extra, поэтому фильтр общий для всех sink.
+    """
+    every = {level: max(1, round(1 / rate)) for level, rate in rates.items() if 0 < rate < 1}
+    seen = dict.fromkeys(every, 0)
+
+    def accept(record: Any) -> bool:
+        extra = record['extra']
+        if extra.pop('sampled', False):
+            level = record['level'].name
+            if level in every:
+                seen[level] += 1
+                extra['_dropped'] = seen[level] % every[level] != 1 and every[level] != 1
+        return not extra.get('_dropped', False)
+
+    return accept
+
+
 def setup_logger(
     log_dir: str = 'logs',
     log_file: str = 'app.log',
     log_level: str = 'INFO',
     rotation: str = '100 MB',
     retention: str = '7 days',
+    log_format: str = 'text',
+    enqueue: bool = True,
+    sample_rates: dict[str, float] | None = None,
 ) -> Any:
     """
     Настройка логгера для приложения.
@@ -46,6 +96,9 @@ def setup_logger(
     - log_level: Уровень логирования (DEBUG, INFO, WARNING, ERROR)
     - rotation: Правило ротации логов (например, "100 MB" или "1 week")
     - retention: Правило хранения логов (например, "7 days")
+    - log_format: text или json (одна JSON-строка на запись с контекстом из bind)
+    - enqueue: Запись в sink через фоновую очередь
+    - sample_rates: Доля сохраняемых записей hot_logger по уровням, например {"INFO": 0.1}
     """
 
     # Удаляем стандартные обработчики loguru
@@ -61,24 +114,30 @@ def setup_logger(
         '<level>{level: <8}</level> | <cyan>{name}</cyan>:'
         '<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>'
     )
+    record_filter = sampling_filter(sample_rates or {})
+    json_mode = log_format == 'json'
     logger.add(
         sys.stdout,
-        format=form,
+        format=json_format if json_mode else form,
+        filter=record_filter,
         level=log_level,
-        colorize=True,
-        enqueue=True,
+        colorize=not json_mode,
+        enqueue=enqueue,
         backtrace=True,
     )
 
     # Настройка записи в ФАЙЛ с ротацией
     logger.add(
         log_path,
-        format='{time:YYYY-MM-DD HH:mm:ss} | {level: <8} \
+        format=json_format
+        if json_mode
+        else '{time:YYYY-MM-DD HH:mm:ss} | {level: <8} \
             | {name}:{function}:{line} - {message}',
+        filter=record_filter,
         level=log_level,
         rotation=rotation,
         retention=retention,
-        enqueue=True,
+        enqueue=enqueue,
         compression='zip',
     )
     logging.basicConfig(handlers=[InterceptHandler()], level=log_level, force=True)
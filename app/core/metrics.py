@@ -0,0 +1,330 @@
+import math
+import time
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any
+
+# Задержки отправки провайдерам: от единиц миллисекунд до десятков секунд
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FSYNC_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class GaugeChild(CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # Последняя ячейка - +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> float | None:
+        """Оценка квантиля линейной интерполяцией внутри бакета, как histogram_quantile в Prometheus"""
+        total = self.count
+        if not total:
+            return None
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.bounds, self.counts, strict=False):
+            if count and cumulative + count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        # Квантиль попал в бакет +Inf - возвращаем верхнюю конечную границу
+        return self.bounds[-1] if self.bounds else None
+
+
+class Metric[C]:
+    """
+    Метрика с дочерними сериями по значениям меток.
+
+    Серии создаются при первом обращении и дальше изменяются простым присваиванием
+    атрибута: весь код выполняется в одном event loop, поэтому блокировки не нужны.
+    """
+
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: dict[tuple[str, ...], C] = {}
+        self._default = self._new_child() if not self.labelnames else None
+
+    def labels(self, *values: str) -> C:
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'{self.name}: ожидаются метки {self.labelnames}')
+            child = self.children[values] = self._new_child()
+        return child
+
+    def _new_child(self) -> C:
+        raise NotImplementedError
+
+    def _series(self) -> Iterable[tuple[tuple[str, ...], C]]:
+        if self._default is not None:
+            return [((), self._default)]
+        return self.children.items()
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        for values, child in self._series():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: tuple[str, ...], child: C) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric[CounterChild]):
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1.0) -> None:
+        assert self._default is not None
+        self._default.value += amount
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def _render_child(self, values: tuple[str, ...], child: CounterChild) -> list[str]:
+        return [f'{self.name}{_labels(self.labelnames, values)} {_format_value(child.value)}']
+
+
+class Gauge(Metric[GaugeChild]):
+    type_name = 'gauge'
+
+    def inc(self, amount: float = 1.0) -> None:
+        assert self._default is not None
+        self._default.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        assert self._default is not None
+        self._default.value -= amount
+
+    def set(self, value: float) -> None:
+        assert self._default is not None
+        self._default.value = value
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def _render_child(self, values: tuple[str, ...], child: GaugeChild) -> list[str]:
+        return [f'{self.name}{_labels(self.labelnames, values)} {_format_value(child.value)}']
+
+
+class Histogram(Metric[HistogramChild]):
+    type_name = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.bounds = tuple(sorted(b for b in buckets if not math.isinf(b)))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float) -> None:
+        assert self._default is not None
+        self._default.observe(value)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.bounds)
+
+    def _render_child(self, values: tuple[str, ...], child: HistogramChild) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.bounds, math.inf), child.counts, strict=True):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f'{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}')
+        labels = _labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(child.sum)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric[Any]] = {}
+
+    def register[M: Metric[Any]](self, metric: M) -> M:
+        if metric.name in self.metrics:
+            raise ValueError(f'Метрика {metric.name} уже зарегистрирована')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4"""
+        lines: list[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+SEND_DURATION = registry.register(
+    Histogram('notification_send_duration_seconds', 'Длительность попытки отправки через канал', ['channel'])
+)
+SEND_TOTAL = registry.register(
+    Counter(
+        'notification_send_total',
+        'Попытки отправки по каналу, приоритету и результату',
+        ['channel', 'priority', 'result'],
+    )
+)
+RETRIES_TOTAL = registry.register(
+    Counter('notification_retries_total', 'Запланированные повторные попытки по каналу', ['channel'])
+)
+RETRY_ATTEMPTS_TOTAL = registry.register(
+    Counter('retry_attempts_total', 'Повторные попытки в retry_async и retry_with_config', ['function'])
+)
+FALLBACK_DEPTH = registry.register(
+    Histogram(
+        'notification_fallback_depth',
+        'Число каналов, задействованных до итогового статуса',
+        ['status'],
+        buckets=(1, 2, 3),
+    )
+)
+DELIVERED_TOTAL = registry.register(
+    Counter('notification_delivered_total', 'Уведомления в итоговом статусе', ['status', 'priority'])
+)
+IN_FLIGHT = registry.register(Gauge('notifications_in_flight', 'Уведомления, ещё не получившие итоговый статус'))
+QUEUE_WAIT = registry.register(
+    Histogram(
+        'notification_queue_wait_seconds', 'Время ожидания в очереди отправки', ['priority'], buckets=QUEUE_WAIT_BUCKETS
+    )
+)
+QUEUE_DEPTH = registry.register(Gauge('notification_queue_depth', 'Глубина очереди по приоритетам', ['priority']))
+RETRY_PENDING = registry.register(Gauge('notification_retry_pending', 'Уведомления, ожидающие повторной попытки'))
+DELAYED_PENDING = registry.register(
+    Gauge('notification_delayed_pending', 'Отложенные уведомления (send_at, delay), ожидающие срока')
+)
+WORK_QUEUE_DEPTH = registry.register(
+    Gauge('notification_work_queue_depth', 'Задачи общей очереди по приоритету и состоянию', ['priority', 'state'])
+)
+CONCURRENCY_LIMIT = registry.register(
+    Gauge('channel_concurrency_limit', 'Текущий адаптивный лимит обращений к провайдеру', ['channel'])
+)
+CONCURRENCY_IN_FLIGHT = registry.register(
+    Gauge('channel_concurrency_in_flight', 'Обращения к провайдеру в работе', ['channel'])
+)
+CONCURRENCY_QUEUED = registry.register(
+    Gauge('channel_concurrency_queued', 'Обращения к провайдеру, ждущие слота лимита', ['channel'])
+)
+RECIPIENT_CACHE_TOTAL = registry.register(
+    Counter('recipient_cache_requests_total', 'Обращения к кэшу контактов получателей', ['result'])
+)
+EVENT_SUBSCRIBERS = registry.register(Gauge('notification_event_subscribers', 'Подписчики на поток событий статусов'))
+EVENT_SUBSCRIBERS_DROPPED_TOTAL = registry.register(
+    Counter('notification_event_subscribers_dropped_total', 'Подписчики, отключённые из-за переполнения буфера')
+)
+WEBHOOK_DELIVERIES_TOTAL = registry.register(
+    Counter('webhook_deliveries_total', 'Отправки пакетов статусов на webhooks по результату', ['result'])
+)
+WEBHOOK_REQUEST_DURATION = registry.register(
+    Histogram('webhook_request_duration_seconds', 'Длительность запроса к webhook')
+)
+WEBHOOK_EVENTS_DROPPED_TOTAL = registry.register(
+    Counter('webhook_events_dropped_total', 'Итоговые статусы, не принятые переполненной очередью webhooks')
+)
+IDEMPOTENT_REPLAYS_TOTAL = registry.register(
+    Counter('notification_idempotent_replays_total', 'Дубликаты, получившие результат исходного запроса', ['source'])
+)
+RATE_LIMITED_TOTAL = registry.register(
+    Counter(
+        'notification_rate_limited_total', 'Уведомления сверх лимита по виду лимита и действию', ['limit', 'action']
+    )
+)
+OUTBOX_COMMIT_RECORDS = registry.register(
+    Histogram(
+        'notification_outbox_commit_records',
+        'Записи outbox, зафиксированные одним fsync',
+        buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+    )
+)
+OUTBOX_FSYNC_DURATION = registry.register(
+    Histogram('notification_outbox_fsync_duration_seconds', 'Длительность fsync журнала outbox', buckets=FSYNC_BUCKETS)
+)
+PROVIDER_DURATION = registry.register(
+    Histogram('channel_provider_request_duration_seconds', 'Длительность пакетного запроса к провайдеру', ['channel'])
+)
+PROVIDER_MESSAGES = registry.register(
+    Counter('channel_provider_messages_total', 'Сообщения, переданные провайдеру, по результату', ['channel', 'result'])
+)
+
+
+def instrument_provider[T, R](
+    channel: str, flush: Callable[[list[T]], Awaitable[list[R | BaseException]]]
+) -> Callable[[list[T]], Awaitable[list[R | BaseException]]]:
+    """Оборачивает пакетную отправку канала замером длительности и подсчётом результатов"""
+    duration = PROVIDER_DURATION.labels(channel)
+    succeeded = PROVIDER_MESSAGES.labels(channel, 'success')
+    failed = PROVIDER_MESSAGES.labels(channel, 'failure')
+
+    async def wrapper(items: list[T]) -> list[R | BaseException]:
+        started = time.perf_counter()
+        try:
+            results = await flush(items)
+        except Exception:
+            failed.inc(len(items))
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started)
+        ok = sum(1 for result in results if result is True)
+        succeeded.inc(ok)
+        failed.inc(len(results) - ok)
+        return results
+
+    return wrapper
@@ -4,10 +4,32 @@ from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api.v1.notifications_router import router as notifications_router
+from app.api.v1.recipients_router import router as recipients_router
+from app.api.v1.templates_router import router as templates_router
+from app.api.v1.webhooks_router import router as webhooks_router
 from app.core.config import settings
 from app.core.logger_config import setup_logger
+from app.core.metrics import (
+    CONCURRENCY_IN_FLIGHT,
+    CONCURRENCY_LIMIT,
+    CONCURRENCY_QUEUED,
+    DELAYED_PENDING,
+    QUEUE_DEPTH,
+    RETRY_PENDING,
+    WORK_QUEUE_DEPTH,
+    registry,
+)
+from app.services.dispatcher import notification_dispatcher
+from app.services.event_broker import event_broker
+from app.services.idempotency import idempotency_service
+from app.services.notification_service import notification_service
+from app.services.rate_limiter import rate_limiter
+from app.services.recipient_service import recipient_service
+from app.services.webhook_dispatcher import webhook_dispatcher
+from app.services.webhook_service import webhook_service
 
 logger = setup_logger(
     log_dir='logs',
@@ -15,6 +37,9 @@ logger = setup_logger(
     log_level=settings.LOG_LEVEL,
     rotation='100 MB',
     retention='10 days',
+    log_format=settings.LOG_FORMAT,
+    enqueue=settings.LOG_ENQUEUE,
+    sample_rates={'INFO': settings.LOG_SAMPLE_RATE_INFO, 'DEBUG': settings.LOG_SAMPLE_RATE_DEBUG},
 )
 
 
@@ -22,8 +47,26 @@ logger = setup_logger(
 async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     """Управление жизненным циклом приложения"""
     logger.info('Запуск системы уведомлений...')
+    if settings.DISPATCH_MODE == 'shared' and settings.STORAGE_BACKEND != 'sqlite':
+        logger.warning('DISPATCH_MODE=shared без STORAGE_BACKEND=sqlite: статусы доставки не видны API')
+    if settings.DISPATCH_MODE == 'shared' and settings.WEBHOOK_BACKEND != 'sqlite':
+        logger.warning('DISPATCH_MODE=shared без WEBHOOK_BACKEND=sqlite: процессы доставки не видят webhooks')
+    await notification_service.start()
+    await rate_limiter.start()
+    await recipient_service.start()
+    await webhook_service.start()
+    await webhook_dispatcher.start()
+    if settings.DISPATCH_MODE == 'queue':
+        await notification_dispatcher.start()
+    await notification_service.recover()
     yield
     logger.info('Остановка системы уведомлений...')
+    await notification_dispatcher.stop()
+    await webhook_dispatcher.stop()
+    await rate_limiter.close()
+    await recipient_service.close()
+    await webhook_service.close()
+    await notification_service.close()
 
 
 # Создание приложения
@@ -46,6 +89,9 @@ app.add_middleware(
 )
 
 app.include_router(notifications_router, prefix='/api/v1', tags=['notifications'])
+app.include_router(templates_router, prefix='/api/v1', tags=['templates'])
+app.include_router(recipients_router, prefix='/api/v1', tags=['recipients'])
+app.include_router(webhooks_router, prefix='/api/v1', tags=['webhooks'])
 
 
 @app.get('/')
@@ -57,11 +103,38 @@ async def root() -> dict[str, str]:
 @app.get('/health')
 async def health_check() -> dict[str, Any]:
     """Проверка работоспособности"""
-    return {
-        'status': 'healthy',
-        'services': {
-            'email': settings.EMAIL_ENABLED,
-            'sms': settings.SMS_ENABLED,
-            'telegram': settings.TELEGRAM_ENABLED,
-        },
+    services = notification_service.channels_health()
+    degraded = any(service['enabled'] and service['state'] != 'closed' for service in services.values())
+    health = {
+        'status': 'degraded' if degraded else 'healthy',
+        'services': services,
+        'queue': notification_dispatcher.stats(),
+        'idempotency': idempotency_service.stats(),
+        'outbox': notification_service.outbox.stats(),
+        'events': event_broker.stats(),
+        'webhooks': webhook_dispatcher.stats(),
     }
+    if notification_service.work_queue is not None:
+        health['work_queue'] = await notification_service.work_queue.stats()
+    return health
+
+
+@app.get('/metrics', response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Метрики в текстовом формате Prometheus"""
+    for priority, lane in notification_dispatcher.queue.lanes.items():
+        QUEUE_DEPTH.labels(priority.value).set(len(lane))
+    RETRY_PENDING.set(len(notification_service.retries))
+    DELAYED_PENDING.set(len(notification_service.delayed))
+    for channel, service in notification_service.channel_services.items():
+        if service.concurrency.enabled:
+            CONCURRENCY_LIMIT.labels(channel.value).set(service.concurrency.current)
+            CONCURRENCY_IN_FLIGHT.labels(channel.value).set(service.concurrency.in_flight)
+            CONCURRENCY_QUEUED.labels(channel.value).set(service.concurrency.queued)
+    if notification_service.work_queue is not None:
+        depth = await notification_service.work_queue.stats()
+        for priority in notification_dispatcher.queue.lanes:
+            counts = depth.get(priority.value, {})
+            for state in ('ready', 'delayed', 'leased'):
+                WORK_QUEUE_DEPTH.labels(priority.value, state).set(counts.get(state, 0))
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4')
@@ -0,0 +1,69 @@
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class RateLimitRule:
+    """Лимит rate событий в секунду с допустимым всплеском burst для одного ключа"""
+
+    key: str
+    rate: float
+    burst: float
+
+    @property
+    def interval(self) -> float:
+        return 1 / self.rate
+
+    @property
+    def tolerance(self) -> float:
+        return max(0.0, self.burst - 1) * self.interval
+
+
+@dataclass(slots=True, frozen=True)
+class RateLimitResult:
+    allowed: bool
+    # Для разрешённого запроса - через сколько секунд он укладывается в лимит (0 - сразу),
+    # для отклонённого - через сколько секунд можно повторить
+    delay: float = 0.0
+    # Ключ правила, из-за которого запрос отклонён или отложен
+    exceeded: str | None = None
+
+
+def gcra(
+    rules: Sequence[RateLimitRule], tats: Mapping[str, float], now: float, max_delay: float
+) -> tuple[RateLimitResult, dict[str, float]]:
+    """
+    GCRA сразу по нескольким ключам: запрос проходит, только если укладывается во все лимиты.
+
+    Для каждого ключа хранится одно число - теоретическое время прибытия (TAT) следующего события.
+    max_delay > 0 позволяет принять запрос с отложенной отправкой, если до момента, когда он уложится
+    в лимит, не больше max_delay секунд; слот при этом резервируется. Возвращает решение и новые TAT,
+    которые нужно сохранить (для отклонённого запроса - пустой словарь).
+    """
+    updates: dict[str, float] = {}
+    delay = 0.0
+    delayed_by = None
+    for rule in rules:
+        tat = max(tats.get(rule.key, now), now)
+        wait = tat - rule.tolerance - now
+        if wait > delay:
+            delay, delayed_by = wait, rule.key
+        updates[rule.key] = tat + rule.interval
+    if delay > max_delay:
+        return RateLimitResult(allowed=False, delay=delay, exceeded=delayed_by), {}
+    return RateLimitResult(allowed=True, delay=delay, exceeded=delayed_by), updates
+
+
+class RateLimitStore(ABC):
+    """Хранилище состояния лимитов"""
+
+    async def start(self) -> None:  # noqa: B027
+        """Открывает ресурсы хранилища"""
+
+    async def close(self) -> None:  # noqa: B027
+        """Закрывает ресурсы хранилища"""
+
+    @abstractmethod
+    async def acquire(self, rules: Sequence[RateLimitRule], max_delay: float = 0.0) -> RateLimitResult:
+        """Атомарно проверяет все правила и, если запрос проходит, списывает его из каждого лимита"""
@@ -0,0 +1,12 @@
+from app.core.config import settings
+from app.ratelimit.base import RateLimitStore
+from app.ratelimit.memory import MemoryRateLimitStore
+from app.ratelimit.sqlite import SQLiteRateLimitStore
+
+
+def create_rate_limit_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_BACKEND == 'sqlite':
+        return SQLiteRateLimitStore(path=settings.RATE_LIMIT_SQLITE_PATH)
+    if settings.RATE_LIMIT_BACKEND == 'memory':
+        return MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    raise ValueError(f'Неизвестный RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}')
@@ -0,0 +1,31 @@
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from app.ratelimit.base import RateLimitResult, RateLimitRule, RateLimitStore, gcra
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Лимиты в памяти процесса: одно число на ключ, проверка за O(1) на правило.
+
+    Ключи хранятся в порядке последнего обращения. Сверх max_keys вытесняется самый старый ключ, если
+    его TAT уже в прошлом (такой ключ эквивалентен новому), а при двукратном превышении - в любом случае.
+    """
+
+    def __init__(self, max_keys: int = 100000) -> None:
+        self.max_keys = max_keys
+        self.tats: OrderedDict[str, float] = OrderedDict()
+
+    async def acquire(self, rules: Sequence[RateLimitRule], max_delay: float = 0.0) -> RateLimitResult:
+        now = time.monotonic()
+        result, updates = gcra(rules, self.tats, now, max_delay)
+        for key, tat in updates.items():
+            self.tats[key] = tat
+            self.tats.move_to_end(key)
+        while len(self.tats) > self.max_keys:
+            oldest_key, oldest_tat = next(iter(self.tats.items()))
+            if oldest_tat > now and len(self.tats) <= self.max_keys * 2:
+                break
+            del self.tats[oldest_key]
+        return result
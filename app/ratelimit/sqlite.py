@@ -0,0 +1,91 @@
+import asyncio
+import sqlite3
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.ratelimit.base import RateLimitResult, RateLimitRule, RateLimitStore, gcra
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    tat REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_rate_limits_tat ON rate_limits (tat);
+"""
+
+UPSERT = 'INSERT INTO rate_limits (key, tat) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET tat = excluded.tat'
+
+# Как часто (в вызовах acquire) удалять ключи с TAT в прошлом
+CLEANUP_EVERY = 1000
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """
+    Лимиты в файле SQLite (WAL), общие для всех процессов uvicorn, открывших один файл.
+
+    Проверка и списание по всем правилам выполняются в одной транзакции BEGIN IMMEDIATE, поэтому
+    конкурентные процессы не превышают лимит. Время - wall clock, так как monotonic у процессов разное.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-rate-limit')
+        self._conn: sqlite3.Connection | None = None
+        self._calls = 0
+
+    async def start(self) -> None:
+        await self._run(self._connect)
+        logger.info(f'SQLiteRateLimitStore открыт ({self.path})')
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+    async def acquire(self, rules: Sequence[RateLimitRule], max_delay: float = 0.0) -> RateLimitResult:
+        if not rules:
+            return RateLimitResult(allowed=True)
+        result: RateLimitResult = await self._run(self._acquire, rules, max_delay)
+        return result
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> None:
+        if self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    def _acquire(self, rules: Sequence[RateLimitRule], max_delay: float) -> RateLimitResult:
+        self._connect()
+        assert self._conn is not None
+        conn = self._conn
+        keys = [rule.key for rule in rules]
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            placeholders = ','.join('?' * len(keys))
+            # Подставляются только плейсхолдеры, ключи передаются параметрами
+            rows = conn.execute(f'SELECT key, tat FROM rate_limits WHERE key IN ({placeholders})', keys)  # noqa: S608
+            result, updates = gcra(rules, dict(rows.fetchall()), now, max_delay)
+            if updates:
+                conn.executemany(UPSERT, updates.items())
+            self._calls += 1
+            if self._calls % CLEANUP_EVERY == 0:
+                conn.execute('DELETE FROM rate_limits WHERE tat < ?', (now,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return result
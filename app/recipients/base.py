@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+
+from app.schemas.recipient_schemas import RecipientResponse
+
+
+class RecipientStore(ABC):
+    """Хранилище реестра получателей"""
+
+    async def start(self) -> None:  # noqa: B027
+        """Открывает ресурсы хранилища"""
+
+    async def close(self) -> None:  # noqa: B027
+        """Закрывает ресурсы хранилища"""
+
+    @abstractmethod
+    async def get(self, recipient_id: str) -> RecipientResponse | None:
+        """Получатель по ID; None, если не зарегистрирован"""
+
+    @abstractmethod
+    async def save(self, recipient: RecipientResponse) -> None:
+        """Сохраняет получателя, заменяя запись с тем же ID"""
+
+    @abstractmethod
+    async def delete(self, recipient_id: str) -> bool:
+        """Удаляет получателя; False, если его не было"""
@@ -0,0 +1,12 @@
+from app.core.config import settings
+from app.recipients.base import RecipientStore
+from app.recipients.memory import MemoryRecipientStore
+from app.recipients.sqlite import SQLiteRecipientStore
+
+
+def create_recipient_store() -> RecipientStore:
+    if settings.RECIPIENT_BACKEND == 'sqlite':
+        return SQLiteRecipientStore(path=settings.RECIPIENT_SQLITE_PATH)
+    if settings.RECIPIENT_BACKEND == 'memory':
+        return MemoryRecipientStore()
+    raise ValueError(f'Неизвестный RECIPIENT_BACKEND: {settings.RECIPIENT_BACKEND}')
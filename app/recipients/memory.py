@@ -0,0 +1,18 @@
+from app.recipients.base import RecipientStore
+from app.schemas.recipient_schemas import RecipientResponse
+
+
+class MemoryRecipientStore(RecipientStore):
+    """Реестр получателей в памяти процесса"""
+
+    def __init__(self) -> None:
+        self.recipients: dict[str, RecipientResponse] = {}
+
+    async def get(self, recipient_id: str) -> RecipientResponse | None:
+        return self.recipients.get(recipient_id)
+
+    async def save(self, recipient: RecipientResponse) -> None:
+        self.recipients[recipient.id] = recipient
+
+    async def delete(self, recipient_id: str) -> bool:
+        return self.recipients.pop(recipient_id, None) is not None
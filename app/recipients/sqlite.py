@@ -0,0 +1,74 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.recipients.base import RecipientStore
+from app.schemas.recipient_schemas import RecipientResponse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipients (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+UPSERT = 'INSERT INTO recipients (id, data) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET data = excluded.data'
+
+
+class SQLiteRecipientStore(RecipientStore):
+    """Реестр получателей в файле SQLite (WAL), общий для всех процессов uvicorn, открывших один файл"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-recipients')
+        self._conn: sqlite3.Connection | None = None
+
+    async def start(self) -> None:
+        await self._run(self._connect)
+        logger.info(f'SQLiteRecipientStore открыт ({self.path})')
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+    async def get(self, recipient_id: str) -> RecipientResponse | None:
+        row = await self._run(self._execute, 'SELECT data FROM recipients WHERE id = ?', (recipient_id,))
+        return RecipientResponse.model_validate_json(row[0]) if row is not None else None
+
+    async def save(self, recipient: RecipientResponse) -> None:
+        await self._run(self._execute, UPSERT, (recipient.id, recipient.model_dump_json()))
+
+    async def delete(self, recipient_id: str) -> bool:
+        deleted: bool = await self._run(self._delete, recipient_id)
+        return deleted
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> None:
+        if self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    def _connection(self) -> sqlite3.Connection:
+        self._connect()
+        assert self._conn is not None
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple[Any, ...]) -> tuple[Any, ...] | None:
+        row: tuple[Any, ...] | None = self._connection().execute(sql, params).fetchone()
+        return row
+
+    def _delete(self, recipient_id: str) -> bool:
+        return self._connection().execute('DELETE FROM recipients WHERE id = ?', (recipient_id,)).rowcount > 0
@@ -12,6 +12,11 @@ class NotificationStatus(str, Enum):
     SENT = 'sent'
     FAILED = 'failed'
     RETRYING = 'retrying'
+    CANCELLED = 'cancelled'
+
+
+# Статусы, после которых состояние уведомления больше не меняется
+FINAL_STATUSES = frozenset({NotificationStatus.SENT, NotificationStatus.FAILED, NotificationStatus.CANCELLED})
 
 
 class NotificationPriority(str, Enum):
@@ -19,3 +24,10 @@ class NotificationPriority(str, Enum):
     NORMAL = 'normal'
     HIGH = 'high'
     URGENT = 'urgent'
+
+
+class DeliveryStrategy(str, Enum):
+    FALLBACK = 'fallback'
+    BROADCAST = 'broadcast'
+    RACE = 'race'
+    HEDGED = 'hedged'
@@ -1,24 +1,45 @@
 from datetime import UTC, datetime
+from typing import Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic.json_schema import SkipJsonSchema
 
-from app.schemas.enum import NotificationChannel, NotificationPriority, NotificationStatus
+from app.schemas.enum import DeliveryStrategy, NotificationChannel, NotificationPriority, NotificationStatus
 
+SUBJECT_MAX_LENGTH = 255
+MESSAGE_MAX_LENGTH = 2000
 
-class NotificationRequest(BaseModel):
-    email: str = Field(..., description='Email')
-    phone: str = Field(..., description='Номер телефона')
-    telegram_id: str = Field(..., description='Telegram ID')
-    subject: str = Field(..., max_length=255, description='Тема уведомления')
-    message: str = Field(..., max_length=2000, description='Текст сообщения')
+
+class NotificationRecipient(BaseModel):
+    """
+    Адресная часть запроса: получатель, каналы, приоритет и время отправки.
+
+    Получатель задаётся контактами или recipient_id из реестра получателей; контакт нужен для каждого
+    запрошенного канала. Для recipient_id контакты и порядок каналов (если channels не передан)
+    подставляются из реестра при приёме уведомления.
+    """
+
+    recipient_id: str | None = Field(default=None, description='ID получателя из реестра вместо контактов')
+    email: str | None = Field(default=None, description='Email')
+    phone: str | None = Field(default=None, description='Номер телефона')
+    telegram_id: str | None = Field(default=None, description='Telegram ID')
     channels: list[NotificationChannel] = Field(
         default=[NotificationChannel.EMAIL, NotificationChannel.SMS, NotificationChannel.TELEGRAM]
     )
     priority: NotificationPriority = Field(default=NotificationPriority.NORMAL)
+    strategy: DeliveryStrategy = Field(
+        default=DeliveryStrategy.FALLBACK,
+        description='fallback - по очереди до первого успеха, broadcast - все каналы сразу, '
+        'race - все сразу до первого успеха, hedged - следующий канал, если предыдущий не ответил за p95',
+    )
+    send_at: datetime | None = Field(default=None, description='Время отправки (ISO 8601; без часового пояса - UTC)')
+    delay: float | None = Field(default=None, gt=0, description='Отложить отправку на delay секунд')
 
     @field_validator('email')
     def validate_recipient(cls, v: str | None) -> str | None:
-        if not v or len(v.strip()) == 0:
+        if v is None:
+            return None
+        if len(v.strip()) == 0:
             raise ValueError('Получатель не может быть пустым')
         return v.strip()
 
@@ -28,6 +49,52 @@ class NotificationRequest(BaseModel):
             raise ValueError('Должен быть указан хотя бы один канал')
         return v
 
+    @field_validator('send_at')
+    def validate_send_at(cls, v: datetime | None) -> datetime | None:
+        if v is not None and v.tzinfo is None:
+            return v.replace(tzinfo=UTC)
+        return v
+
+    @model_validator(mode='after')
+    def validate_schedule(self) -> 'NotificationRecipient':
+        if self.send_at is not None and self.delay is not None:
+            raise ValueError('Можно указать только один из send_at и delay')
+        return self
+
+    @model_validator(mode='after')
+    def validate_contacts(self) -> 'NotificationRecipient':
+        if self.recipient_id is None:
+            missing = [channel.value for channel in self.channels if self.contact(channel) is None]
+            if missing:
+                raise ValueError(f'Не указаны контакты для каналов: {", ".join(missing)}')
+        return self
+
+    @property
+    def scheduled(self) -> bool:
+        return self.send_at is not None or self.delay is not None
+
+    def contact(self, channel: NotificationChannel) -> str | None:
+        if channel == NotificationChannel.SMS:
+            return self.phone
+        if channel == NotificationChannel.TELEGRAM:
+            return self.telegram_id
+        return self.email
+
+
+class NotificationRequest(NotificationRecipient):
+    subject: str = Field(default='', max_length=SUBJECT_MAX_LENGTH, description='Тема уведомления')
+    message: str = Field(default='', max_length=MESSAGE_MAX_LENGTH, description='Текст сообщения')
+    template_id: str | None = Field(default=None, description='ID шаблона вместо subject и message')
+    variables: dict[str, str] = Field(default_factory=dict, description='Значения переменных шаблона')
+    # Клиент (хэш X-API-Key) для webhooks итоговых статусов; заполняется при приёме, значение из запроса заменяется
+    tenant: SkipJsonSchema[str | None] = None
+
+    @model_validator(mode='after')
+    def validate_content(self) -> 'NotificationRequest':
+        if self.template_id is None and not {'subject', 'message'} <= self.model_fields_set:
+            raise ValueError('Нужно указать subject и message или template_id')
+        return self
+
 
 class NotificationResponse(BaseModel):
     id: str = Field(..., description='Уникальный ID уведомления')
@@ -38,20 +105,124 @@ class NotificationResponse(BaseModel):
     error_details: dict[str, str] | None = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     sent_at: datetime | None = None
+    next_attempt_at: datetime | None = Field(default=None, description='Время следующей попытки (RETRYING)')
+    batch_id: str | None = None
+
+
+RESPONSE_FIELDS = set(NotificationResponse.model_fields)
 
 
 class NotificationHistory(BaseModel):
     id: str
-    email: str
+    recipient_id: str | None = None
+    email: str | None = None
+    phone: str | None = None
+    telegram_id: str | None = None
     subject: str
     message: str
     channels: list[NotificationChannel]
+    priority: NotificationPriority = NotificationPriority.NORMAL
+    strategy: DeliveryStrategy = DeliveryStrategy.FALLBACK
     status: NotificationStatus
     successful_channels: list[NotificationChannel]
     failed_channels: list[NotificationChannel]
+    attempts: dict[str, int] = Field(default_factory=dict)
     created_at: datetime
     sent_at: datetime | None
     error_details: dict[str, str] | None
+    next_attempt_at: datetime | None = None
+    batch_id: str | None = None
 
     class Config:
         from_attributes = True
+
+    @classmethod
+    def from_notification(cls, response: NotificationResponse, request: NotificationRequest) -> 'NotificationHistory':
+        return cls(
+            id=response.id,
+            recipient_id=request.recipient_id,
+            email=request.email,
+            phone=request.phone,
+            telegram_id=request.telegram_id,
+            subject=request.subject,
+            message=request.message,
+            channels=request.channels,
+            priority=request.priority,
+            strategy=request.strategy,
+            status=response.status,
+            successful_channels=list(response.successful_channels),
+            failed_channels=list(response.failed_channels),
+            attempts=dict(response.attempts),
+            created_at=response.created_at,
+            sent_at=response.sent_at,
+            error_details=response.error_details,
+            next_attempt_at=response.next_attempt_at,
+            batch_id=response.batch_id,
+        )
+
+    def to_response(self) -> NotificationResponse:
+        return NotificationResponse(
+            id=self.id,
+            status=self.status,
+            successful_channels=self.successful_channels,
+            failed_channels=self.failed_channels,
+            attempts=self.attempts,
+            error_details=self.error_details,
+            created_at=self.created_at,
+            sent_at=self.sent_at,
+            next_attempt_at=self.next_attempt_at,
+            batch_id=self.batch_id,
+        )
+
+    def to_response_json(self) -> bytes:
+        """JSON ответа без построения NotificationResponse: поля ответа сериализуются из записи напрямую"""
+        return self.model_dump_json(include=RESPONSE_FIELDS).encode()
+
+
+class BatchItemResult(BaseModel):
+    index: int = Field(..., description='Позиция элемента в пакете')
+    id: str | None = Field(default=None, description='ID уведомления')
+    status: NotificationStatus | None = None
+    error: str | None = None
+
+
+class NotificationBatchResponse(BaseModel):
+    batch_id: str = Field(..., description='ID пакета')
+    total: int
+    accepted: int
+    failed: int
+    items: list[BatchItemResult] = Field(default_factory=list)
+
+
+class NotificationEvent(BaseModel):
+    """Событие потока статусов: переход состояния (status) или попытка отправки через канал (attempt)"""
+
+    type: Literal['status', 'attempt']
+    id: str = Field(..., description='ID уведомления')
+    batch_id: str | None = None
+    status: NotificationStatus
+    priority: NotificationPriority
+    channels: list[NotificationChannel]
+    channel: NotificationChannel | None = Field(default=None, description='Канал попытки')
+    attempt: int | None = Field(default=None, description='Номер попытки через канал')
+    result: str | None = Field(
+        default=None, description='Результат попытки: success, failure, error, circuit_open, cancelled'
+    )
+    error: str | None = None
+    next_attempt_at: datetime | None = None
+    sent_at: datetime | None = None
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+    @classmethod
+    def from_history(cls, record: NotificationHistory) -> 'NotificationEvent':
+        """Текущее состояние уведомления - первое событие подписки по ID"""
+        return cls(
+            type='status',
+            id=record.id,
+            batch_id=record.batch_id,
+            status=record.status,
+            priority=record.priority,
+            channels=record.channels,
+            next_attempt_at=record.next_attempt_at,
+            sent_at=record.sent_at,
+        )
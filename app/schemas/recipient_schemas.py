@@ -0,0 +1,40 @@
+from datetime import UTC, datetime
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.schemas.enum import NotificationChannel
+
+
+class RecipientCreate(BaseModel):
+    """
+    Получатель в реестре: контакты и предпочтительный порядок каналов.
+
+    При регистрации email приводится к нижнему регистру, телефон - к E.164, @username в Telegram -
+    к нижнему регистру; некорректный контакт отклоняется.
+    """
+
+    email: str | None = Field(default=None, max_length=320, description='Email')
+    phone: str | None = Field(default=None, max_length=32, description='Номер телефона')
+    telegram_id: str | None = Field(default=None, max_length=64, description='Telegram ID или @username')
+    channels: list[NotificationChannel] = Field(
+        default=[NotificationChannel.EMAIL, NotificationChannel.SMS, NotificationChannel.TELEGRAM],
+        description='Порядок каналов для уведомлений без channels; каналы без контакта пропускаются',
+    )
+
+    @field_validator('channels')
+    def validate_channels(cls, v: list[NotificationChannel]) -> list[NotificationChannel]:
+        if not v:
+            raise ValueError('Должен быть указан хотя бы один канал')
+        return list(dict.fromkeys(v))
+
+    @model_validator(mode='after')
+    def validate_contacts(self) -> 'RecipientCreate':
+        if self.email is None and self.phone is None and self.telegram_id is None:
+            raise ValueError('Нужно указать хотя бы один контакт')
+        return self
+
+
+class RecipientResponse(RecipientCreate):
+    id: str = Field(..., description='ID получателя')
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
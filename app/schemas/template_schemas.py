@@ -0,0 +1,27 @@
+from datetime import UTC, datetime
+
+from pydantic import BaseModel, Field
+
+from app.schemas.notification_schemas import MESSAGE_MAX_LENGTH, SUBJECT_MAX_LENGTH
+
+
+class TemplateCreate(BaseModel):
+    """
+    Шаблон уведомления. Переменные записываются как {{ name }}.
+
+    text используется для email (text/plain) и для каналов без собственного варианта,
+    html - альтернативная HTML-часть письма, sms и telegram (MarkdownV2) - варианты для этих каналов.
+    subject и text ограничены так же, как тема и текст уведомления без шаблона.
+    """
+
+    subject: str = Field(..., max_length=SUBJECT_MAX_LENGTH, description='Тема')
+    text: str = Field(..., max_length=MESSAGE_MAX_LENGTH, description='Текст')
+    html: str | None = Field(default=None, max_length=100000, description='HTML-версия письма')
+    sms: str | None = Field(default=None, max_length=2000, description='Текст SMS')
+    telegram: str | None = Field(default=None, max_length=4096, description='Сообщение Telegram в MarkdownV2')
+
+
+class TemplateResponse(TemplateCreate):
+    id: str = Field(..., description='ID шаблона')
+    variables: list[str] = Field(default_factory=list, description='Переменные, которые нужно передать')
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
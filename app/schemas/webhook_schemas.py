@@ -0,0 +1,52 @@
+from datetime import UTC, datetime
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.schemas.notification_schemas import NotificationResponse
+
+
+class WebhookCreate(BaseModel):
+    """Подписка клиента на итоговые статусы (sent, failed) его уведомлений"""
+
+    url: str = Field(..., max_length=2048, description='URL, на который отправляются итоговые статусы (POST)')
+    secret: str | None = Field(
+        default=None, min_length=16, max_length=256, description='Ключ подписи HMAC-SHA256; не задан - генерируется'
+    )
+    description: str | None = Field(default=None, max_length=255, description='Описание')
+
+    @field_validator('url')
+    def validate_url(cls, v: str) -> str:
+        parts = urlsplit(v)
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            raise ValueError('URL webhook должен быть абсолютным http(s) URL')
+        return v
+
+
+class WebhookResponse(BaseModel):
+    """Подписка без ключа подписи - ответ на список и получение подписок"""
+
+    id: str = Field(..., description='ID подписки')
+    url: str
+    description: str | None = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class WebhookCreated(WebhookResponse):
+    """Ответ на регистрацию: ключ подписи возвращается только здесь"""
+
+    secret: str = Field(..., description='Ключ подписи HMAC-SHA256')
+
+
+class WebhookRegistration(WebhookCreated):
+    """Запись реестра: подписка и клиент (хэш X-API-Key), которому она принадлежит"""
+
+    tenant: str
+
+
+class WebhookPayload(BaseModel):
+    """Тело запроса на webhook: итоговые статусы, накопленные для подписки"""
+
+    delivery_id: str = Field(..., description='ID отправки; повтор после ошибки приходит с тем же ID')
+    webhook_id: str
+    notifications: list[NotificationResponse]
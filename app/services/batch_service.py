@@ -0,0 +1,196 @@
+import asyncio
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+from loguru import logger
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.schemas.enum import NotificationStatus
+from app.schemas.notification_schemas import (
+    BatchItemResult,
+    NotificationBatchResponse,
+    NotificationRecipient,
+    NotificationRequest,
+)
+from app.services.dispatcher import NotificationDispatcher, QueueFullError, notification_dispatcher
+from app.services.notification_service import NotificationService, notification_service
+from app.services.rate_limiter import NotificationRateLimiter, RateLimitExceededError, rate_limiter
+from app.services.recipient_service import recipient_service
+from app.services.template_service import template_service
+from app.services.webhook_service import tenant_of
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return '; '.join(f'{".".join(str(loc) for loc in err["loc"])}: {err["msg"]}' for err in error.errors())
+
+
+class BatchService:
+    """Пакетная валидация и отправка уведомлений"""
+
+    def __init__(
+        self,
+        service: NotificationService,
+        dispatcher: NotificationDispatcher,
+        limiter: NotificationRateLimiter,
+        concurrency: int = settings.BATCH_CONCURRENCY,
+    ) -> None:
+        self.service = service
+        self.dispatcher = dispatcher
+        self.limiter = limiter
+        self.concurrency = concurrency
+
+    def validate(self, items: Iterable[Any]) -> list[NotificationRequest | str]:
+        """
+        Валидирует элементы пакета, возвращая запрос или текст ошибки для каждого элемента.
+
+        Одинаковые тема и текст проверяются один раз, а все элементы с ними ссылаются на общие строки.
+        """
+        contents: dict[tuple[str, str], tuple[str, str]] = {}
+        results: list[NotificationRequest | str] = []
+        for raw in items:
+            try:
+                results.append(template_service.apply(self._validate_item(raw, contents)))
+            except ValidationError as e:
+                results.append(format_validation_error(e))
+            except ValueError as e:
+                results.append(str(e))
+        return results
+
+    async def send_batch(self, items: Iterable[Any], api_key: str | None = None) -> NotificationBatchResponse:
+        batch_id = str(uuid.uuid4())
+        validated = await self._resolve_recipients(self.validate(items))
+        results = [
+            BatchItemResult(index=index, error=item) if isinstance(item, str) else BatchItemResult(index=index)
+            for index, item in enumerate(validated)
+        ]
+        valid = [(index, item) for index, item in enumerate(validated) if isinstance(item, NotificationRequest)]
+        tenant = tenant_of(api_key)
+        for _, request in valid:
+            request.tenant = tenant
+        if self.limiter.enabled:
+            valid = await self._apply_rate_limits(valid, results, api_key, batch_id)
+        if any(request.scheduled for _, request in valid):
+            valid = await self._schedule(valid, results, batch_id)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        if settings.DISPATCH_MODE != 'sync':
+
+            async def submit(index: int, request: NotificationRequest) -> None:
+                async with semaphore:
+                    try:
+                        response = await self.dispatcher.submit(request, batch_id)
+                        results[index].id = response.id
+                        results[index].status = response.status
+                    except QueueFullError as e:
+                        results[index].error = str(e)
+                    except Exception as e:
+                        logger.exception(f'Ошибка приёма элемента {index} пакета {batch_id}')
+                        results[index].error = str(e)
+
+            # До concurrency элементов принимаются одновременно, и их записи outbox фиксируются общими fsync
+            await asyncio.gather(*(submit(index, request) for index, request in valid))
+        else:
+
+            async def deliver(index: int, request: NotificationRequest) -> None:
+                async with semaphore:
+                    response = await self.service.create_notification(request, batch_id)
+                    results[index].id = response.id
+                    try:
+                        await self.service.deliver(response, request)
+                    except Exception as e:
+                        logger.exception(f'Ошибка отправки уведомления {response.id} из пакета {batch_id}')
+                        results[index].error = str(e)
+                    results[index].status = response.status
+
+            await asyncio.gather(*(deliver(index, request) for index, request in valid))
+
+        failed = sum(1 for result in results if result.error is not None or result.status == NotificationStatus.FAILED)
+        logger.info(f'Пакет {batch_id}: принято {len(results) - failed} из {len(results)}')
+        return NotificationBatchResponse(
+            batch_id=batch_id,
+            total=len(results),
+            accepted=len(results) - failed,
+            failed=failed,
+            items=results,
+        )
+
+    @staticmethod
+    async def _resolve_recipients(validated: list[NotificationRequest | str]) -> list[NotificationRequest | str]:
+        """Подставляет контакты получателей из реестра; ошибка разрешения становится ошибкой элемента"""
+        for index, item in enumerate(validated):
+            if isinstance(item, NotificationRequest) and item.recipient_id is not None:
+                try:
+                    await recipient_service.apply(item)
+                except ValueError as e:
+                    validated[index] = str(e)
+        return validated
+
+    async def _schedule(
+        self, valid: list[tuple[int, NotificationRequest]], results: list[BatchItemResult], batch_id: str
+    ) -> list[tuple[int, NotificationRequest]]:
+        """Откладывает элементы с send_at или delay; возвращает элементы к немедленной отправке"""
+
+        async def schedule(index: int, request: NotificationRequest) -> None:
+            try:
+                response = await self.service.schedule(request, batch_id)
+            except ValueError as e:
+                results[index].error = str(e)
+                return
+            results[index].id = response.id
+            results[index].status = response.status
+
+        await asyncio.gather(*(schedule(index, request) for index, request in valid if request.scheduled))
+        return [(index, request) for index, request in valid if not request.scheduled]
+
+    async def _apply_rate_limits(
+        self,
+        valid: list[tuple[int, NotificationRequest]],
+        results: list[BatchItemResult],
+        api_key: str | None,
+        batch_id: str,
+    ) -> list[tuple[int, NotificationRequest]]:
+        """Отклоняет элементы сверх лимита и откладывает отправку отложенных; возвращает элементы к отправке"""
+        admitted = []
+        for index, request in valid:
+            try:
+                delay = await self.limiter.check(request, api_key)
+            except RateLimitExceededError as e:
+                results[index].error = str(e)
+                continue
+            if delay > 0 and not request.scheduled:
+                response = await self.service.defer(request, delay, batch_id)
+                results[index].id = response.id
+                results[index].status = response.status
+            else:
+                admitted.append((index, request))
+        return admitted
+
+    @staticmethod
+    def _validate_item(raw: Any, contents: dict[tuple[str, str], tuple[str, str]]) -> NotificationRequest:
+        if isinstance(raw, ValueError):
+            raise raw
+        if not isinstance(raw, dict):
+            raise ValueError('Элемент пакета должен быть объектом')
+
+        subject, message = raw.get('subject'), raw.get('message')
+        if not (isinstance(subject, str) and isinstance(message, str)) or 'template_id' in raw:
+            return NotificationRequest.model_validate(raw)
+
+        cached = contents.get((subject, message))
+        if cached is None:
+            request = NotificationRequest.model_validate(raw)
+            contents[(subject, message)] = (request.subject, request.message)
+            return request
+
+        recipient = NotificationRecipient.model_validate(raw)
+        return NotificationRequest.model_construct(
+            _fields_set=recipient.model_fields_set | {'subject', 'message'},
+            **dict(recipient),
+            subject=cached[0],
+            message=cached[1],
+        )
+
+
+batch_service = BatchService(notification_service, notification_dispatcher, rate_limiter)
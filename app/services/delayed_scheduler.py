@@ -0,0 +1,103 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import Callable
+from typing import Any
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import IN_FLIGHT
+from app.services.scheduler import DispatchJob
+from app.services.shared_queue import QueuedNotification
+from app.utils.timer_wheel import TimerWheel
+
+
+def encode_delayed(job: DispatchJob) -> bytes:
+    return QueuedNotification(request=job.request, response=job.response).model_dump_json().encode()
+
+
+def decode_delayed(payload: bytes) -> DispatchJob:
+    queued = QueuedNotification.model_validate_json(payload)
+    return DispatchJob(response=queued.response, request=queued.request)
+
+
+class DelayedScheduler:
+    """
+    Отложенная отправка (send_at, delay) на иерархическом колесе таймеров.
+
+    До срока уведомление хранится в колесе как JSON запроса и состояния, а не как объекты pydantic,
+    поэтому миллионы отложенных уведомлений занимают немного памяти. Один фоновый цикл спит до ближайшего
+    тика колеса и передаёт созревшие уведомления в handler пачками по release_batch, уступая event loop
+    между пачками. Время - wall clock: срок задаётся абсолютным временем и переживает перезапуск через outbox.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[DispatchJob], None],
+        tick: float = settings.DELAYED_TICK_MS / 1000,
+        slots: int = settings.DELAYED_WHEEL_SLOTS,
+        levels: int = settings.DELAYED_WHEEL_LEVELS,
+        release_batch: int = settings.DELAYED_RELEASE_BATCH,
+    ) -> None:
+        self.handler = handler
+        self.release_batch = max(1, release_batch)
+        self.wheel: TimerWheel[bytes] = TimerWheel(tick, slots, levels, now=time.time())
+        self._wakeup = asyncio.Event()
+        # Время, до которого спит фоновый цикл; None - цикл ждёт первого уведомления
+        self._sleep_until: float | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self.wheel)
+
+    def schedule(self, job: DispatchJob, send_at: float) -> None:
+        """Откладывает уведомление до send_at (time.time()); уведомление с тем же ID заменяется"""
+        if not self.wheel:
+            # Пустое колесо не продвигается: догоняем текущее время, чтобы не проходить простой по тикам
+            self.wheel.advance(time.time())
+        self.wheel.schedule(job.response.id, send_at, encode_delayed(job))
+        if self._sleep_until is None or send_at < self._sleep_until:
+            self._wakeup.set()
+
+    def cancel(self, notification_id: str) -> DispatchJob | None:
+        """Снимает уведомление с ожидания; None - уведомления нет среди ожидающих"""
+        payload = self.wheel.cancel(notification_id)
+        return decode_delayed(payload) if payload is not None else None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='delayed-scheduler')
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self.wheel:
+            logger.info(f'DelayedScheduler остановлен, отложенных уведомлений: {len(self.wheel)}')
+
+    def stats(self) -> dict[str, Any]:
+        deadline = self.wheel.next_deadline()
+        next_in = max(0.0, deadline - time.time()) if deadline is not None else None
+        return {'pending': len(self.wheel), 'next_in': round(next_in, 3) if next_in is not None else None}
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            self._sleep_until = self.wheel.next_deadline()
+            timeout = self._sleep_until - time.time() if self._sleep_until is not None else None
+            if timeout is None or timeout > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+
+            due = self.wheel.advance(time.time())
+            for start in range(0, len(due), self.release_batch):
+                for notification_id, payload in due[start : start + self.release_batch]:
+                    try:
+                        self.handler(decode_delayed(payload))
+                        IN_FLIGHT.inc()
+                    except Exception:
+                        logger.exception(f'Ошибка передачи в отправку отложенного уведомления {notification_id}')
+                await asyncio.sleep(0)
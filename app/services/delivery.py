@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+
+from app.schemas.enum import NotificationChannel
+
+Outcome = bool | Exception
+
+
+@dataclass
+class ConcurrentResult:
+    """Итог параллельной отправки: результаты завершившихся каналов и каналы, отменённые после победы другого"""
+
+    outcomes: dict[NotificationChannel, Outcome] = field(default_factory=dict)
+    cancelled: list[NotificationChannel] = field(default_factory=list)
+    winner: NotificationChannel | None = None
+
+
+async def send_concurrently(
+    send: Callable[[NotificationChannel], Awaitable[bool]],
+    channels: Sequence[NotificationChannel],
+    first_wins: bool,
+    hedge_delay: Callable[[NotificationChannel], float] | None = None,
+) -> ConcurrentResult:
+    """
+    Отправляет по нескольким каналам в одной TaskGroup.
+
+    first_wins=False (broadcast) дожидается всех каналов. first_wins=True отменяет остальные отправки
+    после первого успеха. Без hedge_delay все каналы стартуют сразу (race); с hedge_delay следующий канал
+    запускается, если запущенные не ответили за hedge_delay(канал) или ответили неудачей (hedged).
+    """
+    result = ConcurrentResult()
+    tasks: dict[NotificationChannel, asyncio.Task[None]] = {}
+
+    async def attempt(channel: NotificationChannel) -> None:
+        try:
+            outcome: Outcome = await send(channel)
+        except Exception as e:
+            outcome = e
+        result.outcomes[channel] = outcome
+        if first_wins and outcome is True and result.winner is None:
+            result.winner = channel
+            for other, task in tasks.items():
+                if other != channel and not task.done():
+                    task.cancel()
+
+    async with asyncio.TaskGroup() as group:
+        for index, channel in enumerate(channels):
+            if result.winner is not None:
+                break
+            tasks[channel] = group.create_task(attempt(channel), name=f'send-{channel.value}')
+            if hedge_delay is None or index == len(channels) - 1:
+                continue
+            running = {task for task in tasks.values() if not task.done()}
+            if running:
+                await asyncio.wait(running, timeout=hedge_delay(channel), return_when=asyncio.FIRST_COMPLETED)
+
+    result.cancelled = [channel for channel, task in tasks.items() if task.cancelled()]
+    return result
@@ -0,0 +1,242 @@
+import asyncio
+from typing import Any
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import IN_FLIGHT
+from app.schemas.enum import NotificationPriority, NotificationStatus
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.services.notification_service import NotificationService, notification_service
+from app.services.retry_scheduler import RetryScheduler
+from app.services.scheduler import LANES_ORDER, DispatchJob, PriorityScheduler
+from app.services.shared_queue import decode_job, encode_job
+from app.workqueue.base import WorkItem
+
+# Пауза перед новой попыткой вернуть созревший повтор в переполненную очередь
+REQUEUE_DELAY = 1.0
+
+
+class QueueFullError(Exception):
+    """Очередь отправки переполнена"""
+
+
+class NotificationDispatcher:
+    """
+    Пул asyncio-воркеров, разбирающих приоритетную очередь уведомлений.
+
+    В режиме DISPATCH_MODE=shared submit кладёт уведомление в общую очередь service.work_queue,
+    а запущенный диспетчер (процесс python -m app.worker) забирает из неё задачи под аренду
+    в локальную приоритетную очередь, продлевает аренду, пока задачи в работе, и подтверждает
+    их после отправки.
+    """
+
+    def __init__(
+        self,
+        service: NotificationService,
+        workers: int = settings.DISPATCH_WORKERS,
+        urgent_workers: int = settings.DISPATCH_URGENT_RESERVED_WORKERS,
+        max_queue_size: int = settings.DISPATCH_QUEUE_MAX_SIZE,
+    ) -> None:
+        self.service = service
+        self.workers_count = workers
+        self.urgent_workers_count = urgent_workers
+        self.max_queue_size = max_queue_size
+        self.queue = PriorityScheduler(max_size=max_queue_size)
+        self._workers: list[asyncio.Task[None]] = []
+        self.work_queue = service.work_queue
+        self.visibility = settings.WORK_QUEUE_VISIBILITY_TIMEOUT
+        self.prefetch = settings.WORK_QUEUE_PREFETCH
+        # Задачи общей очереди, выданные этому процессу и ещё не подтверждённые
+        self._leased: dict[str, WorkItem] = {}
+        self._consumers: list[asyncio.Task[None]] = []
+        self._capacity_freed = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(i, LANES_ORDER), name=f'notification-worker-{i}')
+            for i in range(self.workers_count)
+        ]
+        # Резервные воркеры берут только URGENT, поэтому срочные уведомления не ждут,
+        # пока основные воркеры заняты медленными провайдерами
+        self._workers += [
+            asyncio.create_task(self._worker(i, (NotificationPriority.URGENT,)), name=f'notification-urgent-worker-{i}')
+            for i in range(self.urgent_workers_count)
+        ]
+        # Созревшие повторы и отложенные уведомления возвращаются в приоритетную очередь
+        # и разбираются общими воркерами
+        if isinstance(self.service.retries, RetryScheduler):
+            self.service.retries.handler = self.requeue
+        self.service.delayed.handler = self.requeue
+        if self.work_queue is not None:
+            self._consumers = [
+                asyncio.create_task(self._claim_loop(), name='work-queue-claim'),
+                asyncio.create_task(self._heartbeat_loop(), name='work-queue-heartbeat'),
+            ]
+        logger.info(
+            f'NotificationDispatcher запущен (workers: {self.workers_count}, '
+            f'urgent: {self.urgent_workers_count}, queue: {self.max_queue_size})'
+        )
+
+    async def stop(self, timeout: float = settings.DISPATCH_SHUTDOWN_TIMEOUT) -> None:
+        if not self.running:
+            return
+        # Новые задачи из общей очереди больше не забираем, уже выданные дорабатываем
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except TimeoutError:
+            logger.warning(f'Очередь не разобрана за {timeout}с, осталось {self.queue.qsize()} уведомлений')
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.work_queue is not None and self._leased:
+            # Недоставленные задачи сразу возвращаются в общую очередь другим процессам
+            await self.work_queue.release(list(self._leased.values()))
+            IN_FLIGHT.dec(len(self._leased))
+            self._leased.clear()
+        if isinstance(self.service.retries, RetryScheduler):
+            self.service.retries.handler = self.service.deliver_in_background
+        self.service.delayed.handler = self.service.deliver_in_background
+        logger.info('NotificationDispatcher остановлен')
+
+    async def submit(self, request: NotificationRequest, batch_id: str | None = None) -> NotificationResponse:
+        """Регистрирует уведомление и ставит его в очередь, не дожидаясь отправки"""
+        if self.work_queue is not None:
+            response = await self.service.create_notification(request, batch_id)
+            await self.work_queue.enqueue(encode_job(DispatchJob(response=response, request=request)))
+            # Дальше уведомлением занимается процесс доставки
+            IN_FLIGHT.dec()
+            return response
+        if self.queue.full():
+            raise QueueFullError(f'Очередь отправки переполнена ({self.max_queue_size})')
+        response = await self.service.create_notification(request, batch_id)
+        try:
+            self.queue.put_nowait(DispatchJob(response=response, request=request))
+        except asyncio.QueueFull:
+            await self.service.mark_failed(response, request, 'queue_full')
+            raise QueueFullError(f'Очередь отправки переполнена ({self.max_queue_size})')
+        return response
+
+    def requeue(self, job: DispatchJob) -> None:
+        """Возвращает уведомление, дождавшееся повторной попытки или срока отправки, в очередь"""
+        try:
+            self.queue.put_nowait(DispatchJob(response=job.response, request=job.request))
+        except asyncio.QueueFull:
+            logger.warning(f'Очередь переполнена, повтор уведомления {job.response.id} отложен на {REQUEUE_DELAY}с')
+            self.service.retries.schedule(job, REQUEUE_DELAY)
+
+    def stats(self) -> dict[str, Any]:
+        stats = {
+            'running': self.running,
+            'depth': self.queue.qsize(),
+            'lanes': self.queue.stats(),
+            'retries': self.service.retries.stats(),
+            'delayed': self.service.delayed.stats(),
+        }
+        if self.work_queue is not None:
+            stats['leased'] = len(self._leased)
+        return stats
+
+    async def _worker(self, worker_id: int, lanes: tuple[NotificationPriority, ...]) -> None:
+        while True:
+            job = await self.queue.get(lanes)
+            delivered = False
+            try:
+                await self.service.deliver(job.response, job.request)
+                delivered = True
+            except Exception as e:
+                logger.exception(f'Воркер {worker_id}: ошибка обработки уведомления {job.response.id}: {e!s}')
+            finally:
+                self.queue.task_done()
+                if job.item is not None:
+                    await self._complete(job, delivered)
+
+    async def _complete(self, job: DispatchJob, delivered: bool) -> None:
+        """
+        Завершает аренду задачи общей очереди.
+
+        Повтор к этому моменту уже поставлен в общую очередь (аренда снята), поэтому ack удаляет задачу
+        только при итоговом статусе. После ошибки обработки задача не подтверждается и вернётся
+        в очередь по окончании аренды.
+        """
+        assert job.item is not None
+        self._leased.pop(job.item.id, None)
+        self._capacity_freed.set()
+        if job.response.status not in (NotificationStatus.SENT, NotificationStatus.FAILED):
+            IN_FLIGHT.dec()
+        if not delivered or self.work_queue is None:
+            return
+        try:
+            await self.work_queue.ack(job.item)
+        except Exception as e:
+            logger.error(f'Ошибка подтверждения задачи {job.item.id} общей очереди: {e!s}')
+
+    async def _claim_loop(self) -> None:
+        """Забирает задачи из общей очереди, пока есть свободные воркеры и место под prefetch"""
+        assert self.work_queue is not None
+        capacity = self.workers_count + self.urgent_workers_count + self.prefetch
+        poll_interval = settings.WORK_QUEUE_POLL_INTERVAL_MS / 1000
+        while True:
+            free = capacity - len(self._leased)
+            if free <= 0:
+                self._capacity_freed.clear()
+                await self._capacity_freed.wait()
+                continue
+            try:
+                items = await self.work_queue.claim(self._quotas(free), free, self.visibility)
+            except Exception as e:
+                logger.error(f'Ошибка получения задач из общей очереди: {e!s}')
+                items = []
+            for item in items:
+                await self._accept(item)
+            if len(items) < free:
+                await asyncio.sleep(poll_interval)
+
+    def _quotas(self, limit: int) -> dict[str, int]:
+        """Доли полос в выдаче по весам планировщика; каждой полосе - хотя бы одна задача"""
+        total = sum(self.queue.weights.values())
+        return {p.value: max(1, limit * self.queue.weights[p] // total) for p in LANES_ORDER}
+
+    async def _accept(self, item: WorkItem) -> None:
+        assert self.work_queue is not None
+        try:
+            job = decode_job(item)
+        except ValueError as e:
+            logger.error(f'Некорректная задача {item.id} общей очереди удалена: {e!s}')
+            await self.work_queue.ack(item)
+            return
+        IN_FLIGHT.inc()
+        if item.deliveries > settings.WORK_QUEUE_MAX_DELIVERIES:
+            # Задача раз за разом не подтверждается (например, роняет процесс) - больше не выдаём
+            logger.error(f'Уведомление {item.id} выдано {item.deliveries} раз без подтверждения, отмечено failed')
+            await self.service.mark_failed(job.response, job.request, 'max_deliveries')
+            await self._complete(job, delivered=True)
+            return
+        self._leased[item.id] = item
+        self.queue.put_nowait(job)
+
+    async def _heartbeat_loop(self) -> None:
+        """Продлевает аренду выданных процессу задач, пока они ждут в локальной очереди или отправляются"""
+        assert self.work_queue is not None
+        while True:
+            await asyncio.sleep(self.visibility / 3)
+            if not self._leased:
+                continue
+            try:
+                await self.work_queue.extend(list(self._leased.values()), self.visibility)
+            except Exception as e:
+                logger.warning(f'Ошибка продления аренды задач общей очереди: {e!s}')
+
+
+notification_dispatcher = NotificationDispatcher(notification_service)
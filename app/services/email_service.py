@@ -1,40 +1,146 @@
 import asyncio
-import secrets
+from email.message import EmailMessage as MIMEMessage
+from typing import NamedTuple
 
+import aiosmtplib
 from loguru import logger
 
 from app.core.config import settings
+from app.core.logger_config import hot_logger
+from app.core.metrics import instrument_provider
+from app.services.smtp_pool import SMTPConnectionPool
+from app.utils.batcher import MicroBatcher
+from app.utils.concurrency_limit import AdaptiveConcurrencyLimiter
+from app.utils.contacts import is_valid_email
+from app.utils.mock_provider import MockProvider
+
+
+class EmailMessage(NamedTuple):
+    to_email: str
+    subject: str
+    message: str
+    html: str | None = None
 
 
 class EmailService:
     def __init__(self) -> None:
         self.enabled = settings.EMAIL_ENABLED
-        logger.info(f'EmailService инициализирован (enabled: {self.enabled})')
+        self.backend = settings.EMAIL_BACKEND
+        self.sender = settings.EMAIL_FROM or settings.EMAIL_USERNAME or f'noreply@{settings.EMAIL_HOST}'
+        self.pool: SMTPConnectionPool | None = None
+        self.mock = MockProvider.from_settings('email')
+        if self.backend == 'smtp':
+            implicit_tls = settings.EMAIL_USE_TLS and settings.EMAIL_PORT == 465
+            self.pool = SMTPConnectionPool(
+                hostname=settings.EMAIL_HOST,
+                port=settings.EMAIL_PORT,
+                username=settings.EMAIL_USERNAME,
+                password=settings.EMAIL_PASSWORD,
+                use_tls=implicit_tls,
+                start_tls=settings.EMAIL_USE_TLS and not implicit_tls,
+                max_size=settings.EMAIL_POOL_SIZE,
+                idle_timeout=settings.EMAIL_POOL_IDLE_TIMEOUT,
+                max_messages=settings.EMAIL_POOL_MAX_MESSAGES_PER_CONNECTION,
+                health_check_interval=settings.EMAIL_POOL_HEALTH_CHECK_INTERVAL,
+                timeout=settings.EMAIL_TIMEOUT,
+            )
+        self.concurrency = AdaptiveConcurrencyLimiter.from_settings('email')
+        self.batcher: MicroBatcher[EmailMessage, bool] = MicroBatcher(
+            self.concurrency.wrap(instrument_provider('email', self.send_email_batch)),
+            max_size=settings.EMAIL_BATCH_SIZE,
+            linger_ms=settings.EMAIL_BATCH_LINGER_MS,
+            name='email-batcher',
+        )
+        logger.info(f'EmailService инициализирован (enabled: {self.enabled}, backend: {self.backend})')
 
     async def send_email(
         self,
         to_email: str,
         subject: str,
         message: str,
+        html: str | None = None,
     ) -> bool:
         if not self.enabled:
             logger.warning('Email отправка отключена')
             return False
 
-        logger.info(f'Отправка email to={to_email} subject={subject}')
-        logger.debug(f'Сообщение: {message[:100]}...')
+        hot_logger.info('Отправка email to={} subject={}', to_email, subject)
+        hot_logger.opt(lazy=True).debug('Сообщение: {}...', lambda: message[:100])
+        return await self.batcher.submit(EmailMessage(to_email, subject, message, html))
 
+    async def send_email_batch(self, messages: list[EmailMessage]) -> list[bool | BaseException]:
+        """Отправляет пакет писем одним обращением к провайдеру, результат - по каждому получателю"""
+        if self.pool is not None:
+            return await self._send_smtp_batch(self.pool, messages)
         try:
-            await asyncio.sleep(secrets.SystemRandom().uniform(0.1, 0.5))
-            if secrets.SystemRandom().random() < 0.8:
-                logger.info(f'Email успешно отправлен to={to_email}')
-                return True
-            logger.warning(f'Mock: не удалось отправить Email to={to_email}')
-            return False
+            outcomes = await self.mock.send(len(messages))
+            results: list[bool | BaseException] = []
+            for item, outcome in zip(messages, outcomes, strict=True):
+                if outcome is None:
+                    hot_logger.info('Email успешно отправлен to={}', item.to_email)
+                    results.append(True)
+                elif outcome == 'reject':
+                    logger.warning('Mock: не удалось отправить Email to={}', item.to_email)
+                    results.append(False)
+                else:
+                    results.append(self.mock.error(outcome, f'Email {item.to_email}'))
+            return results
 
         except Exception as e:
             logger.error(f'Ошибка отправки Email: {e!s}')
             raise RuntimeError(f'Ошибка отправки Email: {e!s}')
 
+    async def start(self) -> None:
+        if self.pool is not None:
+            await self.pool.start()
+
+    async def close(self) -> None:
+        if self.pool is not None:
+            await self.batcher.drain()
+            await self.pool.close()
+
+    async def _send_smtp_batch(
+        self, pool: SMTPConnectionPool, messages: list[EmailMessage]
+    ) -> list[bool | BaseException]:
+        """Делит пакет между соединениями пула; письма одной части уходят по одному соединению"""
+        parts = min(pool.max_size, len(messages))
+        chunks = [list(range(i, len(messages), parts)) for i in range(parts)]
+        results: list[bool | BaseException] = [False] * len(messages)
+
+        async def send_chunk(indexes: list[int]) -> None:
+            done = 0
+            try:
+                while done < len(indexes):
+                    async with pool.connection() as conn:
+                        while done < len(indexes) and conn.messages_sent < pool.max_messages:
+                            index = indexes[done]
+                            results[index] = await self._send_smtp_message(conn.smtp, messages[index])
+                            conn.messages_sent += 1
+                            done += 1
+            except (aiosmtplib.SMTPException, OSError) as e:
+                logger.error(f'Ошибка SMTP соединения: {e!s}')
+                error = RuntimeError(f'Ошибка отправки Email: {e!s}')
+                for index in indexes[done:]:
+                    results[index] = error
+
+        await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        return results
+
+    async def _send_smtp_message(self, smtp: aiosmtplib.SMTP, item: EmailMessage) -> bool:
+        mime = MIMEMessage()
+        mime['From'] = self.sender
+        mime['To'] = item.to_email
+        mime['Subject'] = item.subject
+        mime.set_content(item.message)
+        if item.html is not None:
+            mime.add_alternative(item.html, subtype='html')
+        try:
+            await smtp.send_message(mime)
+        except (aiosmtplib.SMTPRecipientsRefused, aiosmtplib.SMTPSenderRefused, aiosmtplib.SMTPDataError) as e:
+            logger.warning('SMTP отклонил письмо to={}: {}', item.to_email, e)
+            return False
+        hot_logger.info('Email успешно отправлен to={}', item.to_email)
+        return True
+
     async def validate_email(self, email: str) -> bool:
-        return '@' in email and '.' in email
+        return is_valid_email(email)
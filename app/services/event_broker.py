@@ -0,0 +1,182 @@
+import asyncio
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import EVENT_SUBSCRIBERS, EVENT_SUBSCRIBERS_DROPPED_TOTAL
+from app.schemas.enum import NotificationChannel, NotificationPriority, NotificationStatus
+from app.schemas.notification_schemas import NotificationEvent, NotificationRequest, NotificationResponse
+
+
+class TooManySubscribersError(Exception):
+    """Достигнуто EVENTS_MAX_SUBSCRIBERS подписчиков"""
+
+
+@dataclass(slots=True, frozen=True)
+class EventFilters:
+    """Фильтры подписки; tenant - клиент подписчика: события чужих уведомлений не доставляются"""
+
+    tenant: str | None = None
+    notification_id: str | None = None
+    batch_id: str | None = None
+    status: NotificationStatus | None = None
+    channel: NotificationChannel | None = None
+    priority: NotificationPriority | None = None
+
+    def matches(self, event: NotificationEvent, tenant: str | None) -> bool:
+        return (
+            tenant == self.tenant
+            and (self.notification_id is None or event.id == self.notification_id)
+            and (self.batch_id is None or event.batch_id == self.batch_id)
+            and (self.status is None or event.status == self.status)
+            and (self.channel is None or (self.channel in event.channels and event.channel in (None, self.channel)))
+            and (self.priority is None or event.priority == self.priority)
+        )
+
+
+class Subscription:
+    """
+    Подписка на поток событий с ограниченным буфером.
+
+    Буфер хранит событие вместе с готовым JSON: JSON собирается один раз на событие для всех подписчиков.
+    Переполненный буфер означает, что клиент не успевает читать: подписка отключается от брокера,
+    клиент дочитывает накопленное и получает признак overflowed.
+    """
+
+    def __init__(self, filters: EventFilters, buffer_size: int) -> None:
+        self.filters = filters
+        self.buffer_size = buffer_size
+        self.buffer: deque[tuple[NotificationEvent, str]] = deque()
+        self.overflowed = False
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def push(self, event: NotificationEvent, message: str) -> bool:
+        """Кладёт событие в буфер; False - буфер переполнен"""
+        if len(self.buffer) >= self.buffer_size:
+            self.overflowed = True
+            self._ready.set()
+            return False
+        self.buffer.append((event, message))
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def get(self) -> tuple[NotificationEvent, str] | None:
+        """Следующее событие; None - подписка закрыта или переполнена и буфер дочитан"""
+        while not self.buffer:
+            if self.closed or self.overflowed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        return self.buffer.popleft()
+
+
+class NotificationEventBroker:
+    """
+    Рассылка событий статусов подписчикам внутри процесса.
+
+    Публикация синхронная и не ждёт подписчиков: событие кладётся в буфер каждой подходящей подписки,
+    а подписка с переполненным буфером отключается, поэтому медленный клиент не задерживает отправку.
+    Подписки по ID уведомления и пакета находятся по индексу, остальные проверяются фильтром;
+    без подписчиков событие не создаётся.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = settings.EVENTS_BUFFER_SIZE,
+        max_subscribers: int = settings.EVENTS_MAX_SUBSCRIBERS,
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.by_id: defaultdict[str, set[Subscription]] = defaultdict(set)
+        self.by_batch: defaultdict[str, set[Subscription]] = defaultdict(set)
+        self.other: set[Subscription] = set()
+        self.subscribers = 0
+        self.dropped = 0
+
+    def subscribe(self, filters: EventFilters) -> Subscription:
+        if self.subscribers >= self.max_subscribers:
+            raise TooManySubscribersError(f'Достигнут лимит подписчиков на события ({self.max_subscribers})')
+        subscription = Subscription(filters, self.buffer_size)
+        index, key = self._index(filters)
+        (index[key] if index is not None else self.other).add(subscription)
+        self.subscribers += 1
+        EVENT_SUBSCRIBERS.set(self.subscribers)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        index, key = self._index(subscription.filters)
+        subscriptions = index.get(key) if index is not None else self.other
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if index is not None and not subscriptions:
+            del index[key]
+        self.subscribers -= 1
+        EVENT_SUBSCRIBERS.set(self.subscribers)
+        subscription.close()
+
+    def publish(
+        self,
+        response: NotificationResponse,
+        request: NotificationRequest,
+        channel: NotificationChannel | None = None,
+        attempt: int | None = None,
+        result: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Событие status (без channel) или attempt - попытка через channel"""
+        if not self.subscribers:
+            return
+        candidates = [*self.other, *self.by_id.get(response.id, ())]
+        if response.batch_id is not None:
+            candidates.extend(self.by_batch.get(response.batch_id, ()))
+        if not candidates:
+            return
+        event = NotificationEvent(
+            type='status' if channel is None else 'attempt',
+            id=response.id,
+            batch_id=response.batch_id,
+            status=response.status,
+            priority=request.priority,
+            channels=request.channels,
+            channel=channel,
+            attempt=attempt,
+            result=result,
+            error=error,
+            next_attempt_at=response.next_attempt_at,
+            sent_at=response.sent_at,
+        )
+        message: str | None = None
+        for subscription in candidates:
+            if not subscription.filters.matches(event, request.tenant):
+                continue
+            message = message or event.model_dump_json()
+            if not subscription.push(event, message):
+                self._drop(subscription)
+
+    def stats(self) -> dict[str, int]:
+        return {'subscribers': self.subscribers, 'dropped': self.dropped}
+
+    def _index(self, filters: EventFilters) -> tuple[defaultdict[str, set[Subscription]] | None, str]:
+        """Индекс подписки и ключ в нём; None - подписка без ID проверяется фильтром на каждом событии"""
+        if filters.notification_id is not None:
+            return self.by_id, filters.notification_id
+        if filters.batch_id is not None:
+            return self.by_batch, filters.batch_id
+        return None, ''
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        self.dropped += 1
+        EVENT_SUBSCRIBERS_DROPPED_TOTAL.inc()
+        logger.warning(f'Подписчик на события отключён: буфер из {self.buffer_size} событий переполнен')
+
+
+event_broker = NotificationEventBroker()
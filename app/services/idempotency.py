@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.metrics import IDEMPOTENT_REPLAYS_TOTAL
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.utils.ttl_cache import TTLCache
+
+
+class IdempotencyConflictError(Exception):
+    """Ключ идемпотентности уже использован для запроса с другим содержимым"""
+
+
+@dataclass
+class IdempotencyEntry:
+    fingerprint: str
+    result: asyncio.Future[NotificationResponse]
+
+
+def content_fingerprint(request: NotificationRequest) -> str:
+    """Хэш клиента, получателя и содержимого уведомления: одинаковые уведомления разных клиентов не совпадают"""
+    send_at = request.send_at.isoformat() if request.send_at is not None else None
+    delay = str(request.delay) if request.delay is not None else None
+    parts = (
+        request.tenant,
+        request.email,
+        request.phone,
+        request.telegram_id,
+        request.subject,
+        request.message,
+        send_at,
+        delay,
+    )
+    return hashlib.sha256('\x1f'.join(part or '' for part in parts).encode()).hexdigest()
+
+
+class IdempotencyService:
+    """
+    Подавление повторных отправок по заголовку Idempotency-Key и по хэшу содержимого.
+
+    Запись создаётся до отправки и хранит future с результатом, поэтому одновременные дубликаты
+    дожидаются той же отправки, а не отклоняются. Неудачная отправка запись удаляет, и повтор
+    клиента отправляется заново.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.IDEMPOTENCY_TTL_SECONDS,
+        max_keys: int = settings.IDEMPOTENCY_MAX_KEYS,
+        content_window: float = settings.IDEMPOTENCY_CONTENT_DEDUP_SECONDS,
+    ) -> None:
+        self.keys: TTLCache[str, IdempotencyEntry] = TTLCache(max_keys, ttl)
+        self.contents: TTLCache[str, IdempotencyEntry] = TTLCache(max_keys, content_window)
+        self.content_window = content_window
+
+    async def submit(
+        self,
+        request: NotificationRequest,
+        key: str | None,
+        send: Callable[[], Awaitable[NotificationResponse]],
+    ) -> tuple[NotificationResponse, bool]:
+        """Возвращает результат send() и признак того, что он взят у более раннего запроса"""
+        fingerprint = content_fingerprint(request)
+        lookups: list[tuple[str, TTLCache[str, IdempotencyEntry], str]] = []
+        if key is not None:
+            # Ключи выбирают клиенты независимо друг от друга, поэтому ключ действует в пределах клиента
+            lookups.append(('key', self.keys, f'{request.tenant or ""}\x1f{key}'))
+        if self.content_window > 0:
+            lookups.append(('content', self.contents, fingerprint))
+        if not lookups:
+            return await send(), False
+
+        for source, cache, cache_key in lookups:
+            entry = cache.get(cache_key)
+            if entry is None:
+                continue
+            if source == 'key' and entry.fingerprint != fingerprint:
+                raise IdempotencyConflictError(f'Ключ идемпотентности {key} использован для другого уведомления')
+            IDEMPOTENT_REPLAYS_TOTAL.labels(source).inc()
+            # shield: отмена ожидающего дубликата не должна отменять исходную отправку
+            return await asyncio.shield(entry.result), True
+
+        entry = IdempotencyEntry(fingerprint, asyncio.get_running_loop().create_future())
+        for _, cache, cache_key in lookups:
+            cache.set(cache_key, entry)
+        try:
+            response = await send()
+        except BaseException as e:
+            for _, cache, cache_key in lookups:
+                if cache.get(cache_key) is entry:
+                    cache.pop(cache_key)
+            if isinstance(e, Exception):
+                entry.result.set_exception(e)
+                # Помечаем исключение полученным: дубликатов, ожидающих результат, может не быть
+                entry.result.exception()
+            else:
+                entry.result.cancel()
+            raise
+        entry.result.set_result(response)
+        return response, False
+
+    def stats(self) -> dict[str, int]:
+        return {'keys': len(self.keys), 'contents': len(self.contents)}
+
+
+idempotency_service = IdempotencyService()
@@ -1,106 +1,544 @@
+import asyncio
+import math
+import time
 import uuid
-from datetime import UTC, datetime
+from collections.abc import Awaitable
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from loguru import logger
 
+from app.core.config import settings
+from app.core.logger_config import hot_logger
+from app.core.metrics import (
+    DELIVERED_TOTAL,
+    FALLBACK_DEPTH,
+    IN_FLIGHT,
+    RETRIES_TOTAL,
+    SEND_DURATION,
+    SEND_TOTAL,
+)
+from app.schemas.enum import FINAL_STATUSES, DeliveryStrategy
 from app.schemas.notification_schemas import (
     NotificationChannel,
+    NotificationHistory,
     NotificationRequest,
     NotificationResponse,
     NotificationStatus,
 )
+from app.services.delayed_scheduler import DelayedScheduler
+from app.services.delivery import send_concurrently
 from app.services.email_service import EmailService
+from app.services.event_broker import event_broker
+from app.services.outbox import NotificationOutbox
+from app.services.retry_scheduler import RetryScheduler
+from app.services.scheduler import DispatchJob
+from app.services.shared_queue import SharedRetryScheduler, decode_job, encode_job
 from app.services.sms_service import SMSService
 from app.services.telegram_service import TelegramService
-from app.utils.retry import retry_async
+from app.services.template_service import template_service
+from app.services.webhook_dispatcher import webhook_dispatcher
+from app.storage.base import HistoryFilters, HistoryKey, NotificationStore
+from app.storage.factory import create_notification_store
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.retry import RetryConfig
+from app.utils.ttl_cache import TTLCache
+from app.workqueue.base import WorkQueue
+from app.workqueue.factory import create_work_queue
+
+
+class NotificationNotCancellableError(Exception):
+    """Уведомление уже передано в отправку или завершено"""
 
 
 class NotificationService:
-    def __init__(self) -> None:
+    def __init__(self, store: NotificationStore | None = None, outbox: NotificationOutbox | None = None) -> None:
         self.email_service = EmailService()
         self.sms_service = SMSService()
         self.telegram_service = TelegramService()
-        self.notification_history: dict[str, NotificationResponse] = {}
-        self.channel_services = {
+        self.store = store or create_notification_store()
+        self.outbox = outbox or NotificationOutbox()
+        self._prune_task: asyncio.Task[None] | None = None
+        self._background: set[asyncio.Task[NotificationResponse]] = set()
+        # JSON итоговых состояний для страниц истории: итоговое состояние больше не меняется, поэтому записи
+        # не устаревают и вытесняются только по размеру; записи удалённых очисткой уведомлений просто не читаются
+        self.response_cache: TTLCache[str, bytes] = TTLCache(settings.STORAGE_RESPONSE_CACHE_SIZE, math.inf)
+        self.retry_config = RetryConfig(
+            max_attempts=settings.MAX_RETRY_ATTEMPTS,
+            initial_delay=settings.RETRY_DELAY,
+            backoff_factor=settings.RETRY_BACKOFF_FACTOR,
+            max_delay=settings.RETRY_MAX_DELAY,
+            jitter=settings.RETRY_JITTER,
+        )
+        # При DISPATCH_MODE=shared уведомления и их повторы хранятся в общей очереди процессов доставки
+        self.work_queue: WorkQueue | None = create_work_queue() if settings.DISPATCH_MODE == 'shared' else None
+        self.retries: RetryScheduler | SharedRetryScheduler = (
+            SharedRetryScheduler(self.work_queue)
+            if self.work_queue is not None
+            else RetryScheduler(self.deliver_in_background)
+        )
+        # Отложенные уведомления (send_at, delay); при DISPATCH_MODE=shared их сроки хранит общая очередь
+        self.delayed = DelayedScheduler(self.deliver_in_background)
+        self.channel_services: dict[NotificationChannel, Any] = {
             NotificationChannel.EMAIL: self.email_service,
             NotificationChannel.SMS: self.sms_service,
             NotificationChannel.TELEGRAM: self.telegram_service,
         }
+        self.breakers = {
+            channel: CircuitBreaker(
+                channel.value,
+                failure_rate_threshold=settings.CIRCUIT_FAILURE_RATE_THRESHOLD,
+                window_seconds=settings.CIRCUIT_WINDOW_SECONDS,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+                half_open_max_calls=settings.CIRCUIT_HALF_OPEN_MAX_CALLS,
+            )
+            for channel in self.channel_services
+        }
         logger.info('NotificationService инициализирован')
 
-    async def send_notification(self, request: NotificationRequest) -> NotificationResponse:
-        notification_id = str(uuid.uuid4())
-        logger.info(f'Начинаем отправку уведомления {notification_id}')
-        logger.info(f'Получатель: {request.email}')
-        logger.info(f'Каналы: {[c.value for c in request.channels]}')
+    async def send_notification(
+        self, request: NotificationRequest, batch_id: str | None = None
+    ) -> NotificationResponse:
+        response = await self.create_notification(request, batch_id)
+        await self.deliver(response, request)
+        if response.status == NotificationStatus.FAILED:
+            raise RuntimeError(f'Уведомление {response.id} не было отправлено ни одним каналом')
+        return response
 
+    async def create_notification(
+        self, request: NotificationRequest, batch_id: str | None = None, next_attempt_at: datetime | None = None
+    ) -> NotificationResponse:
+        """Регистрирует уведомление в статусе PENDING без отправки"""
+        notification_id = str(uuid.uuid4())
         response = NotificationResponse(
             id=notification_id,
             status=NotificationStatus.PENDING,
             successful_channels=[],
             failed_channels=[],
             attempts={},
+            next_attempt_at=next_attempt_at,
+            batch_id=batch_id,
+        )
+        await self.outbox.accept(response, request)
+        await self.store.save(NotificationHistory.from_notification(response, request))
+        event_broker.publish(response, request)
+        IN_FLIGHT.inc()
+        hot_logger.bind(notification_id=notification_id).info(
+            'Уведомление {} зарегистрировано (priority: {})', notification_id, request.priority.value
         )
+        return response
 
-        successful_channels = []
-        failed_channels = []
-        error_details: dict[str, str] = {}
+    async def defer(
+        self, request: NotificationRequest, delay: float, batch_id: str | None = None
+    ) -> NotificationResponse:
+        """Регистрирует уведомление и откладывает отправку на delay секунд (через RetryScheduler)"""
+        response = await self.create_notification(request, batch_id)
+        response.next_attempt_at = datetime.now(UTC) + timedelta(seconds=delay)
+        await self._save(response, request)
+        self.retries.schedule(DispatchJob(response=response, request=request), delay)
+        return response
+
+    async def schedule(self, request: NotificationRequest, batch_id: str | None = None) -> NotificationResponse:
+        """
+        Регистрирует уведомление с send_at или delay и откладывает отправку до срока.
+
+        delay заменяется абсолютным временем send_at, поэтому срок не сдвигается при восстановлении
+        после перезапуска. Отложенное уведомление не считается находящимся в работе до наступления срока.
+        """
+        now = datetime.now(UTC)
+        send_at = request.send_at or now + timedelta(seconds=request.delay or 0.0)
+        if send_at - now > timedelta(days=settings.DELAYED_MAX_DAYS):
+            raise ValueError(f'Отправку можно отложить не более чем на {settings.DELAYED_MAX_DAYS:g} дней')
+        request.send_at, request.delay = send_at, None
+        response = await self.create_notification(request, batch_id, next_attempt_at=send_at)
+        job = DispatchJob(response=response, request=request)
+        if self.work_queue is not None:
+            await self.work_queue.enqueue(encode_job(job), (send_at - now).total_seconds())
+        else:
+            self.delayed.schedule(job, send_at.timestamp())
+        IN_FLIGHT.dec()
+        hot_logger.bind(notification_id=response.id).info(
+            'Уведомление {} отложено до {}', response.id, send_at.isoformat()
+        )
+        return response
+
+    async def cancel(self, notification_id: str) -> NotificationResponse | None:
+        """
+        Отменяет отложенное уведомление, ещё не переданное в отправку; None - уведомление не найдено.
+
+        NotificationNotCancellableError, если уведомление уже отправляется или завершено.
+        """
+        job = await self._take_delayed(notification_id)
+        if job is None:
+            if await self.store.get(notification_id) is None:
+                return None
+            raise NotificationNotCancellableError(f'Уведомление {notification_id} уже передано в отправку')
+        response = job.response
+        response.status = NotificationStatus.CANCELLED
+        response.next_attempt_at = None
+        await self._save(response, job.request)
+        logger.info(f'Отложенное уведомление {notification_id} отменено')
+        return response
+
+    async def _take_delayed(self, notification_id: str) -> DispatchJob | None:
+        if self.work_queue is None:
+            return self.delayed.cancel(notification_id)
+        item = await self.work_queue.cancel(notification_id)
+        if item is None:
+            return None
+        job = decode_job(item)
+        if job.response.status != NotificationStatus.PENDING:
+            # Срока в общей очереди ждут и повторы: повтор возвращается в очередь с прежним сроком
+            next_attempt_at = job.response.next_attempt_at
+            delay = (next_attempt_at - datetime.now(UTC)).total_seconds() if next_attempt_at else 0.0
+            await self.work_queue.enqueue(item, delay)
+            return None
+        return job
+
+    async def deliver(self, response: NotificationResponse, request: NotificationRequest) -> NotificationResponse:
+        """
+        Отправляет уведомление по каналам согласно request.strategy.
+
+        Попытки по каналам и отказавшие каналы хранятся в response, поэтому после неудачной
+        попытки уведомление переводится в RETRYING и планируется повторный вызов deliver через
+        RetryScheduler, а не ожидание внутри корутины.
+        """
+        notification_id = response.id
+        log = hot_logger.bind(notification_id=notification_id)
+        if response.status == NotificationStatus.RETRYING:
+            log.info('Повторная отправка уведомления {} (попытки: {})', notification_id, response.attempts)
+        else:
+            log.info('Начинаем отправку уведомления {}', notification_id)
+            log.opt(lazy=True).debug(
+                'Получатель: {}, каналы: {}', lambda: request.email, lambda: [c.value for c in request.channels]
+            )
+
+        error_details = dict(response.error_details or {})
+        response.next_attempt_at = None
+
+        if request.strategy != DeliveryStrategy.FALLBACK:
+            return await self._deliver_concurrently(response, request, error_details)
 
         for channel in request.channels:
-            service = self.channel_services.get(channel)
+            if channel in response.failed_channels:
+                continue
+            service = self.channel_services[channel]
+            attempt = response.attempts.get(channel.value, 0) + 1
             try:
-                ok = await self._send_with_retry(service, channel, request, notification_id)
-                response.attempts[channel.value] = response.attempts.get(channel.value, 0) + 1
-                if ok:
-                    successful_channels.append(channel)
-                    response.sent_at = datetime.now(UTC)
-                    break
-                failed_channels.append(channel)
+                ok = await self._send_attempt(service, channel, request)
+            except CircuitOpenError as e:
+                # Канал заведомо недоступен - сразу переходим к следующему без повторов
+                response.failed_channels.append(channel)
+                error_details[channel.value] = str(e)
+                event_broker.publish(response, request, channel, result='circuit_open', error=str(e))
+                continue
             except Exception as e:
-                failed_channels.append(channel)
+                attempt_log = log.bind(channel=channel.value, attempt=attempt)
+                attempt_log.exception('Ошибка отправки уведомления {} через {}', notification_id, channel.value)
+                response.attempts[channel.value] = attempt
                 error_details[channel.value] = str(e)
+                event_broker.publish(response, request, channel, attempt, 'error', str(e))
+                if attempt < self.retry_config.max_attempts:
+                    response.error_details = error_details
+                    await self._schedule_retry(response, request, [channel])
+                    return response
+                attempt_log.error(
+                    'Попытки исчерпаны для канала {} уведомления {}: {}', channel.value, notification_id, e
+                )
+                response.failed_channels.append(channel)
+                continue
+
+            response.attempts[channel.value] = attempt
+            event_broker.publish(response, request, channel, attempt, 'success' if ok else 'failure')
+            if ok:
+                error_details.pop(channel.value, None)
+                response.successful_channels.append(channel)
+                response.sent_at = datetime.now(UTC)
+                break
+            response.failed_channels.append(channel)
 
-        response.successful_channels = successful_channels
-        response.failed_channels = failed_channels
+        return await self._finish(response, request, error_details)
+
+    async def _deliver_concurrently(
+        self, response: NotificationResponse, request: NotificationRequest, error_details: dict[str, str]
+    ) -> NotificationResponse:
+        """
+        Стратегии broadcast, race и hedged.
+
+        Попытка засчитывается каждому запущенному каналу, в том числе отменённому после победы другого:
+        запрос к провайдеру к этому моменту мог уже уйти. Отменённые каналы не попадают ни в успешные,
+        ни в отказавшие. Каналы с исключением повторяются через RetryScheduler, пока не исчерпаны попытки,
+        если уведомление ещё не доставлено (для broadcast - пока не опрошены все каналы).
+        """
+        log = hot_logger.bind(notification_id=response.id)
+        done = {*response.successful_channels, *response.failed_channels}
+        channels = [channel for channel in request.channels if channel not in done]
+
+        def send(channel: NotificationChannel) -> Awaitable[bool]:
+            return self._send_attempt(self.channel_services[channel], channel, request)
+
+        result = await send_concurrently(
+            send,
+            channels,
+            first_wins=request.strategy != DeliveryStrategy.BROADCAST,
+            hedge_delay=self._hedge_delay if request.strategy == DeliveryStrategy.HEDGED else None,
+        )
+
+        retry: list[NotificationChannel] = []
+        for channel in channels:
+            if channel in result.cancelled:
+                response.attempts[channel.value] = response.attempts.get(channel.value, 0) + 1
+                event_broker.publish(response, request, channel, response.attempts[channel.value], 'cancelled')
+                continue
+            if channel not in result.outcomes:
+                continue
+            outcome = result.outcomes[channel]
+            if isinstance(outcome, CircuitOpenError):
+                response.failed_channels.append(channel)
+                error_details[channel.value] = str(outcome)
+                event_broker.publish(response, request, channel, result='circuit_open', error=str(outcome))
+                continue
+            attempt = response.attempts.get(channel.value, 0) + 1
+            response.attempts[channel.value] = attempt
+            if isinstance(outcome, bool):
+                event_broker.publish(response, request, channel, attempt, 'success' if outcome else 'failure')
+            else:
+                event_broker.publish(response, request, channel, attempt, 'error', str(outcome))
+            if outcome is True:
+                error_details.pop(channel.value, None)
+                response.successful_channels.append(channel)
+                response.sent_at = response.sent_at or datetime.now(UTC)
+            elif outcome is False:
+                response.failed_channels.append(channel)
+            else:
+                log.bind(channel=channel.value, attempt=attempt).opt(exception=outcome).error(
+                    'Ошибка отправки уведомления {} через {}', response.id, channel.value
+                )
+                error_details[channel.value] = str(outcome)
+                if attempt < self.retry_config.max_attempts:
+                    retry.append(channel)
+                else:
+                    response.failed_channels.append(channel)
+
+        if retry and (request.strategy == DeliveryStrategy.BROADCAST or result.winner is None):
+            response.error_details = error_details
+            await self._schedule_retry(response, request, retry)
+            return response
+        # Доставлено через другой канал - ошибки остальных считаются окончательными
+        response.failed_channels.extend(retry)
+        return await self._finish(response, request, error_details)
+
+    def _hedge_delay(self, channel: NotificationChannel) -> float:
+        """p95 длительности отправки через канал; HEDGE_DELAY_SECONDS, пока замеров мало"""
+        if settings.HEDGE_QUANTILE <= 0:
+            return settings.HEDGE_DELAY_SECONDS
+        histogram = SEND_DURATION.labels(channel.value)
+        if histogram.count < settings.HEDGE_MIN_SAMPLES:
+            return settings.HEDGE_DELAY_SECONDS
+        return histogram.quantile(settings.HEDGE_QUANTILE) or settings.HEDGE_DELAY_SECONDS
+
+    async def _finish(
+        self, response: NotificationResponse, request: NotificationRequest, error_details: dict[str, str]
+    ) -> NotificationResponse:
+        notification_id = response.id
+        log = hot_logger.bind(notification_id=notification_id)
         response.error_details = error_details if error_details else None
 
-        if successful_channels:
+        if response.successful_channels:
             response.status = NotificationStatus.SENT
-            logger.info(f'Уведомление {notification_id} успешно отправлено')
+            log.info('Уведомление {} успешно отправлено', notification_id)
         else:
             response.status = NotificationStatus.FAILED
-            logger.error(f'Уведомление {notification_id} не было отправлено ни одним каналом')
-            raise RuntimeError(f'Уведомление {notification_id} не было отправлено ни одним каналом')
+            log.error('Уведомление {} не было отправлено ни одним каналом', notification_id)
 
-        self.notification_history[notification_id] = response
+        self._observe_final(response, request)
+        await self._save(response, request)
         return response
 
-    @retry_async(max_attempts=3, delay=2)
-    async def _send_with_retry(
-        self, service: Any, channel: NotificationChannel,
-        request: NotificationRequest, notification_id: str
-    ) -> bool:
+    def deliver_in_background(self, job: DispatchJob) -> None:
+        """Обработчик созревших повторов, когда очередь отправки не запущена (DISPATCH_MODE=sync)"""
+        task = asyncio.create_task(self.deliver(job.response, job.request), name=f'retry-{job.response.id}')
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _schedule_retry(
+        self, response: NotificationResponse, request: NotificationRequest, channels: list[NotificationChannel]
+    ) -> None:
+        attempt = max(response.attempts[channel.value] for channel in channels)
+        names = ', '.join(channel.value for channel in channels)
+        delay = self.retry_config.compute_delay(attempt)
+        response.status = NotificationStatus.RETRYING
+        response.next_attempt_at = datetime.now(UTC) + timedelta(seconds=delay)
+        logger.bind(notification_id=response.id, channel=names, attempt=attempt).warning(
+            'Попытка {} отправки уведомления {} через {} не удалась. Повтор через {:.2f}с',
+            attempt,
+            response.id,
+            names,
+            delay,
+        )
+        for channel in channels:
+            RETRIES_TOTAL.labels(channel.value).inc()
+        await self._save(response, request)
+        self.retries.schedule(DispatchJob(response=response, request=request), delay)
+
+    async def _save(self, response: NotificationResponse, request: NotificationRequest) -> None:
+        """Сохраняет новое состояние уведомления в хранилище и в outbox"""
+        await self.outbox.transition(response)
+        await self.store.save(NotificationHistory.from_notification(response, request))
+        event_broker.publish(response, request)
+        webhook_dispatcher.notify(response, request)
+
+    async def recover(self) -> int:
+        """
+        Возвращает в отправку уведомления, не получившие итогового статуса до перезапуска (из outbox).
+
+        Вызывается после запуска очереди отправки: созревшие повторы передаются в её обработчик.
+        """
+        jobs = self.outbox.take_recovered()
+        now = datetime.now(UTC)
+        for job in jobs:
+            request = job.request
+            if request.template_id is not None and template_service.get(request.template_id) is None:
+                # Шаблоны хранятся в памяти: отправляем тему и текст, отрендеренные при приёме
+                logger.warning(
+                    f'Шаблон {request.template_id} уведомления {job.response.id} не найден после перезапуска'
+                )
+                request.template_id = None
+            await self.store.save(NotificationHistory.from_notification(job.response, request))
+            next_attempt_at = job.response.next_attempt_at
+            if request.send_at is not None and job.response.status == NotificationStatus.PENDING:
+                # Отложенное уведомление ждёт срока в колесе таймеров (наступивший срок - до ближайшего тика)
+                self.delayed.schedule(job, (next_attempt_at or request.send_at).timestamp())
+                continue
+            IN_FLIGHT.inc()
+            self.retries.schedule(job, (next_attempt_at - now).total_seconds() if next_attempt_at else 0.0)
+        if jobs:
+            logger.info(f'Из outbox восстановлено незавершённых уведомлений: {len(jobs)}')
+        return len(jobs)
+
+    @staticmethod
+    def _observe_final(response: NotificationResponse, request: NotificationRequest) -> None:
+        IN_FLIGHT.dec()
+        depth = len(response.successful_channels) + len(response.failed_channels)
+        FALLBACK_DEPTH.labels(response.status.value).observe(depth)
+        DELIVERED_TOTAL.labels(response.status.value, request.priority.value).inc()
+
+    async def mark_failed(self, response: NotificationResponse, request: NotificationRequest, reason: str) -> None:
+        """Переводит уведомление в FAILED без попыток отправки"""
+        response.status = NotificationStatus.FAILED
+        response.error_details = {'dispatch': reason}
+        self._observe_final(response, request)
+        await self._save(response, request)
+
+    async def _send_attempt(self, service: Any, channel: NotificationChannel, request: NotificationRequest) -> bool:
+        """Одна попытка отправки через канал; результат учитывается circuit breaker канала"""
+        # Отключённый канал не влияет на состояние circuit breaker
+        if not service.enabled:
+            return await self._send_via(service, channel, request)
+
+        breaker = self.breakers[channel]
+        if not breaker.allow():
+            SEND_TOTAL.labels(channel.value, request.priority.value, 'circuit_open').inc()
+            raise CircuitOpenError(channel.value)
+        started = time.perf_counter()
         try:
-            if channel == NotificationChannel.EMAIL:
-                return await service.send_email(request.email, request.subject, request.message)
-            if channel == NotificationChannel.SMS:
-                return await service.send_sms(request.phone, request.message)
-            if channel == NotificationChannel.TELEGRAM:
-                return await service.send_telegram(request.telegram_id, request.message)
+            ok = await self._send_via(service, channel, request)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
         except Exception:
-            logger.exception(f'Ошибка отправки через {channel.value}')
+            SEND_DURATION.labels(channel.value).observe(time.perf_counter() - started)
+            SEND_TOTAL.labels(channel.value, request.priority.value, 'failure').inc()
+            breaker.record(success=False)
             raise
+        SEND_DURATION.labels(channel.value).observe(time.perf_counter() - started)
+        SEND_TOTAL.labels(channel.value, request.priority.value, 'success' if ok else 'failure').inc()
+        breaker.record(success=ok)
+        return ok
 
+    @staticmethod
+    async def _send_via(service: Any, channel: NotificationChannel, request: NotificationRequest) -> bool:
+        content = template_service.render(request, channel)
+        if channel == NotificationChannel.EMAIL:
+            return bool(await service.send_email(request.email, content.subject, content.text, content.html))
+        if channel == NotificationChannel.SMS:
+            return bool(await service.send_sms(request.phone, content.text))
+        if channel == NotificationChannel.TELEGRAM:
+            return bool(await service.send_telegram(request.telegram_id, content.text, content.parse_mode))
         return False
 
+    def channels_health(self) -> dict[str, dict[str, Any]]:
+        return {
+            channel.value: {
+                'enabled': service.enabled,
+                **self.breakers[channel].snapshot(),
+                'concurrency': service.concurrency.snapshot(),
+            }
+            for channel, service in self.channel_services.items()
+        }
+
+    async def start(self) -> None:
+        await self.store.start()
+        await self.outbox.start()
+        if self.work_queue is not None:
+            await self.work_queue.start()
+        await self.retries.start()
+        await self.delayed.start()
+        await self.email_service.start()
+        if settings.STORAGE_RETENTION_DAYS > 0 and self._prune_task is None:
+            self._prune_task = asyncio.create_task(self._prune_loop(), name='notification-store-prune')
+
+    async def close(self) -> None:
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            await asyncio.gather(self._prune_task, return_exceptions=True)
+            self._prune_task = None
+        await self.retries.stop()
+        await self.delayed.stop()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        await self.email_service.close()
+        await self.telegram_service.close()
+        await self.outbox.close()
+        if self.work_queue is not None:
+            await self.work_queue.close()
+        await self.store.close()
+
     async def get_notification_status(self, notification_id: str) -> NotificationResponse | None:
-        return self.notification_history.get(notification_id)
+        record = await self.store.get(notification_id)
+        return record.to_response() if record else None
+
+    async def get_notification_history(
+        self,
+        limit: int = 100,
+        before: HistoryKey | None = None,
+        after: HistoryKey | None = None,
+        filters: HistoryFilters | None = None,
+    ) -> list[NotificationHistory]:
+        return await self.store.history(limit, before=before, after=after, filters=filters)
 
-    async def get_notification_history(self, limit: int = 100) -> list[NotificationResponse]:
-        history = list(self.notification_history.values())
-        history.sort(key=lambda x: x.created_at, reverse=True)
-        return history[:limit]
+    def response_json(self, record: NotificationHistory) -> bytes:
+        """JSON ответа по записи истории; для итогового состояния сериализуется один раз"""
+        if record.status not in FINAL_STATUSES:
+            return record.to_response_json()
+        data = self.response_cache.get(record.id)
+        if data is None:
+            data = record.to_response_json()
+            self.response_cache.set(record.id, data)
+        return data
+
+    async def _prune_loop(self) -> None:
+        """Периодически удаляет записи старше STORAGE_RETENTION_DAYS"""
+        while True:
+            try:
+                cutoff = datetime.now(UTC) - timedelta(days=settings.STORAGE_RETENTION_DAYS)
+                removed = await self.store.prune(cutoff)
+                if removed:
+                    logger.info(f'Удалено {removed} устаревших уведомлений')
+            except Exception as e:
+                logger.error(f'Ошибка очистки хранилища уведомлений: {e!s}')
+            await asyncio.sleep(settings.STORAGE_PRUNE_INTERVAL_SECONDS)
 
 
 notification_service = NotificationService()
@@ -0,0 +1,128 @@
+from typing import Any, Literal
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+from app.schemas.enum import FINAL_STATUSES
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.services.scheduler import DispatchJob
+from app.utils.wal import WriteAheadLog
+
+
+class OutboxRecord(BaseModel):
+    """Запись журнала: accept - принятое уведомление с запросом, state - новое состояние уведомления"""
+
+    op: Literal['accept', 'state']
+    response: NotificationResponse
+    request: NotificationRequest | None = None
+
+
+def accept_payload(request_json: bytes, response_json: bytes) -> bytes:
+    return b'{"op":"accept","request":' + request_json + b',"response":' + response_json + b'}'
+
+
+def state_payload(response_json: bytes) -> bytes:
+    return b'{"op":"state","response":' + response_json + b'}'
+
+
+class NotificationOutbox:
+    """
+    Журнал принятых уведомлений для восстановления после перезапуска.
+
+    Приём уведомления и каждый переход состояния (PENDING, RETRYING, SENT/FAILED) дописываются в WAL
+    и подтверждаются после fsync. В памяти держатся только незавершённые уведомления: из них собирается
+    snapshot при уплотнении журнала, а при старте - список уведомлений для повторной отправки.
+    """
+
+    def __init__(self, wal: WriteAheadLog | None = None) -> None:
+        # При DISPATCH_MODE=shared принятые уведомления и так хранятся в общей очереди
+        self.enabled = settings.OUTBOX_ENABLED and settings.DISPATCH_MODE != 'shared'
+        self.wal = wal or WriteAheadLog(
+            settings.OUTBOX_DIR,
+            segment_bytes=settings.OUTBOX_SEGMENT_BYTES,
+            fsync=settings.OUTBOX_FSYNC,
+            commit_delay=settings.OUTBOX_COMMIT_DELAY_MS / 1000,
+        )
+        self.wal.snapshot = self._snapshot
+        # id -> (запрос, последнее состояние) в JSON незавершённых уведомлений
+        self.live: dict[str, tuple[bytes, bytes]] = {}
+        self._recovered: list[DispatchJob] = []
+
+    async def start(self) -> None:
+        """Читает журнал, запоминает незавершённые уведомления и открывает уплотнённый журнал"""
+        if not self.enabled:
+            return
+        for payload in await self.wal.load():
+            try:
+                record = OutboxRecord.model_validate_json(payload)
+            except ValidationError as e:
+                logger.warning(f'Outbox: пропущена некорректная запись: {e!s}')
+                continue
+            self._apply(record)
+        self._recovered = [
+            DispatchJob(
+                response=NotificationResponse.model_validate_json(response_json),
+                request=NotificationRequest.model_validate_json(request_json),
+            )
+            for request_json, response_json in self.live.values()
+        ]
+        await self.wal.open()
+
+    async def close(self) -> None:
+        if self.enabled:
+            await self.wal.close()
+
+    async def accept(self, response: NotificationResponse, request: NotificationRequest) -> None:
+        """Записывает принятое уведомление; возвращается после fsync"""
+        if not self.enabled:
+            return
+        request_json = request.model_dump_json().encode()
+        response_json = response.model_dump_json().encode()
+        self.live[response.id] = (request_json, response_json)
+        try:
+            await self.wal.append(accept_payload(request_json, response_json))
+        except Exception:
+            self.live.pop(response.id, None)
+            raise
+
+    async def transition(self, response: NotificationResponse) -> None:
+        """Записывает новое состояние уведомления; итоговый статус убирает его из незавершённых"""
+        if not self.enabled:
+            return
+        entry = self.live.get(response.id)
+        if entry is None:
+            return
+        response_json = response.model_dump_json().encode()
+        if response.status in FINAL_STATUSES:
+            del self.live[response.id]
+        else:
+            self.live[response.id] = (entry[0], response_json)
+        await self.wal.append(state_payload(response_json))
+
+    def take_recovered(self) -> list[DispatchJob]:
+        """Незавершённые уведомления, прочитанные из журнала при старте (отдаются один раз)"""
+        recovered, self._recovered = self._recovered, []
+        return recovered
+
+    def stats(self) -> dict[str, Any]:
+        if not self.enabled:
+            return {'enabled': False}
+        return {'enabled': True, 'unfinished': len(self.live), **self.wal.stats()}
+
+    def _apply(self, record: OutboxRecord) -> None:
+        notification_id = record.response.id
+        if record.op == 'accept' and record.request is not None:
+            request_json = record.request.model_dump_json().encode()
+        elif notification_id in self.live:
+            request_json = self.live[notification_id][0]
+        else:
+            # Состояние уведомления, уже завершённого до уплотнения журнала
+            return
+        if record.response.status in FINAL_STATUSES:
+            self.live.pop(notification_id, None)
+        else:
+            self.live[notification_id] = (request_json, record.response.model_dump_json().encode())
+
+    def _snapshot(self) -> list[bytes]:
+        return [accept_payload(request_json, response_json) for request_json, response_json in self.live.values()]
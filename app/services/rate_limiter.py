@@ -0,0 +1,96 @@
+import math
+
+from app.core.config import settings
+from app.core.metrics import RATE_LIMITED_TOTAL
+from app.ratelimit.base import RateLimitRule, RateLimitStore
+from app.ratelimit.factory import create_rate_limit_store
+from app.schemas.enum import NotificationChannel
+from app.schemas.notification_schemas import NotificationRequest
+
+ANONYMOUS = 'anonymous'
+
+
+class RateLimitExceededError(Exception):
+    def __init__(self, limit: str, retry_after: float) -> None:
+        super().__init__(f'Превышен лимит {limit}, повтор через {math.ceil(retry_after)}с')
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+class NotificationRateLimiter:
+    """
+    Лимиты на приём уведомлений: по API-ключу, по каналу для API-ключа и по адресу получателя в канале.
+
+    Уведомление списывается из лимитов всех запрошенных каналов, включая резервные каналы fallback, которые
+    могут и не понадобиться: иначе резервный канал отправлял бы без лимита. Политика reject отклоняет запрос
+    сверх лимита, defer принимает его с отложенной отправкой, если лимит освободится не позже чем через
+    RATE_LIMIT_MAX_DEFER_SECONDS.
+    """
+
+    def __init__(self, store: RateLimitStore | None = None) -> None:
+        self.store = store or create_rate_limit_store()
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        self.max_delay = settings.RATE_LIMIT_MAX_DEFER_SECONDS if settings.RATE_LIMIT_POLICY == 'defer' else 0.0
+        self.channel_limits = {
+            NotificationChannel.EMAIL: settings.RATE_LIMIT_EMAIL_PER_MINUTE,
+            NotificationChannel.SMS: settings.RATE_LIMIT_SMS_PER_MINUTE,
+            NotificationChannel.TELEGRAM: settings.RATE_LIMIT_TELEGRAM_PER_MINUTE,
+        }
+
+    def rules(self, request: NotificationRequest, api_key: str | None) -> list[RateLimitRule]:
+        tenant = api_key or ANONYMOUS
+        rules = []
+        if settings.RATE_LIMIT_API_KEY_PER_MINUTE > 0:
+            per_minute = settings.RATE_LIMIT_API_KEY_PER_MINUTE
+            rules.append(RateLimitRule(f'api_key:{tenant}', per_minute / 60, per_minute))
+        for channel in request.channels:
+            per_minute = self.channel_limits[channel]
+            if per_minute > 0:
+                rules.append(RateLimitRule(f'channel:{tenant}:{channel.value}', per_minute / 60, per_minute))
+            if settings.RATE_LIMIT_RECIPIENT_PER_HOUR > 0:
+                per_hour = settings.RATE_LIMIT_RECIPIENT_PER_HOUR
+                address = recipient_address(request, channel)
+                rules.append(RateLimitRule(f'recipient:{channel.value}:{address}', per_hour / 3600, per_hour))
+        return rules
+
+    async def check(self, request: NotificationRequest, api_key: str | None) -> float:
+        """Возвращает задержку отправки (0 - сразу) или бросает RateLimitExceededError"""
+        if not self.enabled:
+            return 0.0
+        rules = self.rules(request, api_key)
+        if not rules:
+            return 0.0
+        result = await self.store.acquire(rules, self.max_delay)
+        if result.exceeded is None:
+            return result.delay
+        limit = limit_name(result.exceeded)
+        if not result.allowed:
+            RATE_LIMITED_TOTAL.labels(limit, 'rejected').inc()
+            raise RateLimitExceededError(limit, result.delay)
+        RATE_LIMITED_TOTAL.labels(limit, 'deferred').inc()
+        return result.delay
+
+    async def start(self) -> None:
+        if self.enabled:
+            await self.store.start()
+
+    async def close(self) -> None:
+        if self.enabled:
+            await self.store.close()
+
+
+def limit_name(key: str) -> str:
+    """Вид лимита без API-ключа и адреса получателя: api_key, channel:sms, recipient:email"""
+    kind, _, rest = key.partition(':')
+    if kind == 'channel':
+        return f'{kind}:{rest.rsplit(":", 1)[-1]}'
+    if kind == 'recipient':
+        return f'{kind}:{rest.split(":", 1)[0]}'
+    return kind
+
+
+def recipient_address(request: NotificationRequest, channel: NotificationChannel) -> str:
+    return request.contact(channel) or ''
+
+
+rate_limiter = NotificationRateLimiter()
@@ -0,0 +1,143 @@
+import uuid
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.metrics import RECIPIENT_CACHE_TOTAL
+from app.recipients.base import RecipientStore
+from app.recipients.factory import create_recipient_store
+from app.schemas.enum import NotificationChannel
+from app.schemas.notification_schemas import NotificationRequest
+from app.schemas.recipient_schemas import RecipientCreate, RecipientResponse
+from app.utils.contacts import normalize_chat_id, normalize_email, normalize_phone
+from app.utils.ttl_cache import TTLCache
+
+
+class RecipientNotFoundError(ValueError):
+    """Получатель не зарегистрирован"""
+
+
+class ResolvedRecipient(NamedTuple):
+    email: str | None
+    phone: str | None
+    telegram_id: str | None
+    # Предпочтительный порядок каналов, для которых есть контакт получателя
+    channels: tuple[NotificationChannel, ...]
+
+
+class RecipientService:
+    """
+    Реестр получателей с кэшем разрешённых контактов.
+
+    Контакты нормализуются и проверяются один раз при регистрации. При приёме уведомления по recipient_id
+    они берутся из LRU-кэша, поэтому на пути отправки нет разбора адресов. Изменение и удаление
+    получателя сбрасывают запись кэша в этом процессе, а TTL ограничивает устаревание записей других
+    процессов при общем хранилище.
+    """
+
+    def __init__(self, store: RecipientStore | None = None) -> None:
+        self.store = store or create_recipient_store()
+        self.cache: TTLCache[str, ResolvedRecipient] = TTLCache(
+            settings.RECIPIENT_CACHE_SIZE, settings.RECIPIENT_CACHE_TTL_SECONDS
+        )
+        # Растёт при каждом изменении реестра: чтение, начатое до изменения, не кладёт результат в кэш
+        self._version = 0
+
+    async def start(self) -> None:
+        await self.store.start()
+
+    async def close(self) -> None:
+        await self.store.close()
+
+    async def register(self, recipient: RecipientCreate, recipient_id: str | None = None) -> RecipientResponse:
+        """Регистрирует получателя или заменяет контакты получателя с recipient_id"""
+        contacts = self.normalize(recipient)
+        existing = await self.store.get(recipient_id) if recipient_id is not None else None
+        registered = RecipientResponse(
+            id=recipient_id or str(uuid.uuid4()),
+            created_at=existing.created_at if existing is not None else datetime.now(UTC),
+            **contacts.model_dump(),
+        )
+        self._invalidate(registered.id)
+        await self.store.save(registered)
+        self._invalidate(registered.id)
+        logger.info(f'{"Обновлён" if existing else "Зарегистрирован"} получатель {registered.id}')
+        return registered
+
+    async def get(self, recipient_id: str) -> RecipientResponse | None:
+        return await self.store.get(recipient_id)
+
+    async def delete(self, recipient_id: str) -> bool:
+        self._invalidate(recipient_id)
+        deleted = await self.store.delete(recipient_id)
+        self._invalidate(recipient_id)
+        return deleted
+
+    async def resolve(self, recipient_id: str) -> ResolvedRecipient:
+        resolved = self.cache.get(recipient_id)
+        if resolved is not None:
+            RECIPIENT_CACHE_TOTAL.labels('hit').inc()
+            return resolved
+        RECIPIENT_CACHE_TOTAL.labels('miss').inc()
+        version = self._version
+        recipient = await self.store.get(recipient_id)
+        if recipient is None:
+            raise RecipientNotFoundError(f'Получатель {recipient_id} не найден')
+        contacts = {
+            NotificationChannel.EMAIL: recipient.email,
+            NotificationChannel.SMS: recipient.phone,
+            NotificationChannel.TELEGRAM: recipient.telegram_id,
+        }
+        resolved = ResolvedRecipient(
+            email=recipient.email,
+            phone=recipient.phone,
+            telegram_id=recipient.telegram_id,
+            channels=tuple(channel for channel in recipient.channels if contacts[channel] is not None),
+        )
+        if version == self._version:
+            self.cache.set(recipient_id, resolved)
+        return resolved
+
+    async def apply(self, request: NotificationRequest) -> NotificationRequest:
+        """
+        Подставляет в запрос с recipient_id контакты из реестра (переданные в запросе имеют приоритет)
+        и порядок каналов получателя, если channels не передан.
+        """
+        if request.recipient_id is None:
+            return request
+        resolved = await self.resolve(request.recipient_id)
+        request.email = request.email or resolved.email
+        request.phone = request.phone or resolved.phone
+        request.telegram_id = request.telegram_id or resolved.telegram_id
+        if 'channels' not in request.model_fields_set:
+            if not resolved.channels:
+                raise ValueError(f'Получатель {request.recipient_id}: нет контактов для предпочтительных каналов')
+            request.channels = list(resolved.channels)
+        missing = [channel.value for channel in request.channels if request.contact(channel) is None]
+        if missing:
+            raise ValueError(f'Получатель {request.recipient_id}: нет контактов для каналов: {", ".join(missing)}')
+        return request
+
+    @staticmethod
+    def normalize(recipient: RecipientCreate) -> RecipientCreate:
+        """Контакты в нормализованном виде; ValueError, если контакт некорректен"""
+        return recipient.model_copy(
+            update={
+                'email': normalize_email(recipient.email) if recipient.email is not None else None,
+                'phone': normalize_phone(
+                    recipient.phone, settings.RECIPIENT_COUNTRY_CODE, settings.RECIPIENT_TRUNK_PREFIX
+                )
+                if recipient.phone is not None
+                else None,
+                'telegram_id': normalize_chat_id(recipient.telegram_id) if recipient.telegram_id is not None else None,
+            }
+        )
+
+    def _invalidate(self, recipient_id: str) -> None:
+        self._version += 1
+        self.cache.pop(recipient_id)
+
+
+recipient_service = RecipientService()
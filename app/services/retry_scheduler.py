@@ -0,0 +1,69 @@
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from typing import Any
+
+from loguru import logger
+
+from app.services.scheduler import DispatchJob
+
+
+class RetryScheduler:
+    """
+    Отложенные повторные попытки на куче по времени следующей попытки.
+
+    Ожидающая повтора отправка занимает только запись в куче, а не приостановленную корутину;
+    один фоновый цикл спит до ближайшего срока и передаёт созревшие задачи в handler.
+    """
+
+    def __init__(self, handler: Callable[[DispatchJob], None]) -> None:
+        self.handler = handler
+        self._heap: list[tuple[float, int, DispatchJob]] = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, job: DispatchJob, delay: float) -> None:
+        due_at = time.monotonic() + max(0.0, delay)
+        heapq.heappush(self._heap, (due_at, next(self._counter), job))
+        if self._heap[0][2] is job:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='retry-scheduler')
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._heap:
+            logger.warning(f'RetryScheduler остановлен, отменено повторов: {len(self._heap)}')
+
+    def stats(self) -> dict[str, Any]:
+        next_in = max(0.0, self._heap[0][0] - time.monotonic()) if self._heap else None
+        return {'pending': len(self._heap), 'next_in': round(next_in, 3) if next_in is not None else None}
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+            if timeout is None or timeout > 0:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, job = heapq.heappop(self._heap)
+                try:
+                    self.handler(job)
+                except Exception:
+                    logger.exception(f'Ошибка повторной постановки уведомления {job.response.id}')
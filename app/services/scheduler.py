@@ -0,0 +1,182 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.metrics import QUEUE_WAIT
+from app.schemas.enum import NotificationPriority
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.workqueue.base import WorkItem
+
+LANES_ORDER = (
+    NotificationPriority.URGENT,
+    NotificationPriority.HIGH,
+    NotificationPriority.NORMAL,
+    NotificationPriority.LOW,
+)
+
+
+@dataclass(slots=True)
+class DispatchJob:
+    response: NotificationResponse
+    request: NotificationRequest
+    enqueued_at: float = field(default_factory=time.monotonic)
+    # Задача общей очереди с арендой (DISPATCH_MODE=shared)
+    item: WorkItem | None = None
+
+    @property
+    def priority(self) -> NotificationPriority:
+        return self.request.priority
+
+
+class WaitLatency:
+    """Скользящая выборка времени ожидания в очереди для одного приоритета"""
+
+    def __init__(self, size: int = 1024) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'p50': round(self.percentile(0.50), 4),
+            'p95': round(self.percentile(0.95), 4),
+            'p99': round(self.percentile(0.99), 4),
+        }
+
+
+class PriorityScheduler:
+    """
+    Очередь с отдельной полосой на каждый приоритет.
+
+    Полосы выбираются по smooth weighted round-robin, а задача, ожидающая дольше
+    aging_seconds, обслуживается вне очереди, поэтому LOW не голодает при потоке URGENT.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.DISPATCH_QUEUE_MAX_SIZE,
+        weights: dict[NotificationPriority, int] | None = None,
+        aging_seconds: float = settings.SCHEDULER_AGING_SECONDS,
+    ) -> None:
+        self.max_size = max_size
+        self.aging_seconds = aging_seconds
+        self.weights = weights or {
+            NotificationPriority.URGENT: settings.SCHEDULER_WEIGHT_URGENT,
+            NotificationPriority.HIGH: settings.SCHEDULER_WEIGHT_HIGH,
+            NotificationPriority.NORMAL: settings.SCHEDULER_WEIGHT_NORMAL,
+            NotificationPriority.LOW: settings.SCHEDULER_WEIGHT_LOW,
+        }
+        self.lanes: dict[NotificationPriority, deque[DispatchJob]] = {p: deque() for p in LANES_ORDER}
+        self.wait_latency: dict[NotificationPriority, WaitLatency] = {p: WaitLatency() for p in LANES_ORDER}
+        self._current_weight: dict[NotificationPriority, int] = dict.fromkeys(LANES_ORDER, 0)
+        self._getters: deque[tuple[frozenset[NotificationPriority], asyncio.Future[None]]] = deque()
+        self._size = 0
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def full(self) -> bool:
+        return self._size >= self.max_size
+
+    def put_nowait(self, job: DispatchJob) -> None:
+        if self.full():
+            raise asyncio.QueueFull
+        self.lanes[job.priority].append(job)
+        self._size += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._wakeup(job.priority)
+
+    async def get(self, lanes: Iterable[NotificationPriority] = LANES_ORDER) -> DispatchJob:
+        allowed = frozenset(lanes)
+        while not self._available(allowed):
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            entry = (allowed, waiter)
+            self._getters.append(entry)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if entry in self._getters:
+                    self._getters.remove(entry)
+                elif self._size:
+                    # Пробуждение уже получено - передаём следующему ожидающему
+                    self._wakeup_any()
+                raise
+        return self._pop(allowed)
+
+    def task_done(self) -> None:
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._finished.set()
+
+    async def join(self) -> None:
+        await self._finished.wait()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {p.value: {'depth': len(self.lanes[p]), **self.wait_latency[p].snapshot()} for p in LANES_ORDER}
+
+    def _available(self, allowed: frozenset[NotificationPriority]) -> bool:
+        return any(self.lanes[p] for p in allowed)
+
+    def _pop(self, allowed: frozenset[NotificationPriority]) -> DispatchJob:
+        lane = self._aged_lane(allowed) or self._weighted_lane(allowed)
+        job = self.lanes[lane].popleft()
+        self._size -= 1
+        waited = time.monotonic() - job.enqueued_at
+        self.wait_latency[lane].observe(waited)
+        QUEUE_WAIT.labels(lane.value).observe(waited)
+        return job
+
+    def _aged_lane(self, allowed: frozenset[NotificationPriority]) -> NotificationPriority | None:
+        deadline = time.monotonic() - self.aging_seconds
+        oldest: NotificationPriority | None = None
+        for p in LANES_ORDER:
+            lane = self.lanes[p]
+            if not (p in allowed and lane and lane[0].enqueued_at <= deadline):
+                continue
+            if oldest is None or lane[0].enqueued_at < self.lanes[oldest][0].enqueued_at:
+                oldest = p
+        return oldest
+
+    def _weighted_lane(self, allowed: frozenset[NotificationPriority]) -> NotificationPriority:
+        candidates = [p for p in LANES_ORDER if p in allowed and self.lanes[p]]
+        total = 0
+        best = candidates[0]
+        for p in candidates:
+            self._current_weight[p] += self.weights[p]
+            total += self.weights[p]
+            if self._current_weight[p] > self._current_weight[best]:
+                best = p
+        self._current_weight[best] -= total
+        return best
+
+    def _wakeup(self, priority: NotificationPriority) -> None:
+        for entry in self._getters:
+            allowed, waiter = entry
+            if priority in allowed and not waiter.done():
+                self._getters.remove(entry)
+                waiter.set_result(None)
+                return
+
+    def _wakeup_any(self) -> None:
+        for p in LANES_ORDER:
+            if self.lanes[p]:
+                self._wakeup(p)
+                return
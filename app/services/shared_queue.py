@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.schemas.template_schemas import TemplateResponse
+from app.services.scheduler import DispatchJob
+from app.services.template_service import template_service
+from app.workqueue.base import WorkItem, WorkQueue
+
+
+class QueuedNotification(BaseModel):
+    """Задача общей очереди; шаблон передаётся вместе с ней, так как шаблоны хранятся в памяти процесса"""
+
+    request: NotificationRequest
+    response: NotificationResponse
+    template: TemplateResponse | None = None
+
+
+def encode_job(job: DispatchJob) -> WorkItem:
+    template_id = job.request.template_id
+    queued = QueuedNotification(
+        request=job.request,
+        response=job.response,
+        template=template_service.get(template_id) if template_id is not None else None,
+    )
+    return WorkItem(job.response.id, job.priority.value, queued.model_dump_json().encode())
+
+
+def decode_job(item: WorkItem) -> DispatchJob:
+    queued = QueuedNotification.model_validate_json(item.payload)
+    if queued.template is not None:
+        template_service.add(queued.template)
+    return DispatchJob(response=queued.response, request=queued.request, item=item)
+
+
+class SharedRetryScheduler:
+    """
+    Повторы в режиме DISPATCH_MODE=shared: уведомление возвращается в общую очередь со сроком
+    следующей попытки, поэтому повтор переживает перезапуск и достаётся любому процессу доставки.
+    """
+
+    def __init__(self, queue: WorkQueue) -> None:
+        self.queue = queue
+        self._pending: set[asyncio.Future[None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, job: DispatchJob, delay: float) -> None:
+        # Запись ставится в порядок операций очереди сразу, раньше ack текущей аренды
+        future = asyncio.ensure_future(self.queue.enqueue(encode_job(job), delay))
+        self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    async def start(self) -> None:
+        """Фоновых задач нет: сроки повторов хранит очередь"""
+
+    async def stop(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {'pending': len(self._pending), 'next_in': None}
+
+    def _done(self, future: asyncio.Future[None]) -> None:
+        self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f'Ошибка постановки повтора в общую очередь: {future.exception()!s}')
@@ -1,16 +1,33 @@
-import asyncio
-import re
-import secrets
+from typing import NamedTuple
 
 from loguru import logger
 
 from app.core.config import settings
+from app.core.logger_config import hot_logger
+from app.core.metrics import instrument_provider
+from app.utils.batcher import MicroBatcher
+from app.utils.concurrency_limit import AdaptiveConcurrencyLimiter
+from app.utils.contacts import is_valid_phone
+from app.utils.mock_provider import MockProvider
+
+
+class SMSMessage(NamedTuple):
+    phone: str
+    message: str
 
 
 class SMSService:
     def __init__(self) -> None:
         self.enabled = settings.SMS_ENABLED
         self.provider = settings.SMS_PROVIDER
+        self.mock = MockProvider.from_settings('sms')
+        self.concurrency = AdaptiveConcurrencyLimiter.from_settings('sms')
+        self.batcher: MicroBatcher[SMSMessage, bool] = MicroBatcher(
+            self.concurrency.wrap(instrument_provider('sms', self.send_sms_batch)),
+            max_size=settings.SMS_BATCH_SIZE,
+            linger_ms=settings.SMS_BATCH_LINGER_MS,
+            name='sms-batcher',
+        )
         logger.info(f'SMSService инициализирован (enabled: {self.enabled}, provider: {self.provider})')
 
     async def send_sms(
@@ -22,21 +39,29 @@ class SMSService:
             logger.warning('SMS отправка отключена')
             return False
 
-        logger.info(f'Отправка SMS to={phone}')
-        logger.debug(f'Сообщение: {message[:100]}...')
+        hot_logger.info('Отправка SMS to={}', phone)
+        hot_logger.opt(lazy=True).debug('Сообщение: {}...', lambda: message[:100])
+        return await self.batcher.submit(SMSMessage(phone, message))
 
+    async def send_sms_batch(self, messages: list[SMSMessage]) -> list[bool | BaseException]:
+        """Отправляет пакет SMS одним обращением к провайдеру, результат - по каждому получателю"""
         try:
-            await asyncio.sleep(secrets.SystemRandom().uniform(0.1, 0.5))
-            if secrets.SystemRandom().random() < 0.8:
-                logger.info(f'SMS успешно отправлен to={phone}')
-                return True
-            logger.warning(f'Mock: не удалось отправить SMS to={phone}')
-            raise Exception(f'Mock ошибка отправки SMS {phone}')
+            outcomes = await self.mock.send(len(messages))
+            results: list[bool | BaseException] = []
+            for item, outcome in zip(messages, outcomes, strict=True):
+                if outcome is None:
+                    hot_logger.info('SMS успешно отправлен to={}', item.phone)
+                    results.append(True)
+                elif outcome == 'reject':
+                    logger.warning('Mock: не удалось отправить SMS to={}', item.phone)
+                    results.append(Exception(f'Mock ошибка отправки SMS {item.phone}'))
+                else:
+                    results.append(self.mock.error(outcome, f'SMS {item.phone}'))
+            return results
 
         except Exception as e:
             logger.error(f'Ошибка отправки SMS: {e!s}')
             raise Exception(str(e))
 
     async def validate_phone_number(self, phone: str) -> bool:
-        digits_only = re.sub(r'\D', '', phone)
-        return 7 <= len(digits_only) <= 15
+        return is_valid_phone(phone)
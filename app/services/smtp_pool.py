@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import aiosmtplib
+from loguru import logger
+
+
+class PooledSMTPConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP) -> None:
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+
+class SMTPConnectionPool:
+    """
+    Пул постоянных SMTP-соединений.
+
+    TCP, STARTTLS и AUTH выполняются один раз на соединение, после чего оно переиспользуется
+    для следующих писем. Соединения закрываются по простою (idle_timeout) и после
+    max_messages отправленных писем; простаивавшее дольше health_check_interval
+    соединение перед выдачей проверяется командой NOOP. Простаивающие соединения закрываются
+    и без новых писем: фоновая задача, запущенная start, раз в health_check_interval вызывает evict_idle.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        start_tls: bool = False,
+        max_size: int = 5,
+        idle_timeout: float = 60.0,
+        max_messages: int = 100,
+        health_check_interval: float = 30.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._idle: deque[PooledSMTPConnection] = deque()
+        self._slots = asyncio.Semaphore(max_size)
+        self._opened = 0
+        self._reaper: asyncio.Task[None] | None = None
+        self.connections_created = 0
+
+    @property
+    def size(self) -> int:
+        return self._opened
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[PooledSMTPConnection]:
+        conn = await self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            # После ошибки состояние SMTP-сессии неизвестно, поэтому соединение в пул не возвращается
+            await self.release(conn, discard=True)
+            raise
+        await self.release(conn)
+
+    async def acquire(self) -> PooledSMTPConnection:
+        await self._slots.acquire()
+        try:
+            await self.evict_idle()
+            while self._idle:
+                conn = self._idle.pop()
+                if await self._is_healthy(conn):
+                    return conn
+                await self._close(conn)
+            return await self._open()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, conn: PooledSMTPConnection, discard: bool = False) -> None:
+        conn.last_used = time.monotonic()
+        try:
+            if discard or not conn.smtp.is_connected or conn.messages_sent >= self.max_messages:
+                await self._close(conn)
+            else:
+                self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    async def evict_idle(self) -> None:
+        deadline = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0].last_used < deadline:
+            await self._close(self._idle.popleft())
+
+    async def start(self) -> None:
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_loop(), name='smtp-pool-reaper')
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        while self._idle:
+            await self._close(self._idle.popleft())
+
+    async def _reap_loop(self) -> None:
+        """Закрывает соединения, простаивающие дольше idle_timeout, пока писем нет"""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error(f'Ошибка закрытия простаивающих SMTP соединений: {e!s}')
+
+    async def _open(self) -> PooledSMTPConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        self._opened += 1
+        self.connections_created += 1
+        logger.debug(f'Открыто SMTP соединение с {self.hostname}:{self.port} (в пуле: {self._opened})')
+        return PooledSMTPConnection(smtp)
+
+    async def _is_healthy(self, conn: PooledSMTPConnection) -> bool:
+        if not conn.smtp.is_connected:
+            return False
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        try:
+            await conn.smtp.noop()
+            return True
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+
+    async def _close(self, conn: PooledSMTPConnection) -> None:
+        self._opened -= 1
+        try:
+            if conn.smtp.is_connected:
+                await conn.smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            conn.smtp.close()
@@ -1,39 +1,144 @@
 import asyncio
-import secrets
+from typing import NamedTuple
 
+import httpx
 from loguru import logger
 
 from app.core.config import settings
+from app.core.logger_config import hot_logger
+from app.core.metrics import instrument_provider
+from app.utils.batcher import MicroBatcher
+from app.utils.concurrency_limit import AdaptiveConcurrencyLimiter
+from app.utils.contacts import is_valid_chat_id
+from app.utils.mock_provider import MockProvider
+from app.utils.rate_limit import TelegramRateLimiter
+
+
+class TelegramMessage(NamedTuple):
+    chat_id: str
+    message: str
+    parse_mode: str | None = None
 
 
 class TelegramService:
     def __init__(self) -> None:
         self.enabled = settings.TELEGRAM_ENABLED
         self.bot_token = settings.TELEGRAM_BOT_TOKEN
-        logger.info(f'TelegramService инициализирован (enabled: {self.enabled})')
+        self.backend = settings.TELEGRAM_BACKEND
+        self.limiter = TelegramRateLimiter(
+            global_rate=settings.TELEGRAM_GLOBAL_RATE,
+            global_burst=settings.TELEGRAM_GLOBAL_BURST,
+            chat_rate=settings.TELEGRAM_PER_CHAT_RATE,
+            chat_burst=settings.TELEGRAM_PER_CHAT_BURST,
+        )
+        self._client: httpx.AsyncClient | None = None
+        self.mock = MockProvider.from_settings('telegram')
+        self.concurrency = AdaptiveConcurrencyLimiter.from_settings('telegram')
+        self.batcher: MicroBatcher[TelegramMessage, bool] = MicroBatcher(
+            self.concurrency.wrap(instrument_provider('telegram', self.send_telegram_batch)),
+            max_size=settings.TELEGRAM_BATCH_SIZE,
+            linger_ms=settings.TELEGRAM_BATCH_LINGER_MS,
+            name='telegram-batcher',
+        )
+        logger.info(f'TelegramService инициализирован (enabled: {self.enabled}, backend: {self.backend})')
 
     async def send_telegram(
         self,
         chat_id: str,
         message: str,
+        parse_mode: str | None = None,
     ) -> bool:
         if not self.enabled:
             logger.warning('🤖 Telegram отправка отключена')
             return False
-        logger.info(f'Отправка Telegram сообщения в чат {chat_id}')
-        logger.debug(f'Сообщение: {message[:100]}...')
+        hot_logger.info('Отправка Telegram сообщения в чат {}', chat_id)
+        hot_logger.opt(lazy=True).debug('Сообщение: {}...', lambda: message[:100])
+        return await self.batcher.submit(TelegramMessage(chat_id, message, parse_mode))
 
+    async def send_telegram_batch(self, messages: list[TelegramMessage]) -> list[bool | BaseException]:
+        """Отправляет пакет сообщений в рамках одной сессии Bot API, результат - по каждому чату"""
+        if self.backend == 'api':
+            return list(await asyncio.gather(*(self._send_api(item) for item in messages), return_exceptions=True))
         try:
-            await asyncio.sleep(secrets.SystemRandom().uniform(0.1, 0.5))
-            if secrets.SystemRandom().random() < 0.8:
-                logger.info(f'Telegram сообщение успешно отправлено в чат {chat_id}')
-                return True
-            logger.warning(f'Mock: Не удалось отправить Telegram сообщение в чат {chat_id}')
-            raise Exception(f'Mock ошибка отправки в Telegram чат {chat_id}')
+            outcomes = await self.mock.send(len(messages))
+            results: list[bool | BaseException] = []
+            for item, outcome in zip(messages, outcomes, strict=True):
+                if outcome is None:
+                    hot_logger.info('Telegram сообщение успешно отправлено в чат {}', item.chat_id)
+                    results.append(True)
+                elif outcome == 'reject':
+                    logger.warning('Mock: Не удалось отправить Telegram сообщение в чат {}', item.chat_id)
+                    results.append(
+                        Exception(f'Ошибка отправки Telegram: Mock ошибка отправки в Telegram чат {item.chat_id}')
+                    )
+                else:
+                    results.append(self.mock.error(outcome, f'Telegram чат {item.chat_id}'))
+            return results
 
         except Exception as e:
             logger.error(f'Ошибка отправки Telegram: {e!s}')
             raise Exception(f'Ошибка отправки Telegram: {e!s}')
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Одна keep-alive сессия с пулом соединений на процесс"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=f'{settings.TELEGRAM_API_URL.rstrip("/")}/bot{self.bot_token}',
+                timeout=settings.TELEGRAM_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.TELEGRAM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.TELEGRAM_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self.batcher.drain()
+            await self._client.aclose()
+            self._client = None
+
+    async def _send_api(self, item: TelegramMessage) -> bool:
+        """
+        Отправляет сообщение через Bot API с учётом лимитов.
+
+        Ответ 429 не уходит в экспоненциальный retry: retry_after передаётся в лимитер,
+        и сообщение отправляется повторно, как только лимитер выдаст токен.
+        """
+        for _ in range(settings.TELEGRAM_MAX_RATE_LIMITED_ATTEMPTS):
+            await self.limiter.acquire(item.chat_id)
+            try:
+                payload = {'chat_id': item.chat_id, 'text': item.message}
+                if item.parse_mode is not None:
+                    payload['parse_mode'] = item.parse_mode
+                response = await self.client.post('/sendMessage', json=payload)
+            except httpx.TimeoutException as e:
+                logger.error(f'Ошибка отправки Telegram: {e!s}')
+                raise TimeoutError(f'Ошибка отправки Telegram: {e!s}')
+            except httpx.HTTPError as e:
+                logger.error(f'Ошибка отправки Telegram: {e!s}')
+                raise ConnectionError(f'Ошибка отправки Telegram: {e!s}')
+
+            if response.status_code == 429:
+                retry_after = float(response.json().get('parameters', {}).get('retry_after', 1))
+                if retry_after > settings.TELEGRAM_MAX_RETRY_AFTER:
+                    raise Exception(f'Telegram ограничил отправку в чат {item.chat_id} на {retry_after}с')
+                logger.warning('Telegram 429 для чата {}, retry_after={}с', item.chat_id, retry_after)
+                self.limiter.retry_after(item.chat_id, retry_after)
+                continue
+
+            if response.status_code >= 500:
+                raise ConnectionError(f'Ошибка отправки Telegram: HTTP {response.status_code}')
+            if response.status_code >= 400:
+                description = response.json().get('description', response.status_code)
+                logger.warning('Telegram отклонил сообщение в чат {}: {}', item.chat_id, description)
+                return False
+
+            hot_logger.info('Telegram сообщение успешно отправлено в чат {}', item.chat_id)
+            return True
+
+        raise Exception(f'Ошибка отправки Telegram: превышен лимит в чат {item.chat_id}')
+
     async def validate_chat_id(self, chat_id: str) -> bool:
-        return len(chat_id) > 0 and (chat_id.startswith('@') or chat_id.isdigit())
+        return is_valid_chat_id(chat_id)
@@ -0,0 +1,135 @@
+import functools
+import html
+import re
+import uuid
+from collections.abc import Callable, Mapping
+from typing import NamedTuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.schemas.enum import NotificationChannel
+from app.schemas.notification_schemas import MESSAGE_MAX_LENGTH, SUBJECT_MAX_LENGTH, NotificationRequest
+from app.schemas.template_schemas import TemplateCreate, TemplateResponse
+from app.utils.sms import truncate_sms
+
+PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+MARKDOWN_V2_SPECIAL = re.compile(r'([_*\[\]()~`>#+\-=|{}.!\\])')
+
+
+class TemplateError(ValueError):
+    """Шаблон не найден, для него не хватает переменных или отрендеренный текст длиннее допустимого"""
+
+
+class ChannelContent(NamedTuple):
+    subject: str
+    text: str
+    html: str | None = None
+    parse_mode: str | None = None
+
+
+def escape_markdown_v2(value: str) -> str:
+    return MARKDOWN_V2_SPECIAL.sub(r'\\\1', value)
+
+
+class CompiledTemplate:
+    """Шаблон, разобранный в строку формата: рендер - один вызов str.format без повторного разбора"""
+
+    __slots__ = ('format_string', 'names')
+
+    def __init__(self, source: str) -> None:
+        parts = PLACEHOLDER.split(source)
+        literals, names = parts[0::2], parts[1::2]
+        chunks = []
+        for index, literal in enumerate(literals):
+            chunks.append(literal.replace('{', '{{').replace('}', '}}'))
+            if index < len(names):
+                chunks.append(f'{{{index}}}')
+        self.format_string = ''.join(chunks)
+        self.names = tuple(names)
+
+    def render(self, variables: Mapping[str, str], escape: Callable[[str], str] | None = None) -> str:
+        if escape is None:
+            return self.format_string.format(*[variables[name] for name in self.names])
+        return self.format_string.format(*[escape(variables[name]) for name in self.names])
+
+
+@functools.lru_cache(maxsize=settings.TEMPLATE_CACHE_SIZE)
+def compile_template(source: str) -> CompiledTemplate:
+    return CompiledTemplate(source)
+
+
+class TemplateService:
+    """
+    Реестр шаблонов уведомлений.
+
+    Исходники шаблонов хранятся в памяти, скомпилированные варианты - в LRU-кэше compile_template.
+    При приёме уведомления по шаблону текстовая версия (subject, message) рендерится один раз
+    и сохраняется в запросе; варианты для каналов рендерятся при отправке.
+    """
+
+    def __init__(self) -> None:
+        self.templates: dict[str, TemplateResponse] = {}
+
+    def register(self, template: TemplateCreate) -> TemplateResponse:
+        sources = [template.subject, template.text, template.html, template.sms, template.telegram]
+        variables: set[str] = set()
+        for source in sources:
+            if source is not None:
+                variables.update(compile_template(source).names)
+        registered = TemplateResponse(id=str(uuid.uuid4()), variables=sorted(variables), **template.model_dump())
+        self.templates[registered.id] = registered
+        logger.info(f'Зарегистрирован шаблон {registered.id} (переменные: {registered.variables})')
+        return registered
+
+    def get(self, template_id: str) -> TemplateResponse | None:
+        return self.templates.get(template_id)
+
+    def add(self, template: TemplateResponse) -> None:
+        """Добавляет шаблон, зарегистрированный в другом процессе (приходит вместе с задачей общей очереди)"""
+        self.templates.setdefault(template.id, template)
+
+    def apply(self, request: NotificationRequest) -> NotificationRequest:
+        """Проверяет переменные и подставляет в запрос тему и текст, отрендеренные по шаблону"""
+        if request.template_id is None:
+            return request
+        template = self._template(request.template_id)
+        missing = [name for name in template.variables if name not in request.variables]
+        if missing:
+            raise TemplateError(f'Не переданы переменные шаблона: {", ".join(missing)}')
+        subject = compile_template(template.subject).render(request.variables)
+        message = compile_template(template.text).render(request.variables)
+        # Тема и текст по шаблону подчиняются тем же ограничениям, что и переданные в запросе напрямую
+        if len(subject) > SUBJECT_MAX_LENGTH:
+            raise TemplateError(f'Тема по шаблону длиннее {SUBJECT_MAX_LENGTH} символов: {len(subject)}')
+        if len(message) > MESSAGE_MAX_LENGTH:
+            raise TemplateError(f'Текст по шаблону длиннее {MESSAGE_MAX_LENGTH} символов: {len(message)}')
+        request.subject = subject
+        request.message = message
+        return request
+
+    def render(self, request: NotificationRequest, channel: NotificationChannel) -> ChannelContent:
+        """Содержимое уведомления для канала; для запросов без шаблона - тема и текст как есть"""
+        if request.template_id is None:
+            return ChannelContent(request.subject, request.message)
+        template = self._template(request.template_id)
+        variables = request.variables
+        if channel == NotificationChannel.EMAIL:
+            body = compile_template(template.html).render(variables, html.escape) if template.html else None
+            return ChannelContent(request.subject, request.message, html=body)
+        if channel == NotificationChannel.SMS:
+            text = compile_template(template.sms).render(variables) if template.sms else request.message
+            return ChannelContent(request.subject, truncate_sms(text, settings.SMS_MAX_SEGMENTS))
+        if template.telegram:
+            text = compile_template(template.telegram).render(variables, escape_markdown_v2)
+            return ChannelContent(request.subject, text, parse_mode='MarkdownV2')
+        return ChannelContent(request.subject, request.message)
+
+    def _template(self, template_id: str) -> TemplateResponse:
+        template = self.templates.get(template_id)
+        if template is None:
+            raise TemplateError(f'Шаблон {template_id} не найден')
+        return template
+
+
+template_service = TemplateService()
@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import hmac
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import httpx
+from loguru import logger
+
+from app.core.config import settings
+from app.core.logger_config import hot_logger
+from app.core.metrics import WEBHOOK_DELIVERIES_TOTAL, WEBHOOK_EVENTS_DROPPED_TOTAL, WEBHOOK_REQUEST_DURATION
+from app.schemas.enum import NotificationStatus
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.schemas.webhook_schemas import WebhookPayload, WebhookRegistration
+from app.services.webhook_service import WebhookService, webhook_service
+from app.utils.retry import RetryConfig
+
+# Итоговые статусы, которые отправляются на webhooks. CANCELLED исключён намеренно: отмену запрашивает
+# сам клиент через API и получает её результат в ответе
+WEBHOOK_STATUSES = frozenset({NotificationStatus.SENT, NotificationStatus.FAILED})
+# Ответы, после которых отправка повторяется; на прочие 4xx повтор не поможет
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429})
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """Заголовок X-Webhook-Signature: HMAC-SHA256 от "timestamp.body" ключом подписки"""
+    digest = hmac.new(secret.encode(), timestamp.encode() + b'.' + body, hashlib.sha256).hexdigest()
+    return f'sha256={digest}'
+
+
+@dataclass(slots=True)
+class WebhookDelivery:
+    """Пакет статусов для подписки; тело собирается один раз и не меняется между попытками"""
+
+    webhook: WebhookRegistration
+    body: bytes
+    size: int
+    id: str
+    attempt: int = 0
+
+
+@dataclass(slots=True)
+class PendingBatch:
+    webhook: WebhookRegistration
+    deadline: float
+    notifications: list[NotificationResponse] = field(default_factory=list)
+
+
+class WebhookDispatcher:
+    """
+    Фоновая отправка итоговых статусов (sent, failed) на webhooks клиентов.
+
+    notify только кладёт статус в ограниченную очередь, поэтому отправка уведомления не ждёт ни реестра,
+    ни webhooks клиента. Сборщик раскладывает статусы по подпискам клиента и копит пакет до batch_size
+    статусов или linger_ms, пакеты отправляют workers задач через общий пул keep-alive соединений.
+    Тело подписывается ключом подписки; неудачная отправка повторяется с паузами retry_config
+    с тем же delivery_id, чтобы получатель мог отбросить дубликат. Очередь хранится в памяти процесса:
+    статусы, не отправленные к остановке, теряются.
+    """
+
+    def __init__(
+        self,
+        service: WebhookService,
+        batch_size: int = settings.WEBHOOK_BATCH_SIZE,
+        linger_ms: float = settings.WEBHOOK_BATCH_LINGER_MS,
+        workers: int = settings.WEBHOOK_WORKERS,
+        queue_size: int = settings.WEBHOOK_QUEUE_MAX_SIZE,
+        retry_config: RetryConfig | None = None,
+        timeout: float = settings.WEBHOOK_TIMEOUT,
+        max_connections: int = settings.WEBHOOK_MAX_CONNECTIONS,
+        shutdown_timeout: float = settings.WEBHOOK_SHUTDOWN_TIMEOUT,
+    ) -> None:
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.linger = linger_ms / 1000
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.shutdown_timeout = shutdown_timeout
+        self.retry_config = retry_config or RetryConfig(
+            max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+            initial_delay=settings.WEBHOOK_RETRY_DELAY,
+            backoff_factor=settings.WEBHOOK_RETRY_BACKOFF_FACTOR,
+            max_delay=settings.WEBHOOK_RETRY_MAX_DELAY,
+        )
+        self._events: asyncio.Queue[tuple[str, NotificationResponse]] = asyncio.Queue(maxsize=queue_size)
+        # Пакеты к отправке: заполненная очередь останавливает сборщик, пакеты не копятся в памяти
+        self._deliveries: asyncio.Queue[WebhookDelivery] = asyncio.Queue(maxsize=self.workers)
+        self._pending: dict[str, PendingBatch] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+        self._retries: set[asyncio.Task[None]] = set()
+        self._client: httpx.AsyncClient | None = None
+
+    def notify(self, response: NotificationResponse, request: NotificationRequest) -> None:
+        """Ставит итоговый статус в очередь webhooks клиента уведомления"""
+        if request.tenant is None or response.status not in WEBHOOK_STATUSES or not self._tasks:
+            return
+        try:
+            self._events.put_nowait((request.tenant, response))
+        except asyncio.QueueFull:
+            WEBHOOK_EVENTS_DROPPED_TOTAL.inc()
+            logger.warning(f'Очередь webhooks переполнена, статус уведомления {response.id} не будет отправлен')
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Одна keep-alive сессия с пулом соединений на процесс"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections, max_keepalive_connections=self.max_connections
+                ),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._collect(), name='webhook-collector')]
+        self._tasks.extend(
+            asyncio.create_task(self._work(), name=f'webhook-worker-{index}') for index in range(self.workers)
+        )
+        logger.info(f'WebhookDispatcher запущен (workers: {self.workers})')
+
+    async def stop(self) -> None:
+        """Отправляет принятые статусы, включая неполные пакеты, не дольше shutdown_timeout; повторы не ждёт"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._drain(), self.shutdown_timeout)
+        except TimeoutError:
+            logger.warning(f'WebhookDispatcher: не все статусы отправлены за {self.shutdown_timeout}с')
+        if self._retries:
+            logger.warning(f'WebhookDispatcher остановлен, отброшено отправок в ожидании повтора: {len(self._retries)}')
+        tasks = [*self._tasks, *self._retries]
+        self._tasks = []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'queued': self._events.qsize(),
+            'batching': sum(len(batch.notifications) for batch in self._pending.values()),
+            'sending': self._deliveries.qsize(),
+            'retrying': len(self._retries),
+        }
+
+    async def _drain(self) -> None:
+        await self._events.join()
+        for webhook_id in list(self._pending):
+            await self._flush(webhook_id)
+        await self._deliveries.join()
+
+    async def _collect(self) -> None:
+        while True:
+            now = time.monotonic()
+            for webhook_id in [key for key, batch in self._pending.items() if batch.deadline <= now]:
+                await self._flush(webhook_id)
+            if self._pending:
+                timeout = min(batch.deadline for batch in self._pending.values()) - time.monotonic()
+                try:
+                    tenant, response = await asyncio.wait_for(self._events.get(), max(timeout, 0.001))
+                except TimeoutError:
+                    continue
+            else:
+                tenant, response = await self._events.get()
+            try:
+                for webhook in await self.service.resolve(tenant):
+                    await self._add(webhook, response)
+            except Exception:
+                logger.exception(f'Ошибка постановки статуса уведомления {response.id} в отправку на webhooks')
+            finally:
+                self._events.task_done()
+
+    async def _add(self, webhook: WebhookRegistration, response: NotificationResponse) -> None:
+        batch = self._pending.get(webhook.id)
+        if batch is None:
+            batch = self._pending[webhook.id] = PendingBatch(webhook, time.monotonic() + self.linger)
+        batch.notifications.append(response)
+        if len(batch.notifications) >= self.batch_size:
+            await self._flush(webhook.id)
+
+    async def _flush(self, webhook_id: str) -> None:
+        batch = self._pending.pop(webhook_id, None)
+        if batch is None:
+            return
+        delivery_id = str(uuid.uuid4())
+        payload = WebhookPayload(delivery_id=delivery_id, webhook_id=webhook_id, notifications=batch.notifications)
+        delivery = WebhookDelivery(
+            batch.webhook, payload.model_dump_json().encode(), len(batch.notifications), delivery_id
+        )
+        await self._deliveries.put(delivery)
+
+    async def _work(self) -> None:
+        while True:
+            delivery = await self._deliveries.get()
+            try:
+                await self._send(delivery)
+            except Exception:
+                logger.exception(f'Ошибка отправки на webhook {delivery.webhook.id}')
+            finally:
+                self._deliveries.task_done()
+
+    async def _send(self, delivery: WebhookDelivery) -> None:
+        webhook = delivery.webhook
+        delivery.attempt += 1
+        timestamp = str(int(time.time()))
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Webhook-Id': delivery.id,
+            'X-Webhook-Timestamp': timestamp,
+            'X-Webhook-Signature': sign(webhook.secret, timestamp, delivery.body),
+        }
+        retry_after = 0.0
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(webhook.url, content=delivery.body, headers=headers)
+        except httpx.HTTPError as e:
+            error: str | None = f'{type(e).__name__}: {e!s}'
+            retryable = True
+        else:
+            error = None if response.is_success else f'HTTP {response.status_code}'
+            retryable = response.status_code >= 500 or response.status_code in RETRYABLE_STATUS_CODES
+            header = response.headers.get('Retry-After', '')
+            retry_after = float(header) if header.isdigit() else 0.0
+        WEBHOOK_REQUEST_DURATION.observe(time.perf_counter() - started)
+
+        if error is None:
+            WEBHOOK_DELIVERIES_TOTAL.labels('success').inc()
+            hot_logger.info('Webhook {}: отправлено статусов: {}', webhook.id, delivery.size)
+            return
+        if not retryable or delivery.attempt >= self.retry_config.max_attempts:
+            WEBHOOK_DELIVERIES_TOTAL.labels('failed').inc()
+            logger.error(
+                f'Webhook {webhook.id}: {delivery.size} статусов не доставлено '
+                f'(попыток: {delivery.attempt}, delivery_id: {delivery.id}): {error}'
+            )
+            return
+        delay = min(max(self.retry_config.compute_delay(delivery.attempt), retry_after), self.retry_config.max_delay)
+        WEBHOOK_DELIVERIES_TOTAL.labels('retry').inc()
+        logger.warning(
+            f'Webhook {webhook.id}: попытка {delivery.attempt} не удалась ({error}), повтор через {delay:.2f}с'
+        )
+        task = asyncio.create_task(self._retry(delivery, delay), name=f'webhook-retry-{delivery.id}')
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _retry(self, delivery: WebhookDelivery, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._deliveries.put(delivery)
+
+
+webhook_dispatcher = WebhookDispatcher(webhook_service)
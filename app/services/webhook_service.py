@@ -0,0 +1,92 @@
+import hashlib
+import secrets
+import uuid
+
+from loguru import logger
+
+from app.core.config import settings
+from app.schemas.webhook_schemas import WebhookCreate, WebhookRegistration
+from app.utils.ttl_cache import TTLCache
+from app.webhooks.base import WebhookStore
+from app.webhooks.factory import create_webhook_store
+
+
+class WebhookLimitExceededError(ValueError):
+    """У клиента уже WEBHOOK_MAX_PER_TENANT подписок"""
+
+
+def tenant_of(api_key: str | None) -> str | None:
+    """Клиент по X-API-Key: хэш ключа, чтобы ключ не хранился в реестре и состоянии уведомлений"""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:32] if api_key else None
+
+
+class WebhookService:
+    """
+    Реестр подписок на webhooks по клиентам.
+
+    Подписки клиента кэшируются списком: фоновая отправка итоговых статусов берёт их из кэша,
+    а изменение реестра сбрасывает запись в этом процессе. TTL ограничивает устаревание
+    записей других процессов при общем хранилище.
+    """
+
+    def __init__(self, store: WebhookStore | None = None) -> None:
+        self.store = store or create_webhook_store()
+        self.cache: TTLCache[str, tuple[WebhookRegistration, ...]] = TTLCache(
+            settings.WEBHOOK_CACHE_SIZE, settings.WEBHOOK_CACHE_TTL_SECONDS
+        )
+        # Растёт при каждом изменении реестра: чтение, начатое до изменения, не кладёт результат в кэш
+        self._version = 0
+
+    async def start(self) -> None:
+        await self.store.start()
+
+    async def close(self) -> None:
+        await self.store.close()
+
+    async def register(self, tenant: str, webhook: WebhookCreate) -> WebhookRegistration:
+        if len(await self.store.by_tenant(tenant)) >= settings.WEBHOOK_MAX_PER_TENANT:
+            raise WebhookLimitExceededError(f'Достигнут лимит подписок на webhooks ({settings.WEBHOOK_MAX_PER_TENANT})')
+        registered = WebhookRegistration(
+            id=str(uuid.uuid4()),
+            tenant=tenant,
+            url=webhook.url,
+            secret=webhook.secret or secrets.token_urlsafe(32),
+            description=webhook.description,
+        )
+        await self.store.save(registered)
+        self._invalidate(tenant)
+        logger.info(f'Зарегистрирован webhook {registered.id}')
+        return registered
+
+    async def get(self, tenant: str, webhook_id: str) -> WebhookRegistration | None:
+        """Подписка клиента; чужая подписка не отличается от отсутствующей"""
+        webhook = await self.store.get(webhook_id)
+        return webhook if webhook is not None and webhook.tenant == tenant else None
+
+    async def list_webhooks(self, tenant: str) -> list[WebhookRegistration]:
+        return await self.store.by_tenant(tenant)
+
+    async def delete(self, tenant: str, webhook_id: str) -> bool:
+        if await self.get(tenant, webhook_id) is None:
+            return False
+        deleted = await self.store.delete(webhook_id)
+        self._invalidate(tenant)
+        return deleted
+
+    async def resolve(self, tenant: str) -> tuple[WebhookRegistration, ...]:
+        """Подписки клиента для отправки статусов"""
+        webhooks = self.cache.get(tenant)
+        if webhooks is not None:
+            return webhooks
+        version = self._version
+        webhooks = tuple(await self.store.by_tenant(tenant))
+        if version == self._version:
+            self.cache.set(tenant, webhooks)
+        return webhooks
+
+    def _invalidate(self, tenant: str) -> None:
+        self._version += 1
+        self.cache.pop(tenant)
+
+
+webhook_service = WebhookService()
@@ -0,0 +1,82 @@
+import base64
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.schemas.enum import NotificationChannel, NotificationPriority, NotificationStatus
+from app.schemas.notification_schemas import NotificationHistory
+
+# Ключ сортировки истории: (created_at в секундах, id)
+HistoryKey = tuple[float, str]
+
+
+@dataclass(slots=True, frozen=True)
+class HistoryFilters:
+    status: NotificationStatus | None = None
+    channel: NotificationChannel | None = None
+    priority: NotificationPriority | None = None
+    recipient: str | None = None
+
+    def matches(self, record: NotificationHistory) -> bool:
+        return (
+            (self.status is None or record.status == self.status)
+            and (self.channel is None or self.channel in record.channels)
+            and (self.priority is None or record.priority == self.priority)
+            and (
+                self.recipient is None
+                or self.recipient in (record.recipient_id, record.email, record.phone, record.telegram_id)
+            )
+        )
+
+
+def history_key(record: NotificationHistory) -> HistoryKey:
+    return record.created_at.timestamp(), record.id
+
+
+def encode_cursor(created_at: datetime, notification_id: str) -> str:
+    raw = f'{created_at.timestamp()!r}:{notification_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> HistoryKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, notification_id = raw.split(':', 1)
+        return float(timestamp), notification_id
+    except ValueError:
+        raise ValueError('Некорректный курсор')
+
+
+class NotificationStore(ABC):
+    """Асинхронное хранилище уведомлений"""
+
+    async def start(self) -> None:  # noqa: B027
+        """Открывает ресурсы хранилища"""
+
+    async def close(self) -> None:  # noqa: B027
+        """Сбрасывает буферы и закрывает ресурсы хранилища"""
+
+    @abstractmethod
+    async def save(self, record: NotificationHistory) -> None:
+        """Создаёт или обновляет запись по id"""
+
+    @abstractmethod
+    async def get(self, notification_id: str) -> NotificationHistory | None: ...
+
+    @abstractmethod
+    async def history(
+        self,
+        limit: int,
+        before: HistoryKey | None = None,
+        after: HistoryKey | None = None,
+        filters: HistoryFilters | None = None,
+    ) -> list[NotificationHistory]:
+        """
+        Страница истории, новые записи первыми.
+
+        before - записи старше курсора (следующая страница), after - новее курсора (предыдущая).
+        """
+
+    @abstractmethod
+    async def prune(self, older_than: datetime) -> int:
+        """Удаляет записи, созданные раньше older_than; возвращает число удалённых"""
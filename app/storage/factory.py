@@ -0,0 +1,16 @@
+from app.core.config import settings
+from app.storage.base import NotificationStore
+from app.storage.memory import MemoryNotificationStore
+from app.storage.sqlite import SQLiteNotificationStore
+
+
+def create_notification_store() -> NotificationStore:
+    if settings.STORAGE_BACKEND == 'sqlite':
+        return SQLiteNotificationStore(
+            path=settings.STORAGE_SQLITE_PATH,
+            batch_size=settings.STORAGE_BATCH_SIZE,
+            flush_interval=settings.STORAGE_FLUSH_INTERVAL_MS / 1000,
+        )
+    if settings.STORAGE_BACKEND == 'memory':
+        return MemoryNotificationStore(max_items=settings.STORAGE_MEMORY_MAX_ITEMS)
+    raise ValueError(f'Неизвестный STORAGE_BACKEND: {settings.STORAGE_BACKEND}')
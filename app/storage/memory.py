@@ -0,0 +1,182 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import datetime
+from itertools import islice, takewhile
+
+from loguru import logger
+
+from app.schemas.enum import FINAL_STATUSES
+from app.schemas.notification_schemas import NotificationHistory
+from app.storage.base import HistoryFilters, HistoryKey, NotificationStore, history_key
+
+
+class TimeIndex:
+    """
+    Отсортированный по (created_at, id) список ключей.
+
+    Удаление ленивое: ключ исключается из members и пропускается при обходе,
+    а список уплотняется, когда таких ключей набирается больше половины.
+    """
+
+    def __init__(self) -> None:
+        self.keys: list[HistoryKey] = []
+        self.members: set[str] = set()
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def add(self, key: HistoryKey) -> None:
+        if key[1] in self.members:
+            return
+        self.members.add(key[1])
+        if not self.keys or key > self.keys[-1]:
+            self.keys.append(key)
+            return
+        pos = bisect_left(self.keys, key)
+        if pos < len(self.keys) and self.keys[pos] == key:
+            self._stale -= 1
+        else:
+            self.keys.insert(pos, key)
+
+    def discard(self, key: HistoryKey) -> None:
+        if key[1] not in self.members:
+            return
+        self.members.remove(key[1])
+        self._stale += 1
+        if self._stale > 1024 and self._stale * 2 > len(self.keys):
+            self.keys = [k for k in self.keys if k[1] in self.members]
+            self._stale = 0
+
+    def newest_first(self, before: HistoryKey | None = None) -> Iterator[str]:
+        pos = bisect_left(self.keys, before) if before is not None else len(self.keys)
+        for i in range(pos - 1, -1, -1):
+            key = self.keys[i]
+            if key[1] in self.members:
+                yield key[1]
+
+    def oldest_first(self, after: HistoryKey | None = None) -> Iterator[str]:
+        pos = bisect_right(self.keys, after) if after is not None else 0
+        for i in range(pos, len(self.keys)):
+            key = self.keys[i]
+            if key[1] in self.members:
+                yield key[1]
+
+
+class MemoryNotificationStore(NotificationStore):
+    """
+    Хранилище в памяти процесса с ограничением на число записей.
+
+    Сверх max_items вытесняются самые старые записи в итоговых статусах: незавершённые уведомления
+    ещё отправляются, и их состояние должно оставаться доступным.
+    """
+
+    def __init__(self, max_items: int = 100000) -> None:
+        self.max_items = max_items
+        self.records: dict[str, NotificationHistory] = {}
+        self.by_time = TimeIndex()
+        self.by_status: defaultdict[str, TimeIndex] = defaultdict(TimeIndex)
+        self.by_channel: defaultdict[str, TimeIndex] = defaultdict(TimeIndex)
+        self.by_priority: defaultdict[str, TimeIndex] = defaultdict(TimeIndex)
+        self.by_recipient: defaultdict[str, TimeIndex] = defaultdict(TimeIndex)
+        self._overflow_warned = False
+
+    async def save(self, record: NotificationHistory) -> None:
+        previous = self.records.get(record.id)
+        key = history_key(record)
+        if previous is None:
+            self.by_time.add(key)
+            for channel in record.channels:
+                self.by_channel[channel.value].add(key)
+            self.by_priority[record.priority.value].add(key)
+            for recipient in self._recipients(record):
+                self.by_recipient[recipient].add(key)
+        elif previous.status != record.status:
+            self.by_status[previous.status.value].discard(key)
+        self.by_status[record.status.value].add(key)
+        self.records[record.id] = record
+
+        if len(self.records) > self.max_items:
+            self._evict(len(self.records) - self.max_items)
+
+    async def get(self, notification_id: str) -> NotificationHistory | None:
+        return self.records.get(notification_id)
+
+    async def history(
+        self,
+        limit: int,
+        before: HistoryKey | None = None,
+        after: HistoryKey | None = None,
+        filters: HistoryFilters | None = None,
+    ) -> list[NotificationHistory]:
+        filters = filters or HistoryFilters()
+        index = self._select_index(filters)
+        ids = index.oldest_first(after) if after is not None else index.newest_first(before)
+
+        page: list[NotificationHistory] = []
+        for notification_id in ids:
+            record = self.records[notification_id]
+            if filters.matches(record):
+                page.append(record)
+                if len(page) >= limit:
+                    break
+        if after is not None:
+            page.reverse()
+        return page
+
+    async def prune(self, older_than: datetime) -> int:
+        expired = list(takewhile(lambda i: self.records[i].created_at < older_than, self.by_time.oldest_first()))
+        for notification_id in expired:
+            self._remove(self.records[notification_id])
+        return len(expired)
+
+    def _select_index(self, filters: HistoryFilters) -> TimeIndex:
+        """Выбирает самый селективный индекс; остальные условия проверяются по записи"""
+        candidates = [self.by_time]
+        if filters.status is not None:
+            candidates.append(self.by_status[filters.status.value])
+        if filters.channel is not None:
+            candidates.append(self.by_channel[filters.channel.value])
+        if filters.priority is not None:
+            candidates.append(self.by_priority[filters.priority.value])
+        if filters.recipient is not None:
+            candidates.append(self.by_recipient[filters.recipient])
+        return min(candidates, key=len)
+
+    def _evict(self, count: int) -> None:
+        """Удаляет count самых старых записей в итоговых статусах"""
+        candidates = sorted(
+            history_key(self.records[notification_id])
+            for status in FINAL_STATUSES
+            for notification_id in islice(self.by_status[status.value].oldest_first(), count)
+        )[:count]
+        for _, notification_id in candidates:
+            self._remove(self.records[notification_id])
+        if len(candidates) < count:
+            if not self._overflow_warned:
+                logger.warning(
+                    f'Хранилище в памяти переполнено: {len(self.records)} записей при лимите {self.max_items}, '
+                    'незавершённые уведомления не вытесняются'
+                )
+                self._overflow_warned = True
+        else:
+            self._overflow_warned = False
+
+    def _remove(self, record: NotificationHistory) -> None:
+        key = history_key(record)
+        del self.records[record.id]
+        self.by_time.discard(key)
+        self.by_status[record.status.value].discard(key)
+        self.by_priority[record.priority.value].discard(key)
+        for channel in record.channels:
+            self.by_channel[channel.value].discard(key)
+        for recipient in self._recipients(record):
+            index = self.by_recipient[recipient]
+            index.discard(key)
+            if not index:
+                del self.by_recipient[recipient]
+
+    @staticmethod
+    def _recipients(record: NotificationHistory) -> set[str]:
+        return {value for value in (record.recipient_id, record.email, record.phone, record.telegram_id) if value}
@@ -0,0 +1,262 @@
+import asyncio
+import contextlib
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.schemas.notification_schemas import NotificationHistory
+from app.storage.base import HistoryFilters, HistoryKey, NotificationStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notification_tags (
+    tag TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (tag, created_at, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_notifications_created_id ON notifications (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_notifications_status_created_id ON notifications (status, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_notifications_priority_created_id ON notifications (priority, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_notification_tags_created_at ON notification_tags (created_at);
+"""
+
+# Статус не откатывается назад (pending < retrying < sent/failed/cancelled): при DISPATCH_MODE=shared запись
+# из буфера API-процесса может дойти до базы позже записи процесса доставки
+UPSERT = """
+INSERT INTO notifications (id, created_at, status, data, priority) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET status = excluded.status, data = excluded.data
+WHERE (CASE excluded.status WHEN 'pending' THEN 0 WHEN 'retrying' THEN 1 ELSE 2 END)
+    >= (CASE notifications.status WHEN 'pending' THEN 0 WHEN 'retrying' THEN 1 ELSE 2 END)
+"""
+
+INSERT_TAG = 'INSERT OR IGNORE INTO notification_tags (tag, created_at, id) VALUES (?, ?, ?)'
+
+
+def record_tags(record: NotificationHistory) -> list[str]:
+    """Теги для индексированных фильтров по каналу и получателю"""
+    tags = [f'channel:{channel.value}' for channel in record.channels]
+    tags.extend(
+        f'recipient:{value}' for value in {record.recipient_id, record.email, record.phone, record.telegram_id} if value
+    )
+    return tags
+
+
+def history_query(
+    limit: int,
+    before: HistoryKey | None,
+    after: HistoryKey | None,
+    filters: HistoryFilters,
+) -> tuple[str, list[Any]]:
+    """
+    Keyset-запрос страницы истории.
+
+    Фильтр по каналу или получателю обходит индекс тегов, остальные фильтры -
+    составные индексы (status|priority, created_at, id) таблицы notifications.
+    """
+    tag = None
+    if filters.recipient is not None:
+        tag = f'recipient:{filters.recipient}'
+    elif filters.channel is not None:
+        tag = f'channel:{filters.channel.value}'
+
+    where: list[str] = []
+    params: list[Any] = []
+    if tag is not None:
+        source, key = 'notification_tags t JOIN notifications n ON n.id = t.id', 't'
+        where.append('t.tag = ?')
+        params.append(tag)
+        if filters.recipient is not None and filters.channel is not None:
+            where.append(
+                'EXISTS (SELECT 1 FROM notification_tags c'
+                ' WHERE c.tag = ? AND c.created_at = n.created_at AND c.id = n.id)'
+            )
+            params.append(f'channel:{filters.channel.value}')
+    else:
+        source, key = 'notifications n', 'n'
+    if filters.status is not None:
+        where.append('n.status = ?')
+        params.append(filters.status.value)
+    if filters.priority is not None:
+        where.append('n.priority = ?')
+        params.append(filters.priority.value)
+
+    order = 'DESC'
+    if after is not None:
+        where.append(f'({key}.created_at, {key}.id) > (?, ?)')
+        params.extend(after)
+        order = 'ASC'
+    elif before is not None:
+        where.append(f'({key}.created_at, {key}.id) < (?, ?)')
+        params.extend(before)
+
+    # Значения передаются параметрами, подстановка касается только фиксированных фрагментов SQL
+    sql = f'SELECT n.data FROM {source}'  # noqa: S608
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += f' ORDER BY {key}.created_at {order}, {key}.id {order} LIMIT ?'
+    params.append(limit)
+    return sql, params
+
+
+class SQLiteNotificationStore(NotificationStore):
+    """
+    Хранилище в SQLite (WAL), общее для всех процессов, открывших один файл.
+
+    Записи копятся в буфере и сбрасываются одной транзакцией раз в flush_interval
+    или при накоплении batch_size изменений; чтения в этом же процессе сначала смотрят в буфер.
+    Все обращения к соединению выполняются в одном потоке.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 0.05) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: dict[str, NotificationHistory] = {}
+        self._inflight: dict[str, NotificationHistory] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-store')
+        self._conn: sqlite3.Connection | None = None
+        self._flusher: asyncio.Task[None] | None = None
+        self._wakeup = asyncio.Event()
+
+    async def start(self) -> None:
+        await self._run(self._connect)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop(), name='sqlite-store-flush')
+        logger.info(f'SQLiteNotificationStore открыт ({self.path})')
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+    async def save(self, record: NotificationHistory) -> None:
+        self._pending[record.id] = record
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def get(self, notification_id: str) -> NotificationHistory | None:
+        record = self._pending.get(notification_id) or self._inflight.get(notification_id)
+        if record is not None:
+            return record
+        rows = await self._run(self._query, 'SELECT data FROM notifications WHERE id = ?', (notification_id,))
+        return NotificationHistory.model_validate_json(rows[0][0]) if rows else None
+
+    async def history(
+        self,
+        limit: int,
+        before: HistoryKey | None = None,
+        after: HistoryKey | None = None,
+        filters: HistoryFilters | None = None,
+    ) -> list[NotificationHistory]:
+        await self.flush()
+        sql, params = history_query(limit, before, after, filters or HistoryFilters())
+        rows = await self._run(self._query, sql, tuple(params))
+        page = [NotificationHistory.model_validate_json(row[0]) for row in rows]
+        if after is not None:
+            page.reverse()
+        return page
+
+    async def prune(self, older_than: datetime) -> int:
+        await self.flush()
+        removed: int = await self._run(self._delete_older, older_than.timestamp())
+        return removed
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        rows = [
+            (
+                record.id,
+                record.created_at.timestamp(),
+                record.status.value,
+                record.model_dump_json(),
+                record.priority.value,
+            )
+            for record in batch.values()
+        ]
+        tags = [
+            (tag, record.created_at.timestamp(), record.id) for record in batch.values() for tag in record_tags(record)
+        ]
+        self._inflight.update(batch)
+        try:
+            await self._run(self._write, rows, tags)
+        except sqlite3.Error:
+            # Возвращаем записи в буфер, не затирая более свежие версии
+            self._pending = {**batch, **self._pending}
+            raise
+        finally:
+            for key, record in batch.items():
+                if self._inflight.get(key) is record:
+                    del self._inflight[key]
+
+    async def _flush_loop(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                logger.error(f'Ошибка записи в SQLite: {e!s}')
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> None:
+        if self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    def _connection(self) -> sqlite3.Connection:
+        self._connect()
+        assert self._conn is not None
+        return self._conn
+
+    def _query(self, sql: str, params: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        return self._connection().execute(sql, params).fetchall()
+
+    def _write(self, rows: list[tuple[Any, ...]], tags: list[tuple[str, float, str]]) -> None:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(UPSERT, rows)
+            conn.executemany(INSERT_TAG, tags)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _delete_older(self, timestamp: float) -> int:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM notification_tags WHERE created_at < ?', (timestamp,))
+            removed: int = conn.execute('DELETE FROM notifications WHERE created_at < ?', (timestamp,)).rowcount
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return removed
@@ -0,0 +1,78 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+from loguru import logger
+
+
+class MicroBatcher[T, R]:
+    """
+    Собирает элементы в пакет до max_size штук или linger_ms миллисекунд
+    и отправляет их одним вызовом flush.
+
+    flush возвращает результат для каждого элемента в том же порядке; исключение
+    в качестве результата пробрасывается только в ожидающего этот элемент.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[T]], Awaitable[list[R | BaseException]]],
+        max_size: int = 1,
+        linger_ms: float = 0.0,
+        name: str = 'batcher',
+    ) -> None:
+        self.flush = flush
+        self.max_size = max(1, max_size)
+        self.linger = linger_ms / 1000
+        self.name = name
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size or self.linger <= 0:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush_pending)
+        return await future
+
+    async def drain(self) -> None:
+        """Отправляет накопленные элементы и дожидается всех незавершённых пакетов"""
+        self._flush_pending()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run(batch), name=f'{self.name}-flush')
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future[R]]]) -> None:
+        # Ожидающие, отменённые до отправки пакета (например, проигравшие в race), провайдеру не передаются
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        try:
+            results = await self.flush(items)
+            if len(results) != len(items):
+                raise RuntimeError(f'{self.name}: получено {len(results)} результатов для {len(items)} элементов')
+        except Exception as e:
+            logger.error(f'{self.name}: ошибка отправки пакета из {len(items)} элементов: {e!s}')
+            results = [e] * len(items)
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,149 @@
+import time
+from collections import deque
+from enum import Enum
+from typing import Any
+
+from loguru import logger
+
+
+class CircuitState(str, Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str) -> None:
+        super().__init__(f'Канал {name} временно недоступен (circuit open)')
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker по доле ошибок в скользящем окне.
+
+    Окно хранит счётчики по секундам. Когда за window_seconds набирается не меньше
+    min_calls вызовов и доля ошибок достигает failure_rate_threshold, цепь размыкается
+    на open_seconds; затем пропускается до half_open_max_calls пробных вызовов, и их
+    успех замыкает цепь, а любая ошибка снова её размыкает.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: int = 30,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        # (секунда, успехи, ошибки)
+        self._buckets: deque[list[int]] = deque()
+        self._calls = 0
+        self._failures = 0
+        self._probes = 0
+        self._probe_successes = 0
+
+    def allow(self) -> bool:
+        """Разрешает вызов; в HALF_OPEN занимает слот пробного вызова до record()/release()"""
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                return False
+            self._probes += 1
+        return True
+
+    @property
+    def available(self) -> bool:
+        """Проверка без побочных эффектов: будет ли разрешён вызов прямо сейчас"""
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        if self.state == CircuitState.HALF_OPEN:
+            return self._probes < self.half_open_max_calls
+        return True
+
+    def record(self, success: bool) -> None:
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+            if not success:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_max_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+        if self.state == CircuitState.OPEN:
+            return
+
+        self._observe(success)
+        if self._calls >= self.min_calls and self.failure_rate >= self.failure_rate_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Освобождает слот пробного вызова, который не дал результата (например, отменён)"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    @property
+    def failure_rate(self) -> float:
+        self._expire()
+        return self._failures / self._calls if self._calls else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        failure_rate = self.failure_rate
+        snapshot: dict[str, Any] = {
+            'state': self.state.value,
+            'calls': self._calls,
+            'failure_rate': round(failure_rate, 3),
+        }
+        if self.state == CircuitState.OPEN:
+            snapshot['retry_in'] = round(max(0.0, self.opened_at + self.open_seconds - time.monotonic()), 1)
+        return snapshot
+
+    def _observe(self, success: bool) -> None:
+        now = int(time.monotonic())
+        self._expire(now)
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        bucket = self._buckets[-1]
+        if success:
+            bucket[1] += 1
+        else:
+            bucket[2] += 1
+            self._failures += 1
+        self._calls += 1
+
+    def _expire(self, now: int | None = None) -> None:
+        start = (int(time.monotonic()) if now is None else now) - self.window_seconds
+        while self._buckets and self._buckets[0][0] <= start:
+            _, successes, failures = self._buckets.popleft()
+            self._calls -= successes + failures
+            self._failures -= failures
+
+    def _open(self) -> None:
+        self.opened_at = time.monotonic()
+        self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        self._probes = 0
+        self._probe_successes = 0
+        if state == CircuitState.CLOSED:
+            self._buckets.clear()
+            self._calls = 0
+            self._failures = 0
+        log = logger.warning if state == CircuitState.OPEN else logger.info
+        log(f'Circuit breaker {self.name}: {previous.value} -> {state.value}')
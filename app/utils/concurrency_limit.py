@@ -0,0 +1,192 @@
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.core.config import settings
+
+# Ошибки, означающие перегрузку провайдера: по ним лимит снижается так же, как по росту задержки
+OVERLOAD_ERRORS = (TimeoutError, ConnectionError)
+# Текущая RTT - экспоненциальное среднее примерно по RTT_WINDOW последним обращениям
+RTT_WINDOW = 10
+# Рост оценки RTT без нагрузки в секунду: если провайдер стал медленнее насовсем,
+# оценка догоняет провайдера: за минуту она может вырасти в 1.8 раза
+BASE_RTT_DRIFT = 0.01
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Адаптивный лимит одновременных обращений к провайдеру канала.
+
+    Обращения сверх лимита ждут в очереди FIFO, а не уходят к провайдеру. Лимит подстраивается
+    по задержке и ошибкам перегрузки (OVERLOAD_ERRORS или исключение всего обращения):
+
+    - gradient: лимит умножается на отношение RTT без нагрузки (минимальной, медленно растущей)
+      к текущей RTT, умноженное на tolerance (градиент от 0.5 до 1), и получает запас sqrt(limit);
+      пока задержка не выросла больше чем в tolerance раз, лимит растёт, дальше - снижается
+    - aimd: успешное обращение быстрее slow_call увеличивает лимит на 1/limit (на 1 за круг
+      обращений), медленное обращение умножает его на backoff
+
+    Ошибка перегрузки в обоих режимах умножает лимит на backoff. Снижение выполняется один раз
+    на эпизод перегрузки: обращения, начатые до предыдущего снижения, лимит больше не уменьшают.
+    Пока занято меньше половины лимита, лимит не растёт: рост без нагрузки ничего не говорит о провайдере.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        algorithm: str = 'gradient',
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.9,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        slow_call: float = 5.0,
+        enabled: bool = True,
+    ) -> None:
+        if algorithm not in ('gradient', 'aimd'):
+            raise ValueError(f'Неизвестный алгоритм лимита: {algorithm}')
+        self.name = name
+        self.algorithm = algorithm
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.slow_call = slow_call
+        self.enabled = enabled
+        self.in_flight = 0
+        self.base_rtt = 0.0
+        self.rtt = 0.0
+        self._decreased_at = 0.0
+        self._observed_at = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @classmethod
+    def from_settings(cls, name: str) -> 'AdaptiveConcurrencyLimiter':
+        return cls(
+            name,
+            algorithm=settings.CONCURRENCY_ALGORITHM,
+            initial_limit=settings.CONCURRENCY_INITIAL_LIMIT,
+            min_limit=settings.CONCURRENCY_MIN_LIMIT,
+            max_limit=settings.CONCURRENCY_MAX_LIMIT,
+            backoff=settings.CONCURRENCY_BACKOFF,
+            tolerance=settings.CONCURRENCY_RTT_TOLERANCE,
+            slow_call=settings.CONCURRENCY_SLOW_CALL_MS / 1000,
+            enabled=settings.CONCURRENCY_LIMIT_ENABLED,
+        )
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> None:
+        """Занимает слот; при исчерпанном лимите ждёт освобождения в порядке очереди"""
+        if self.in_flight < self.current and not self._waiters:
+            self.in_flight += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Слот выдан одновременно с отменой: передаём слот следующему в очереди
+            if future.done() and not future.cancelled():
+                self.release(None)
+            raise
+
+    def release(self, started: float | None, dropped: bool = False) -> None:
+        """
+        Освобождает слот; started - время начала обращения по time.monotonic() (None - без замера),
+        dropped - обращение завершилось ошибкой перегрузки.
+        """
+        self.in_flight -= 1
+        if started is not None:
+            if dropped:
+                self._decrease(started)
+            else:
+                self._observe(started, time.monotonic() - started)
+        self._wake()
+
+    def wrap[T, R](
+        self, call: Callable[[list[T]], Awaitable[list[R | BaseException]]]
+    ) -> Callable[[list[T]], Awaitable[list[R | BaseException]]]:
+        """Оборачивает пакетное обращение к провайдеру лимитом"""
+        if not self.enabled:
+            return call
+
+        async def wrapper(items: list[T]) -> list[R | BaseException]:
+            await self.acquire()
+            started = time.monotonic()
+            try:
+                results = await call(items)
+            except Exception:
+                self.release(started, dropped=True)
+                raise
+            except BaseException:
+                self.release(None)
+                raise
+            self.release(started, dropped=any(isinstance(result, OVERLOAD_ERRORS) for result in results))
+            return results
+
+        return wrapper
+
+    def snapshot(self) -> dict[str, Any]:
+        if not self.enabled:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'algorithm': self.algorithm,
+            'limit': self.current,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'rtt_ms': round(self.rtt * 1000, 1),
+            'base_rtt_ms': round(self.base_rtt * 1000, 1),
+        }
+
+    def _observe(self, started: float, rtt: float) -> None:
+        now = time.monotonic()
+        if self.rtt == 0.0:
+            self.base_rtt = self.rtt = rtt
+            self._observed_at = now
+        self.rtt += (rtt - self.rtt) * 2 / (RTT_WINDOW + 1)
+        self.base_rtt = min(self.rtt, self.base_rtt * (1 + BASE_RTT_DRIFT * (now - self._observed_at)))
+        self._observed_at = now
+        if self.algorithm == 'aimd':
+            if rtt > self.slow_call:
+                self._decrease(started)
+                return
+            new_limit = self.limit + 1 / self.limit
+        else:
+            ratio = self.base_rtt / self.rtt if self.rtt > 0 else 1.0
+            gradient = max(0.5, min(1.0, self.tolerance * ratio))
+            new_limit = self.limit * gradient + math.sqrt(self.limit)
+            new_limit = self.limit * (1 - self.smoothing) + new_limit * self.smoothing
+            if new_limit < self.limit:
+                self._decrease(started, new_limit)
+                return
+        # Пока занято меньше половины лимита, рост ничего не говорит о провайдере
+        if self.in_flight + 1 >= self.limit / 2:
+            self.limit = min(self.max_limit, new_limit)
+
+    def _decrease(self, started: float, new_limit: float | None = None) -> None:
+        if started < self._decreased_at:
+            return
+        self.limit = max(self.min_limit, self.limit * self.backoff if new_limit is None else new_limit)
+        self._decreased_at = time.monotonic()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.current:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
@@ -0,0 +1,62 @@
+import re
+
+# Регулярные выражения компилируются один раз при импорте модуля
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+PHONE_SEPARATORS = re.compile(r'[\s\-().]')
+E164_DIGITS = re.compile(r'^[1-9]\d{7,14}$')
+TELEGRAM_CHAT_ID = re.compile(r'^-?\d{1,20}$')
+TELEGRAM_USERNAME = re.compile(r'^@[A-Za-z]\w{3,31}$')
+NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_email(value: str) -> str:
+    email = value.strip().lower()
+    if not EMAIL.match(email):
+        raise ValueError(f'Некорректный email: {value}')
+    return email
+
+
+def normalize_phone(value: str, country_code: str, trunk_prefix: str = '') -> str:
+    """
+    Номер в формате E.164 (+79001234567).
+
+    Номер с + или 00 считается международным. Национальный номер с префиксом выхода на междугороднюю
+    связь (trunk_prefix, например 8 в России) получает код страны country_code вместо префикса,
+    номер без кода страны - код страны в начале.
+    """
+    phone = PHONE_SEPARATORS.sub('', value)
+    if phone.startswith('+'):
+        digits = phone[1:]
+    elif phone.startswith('00'):
+        digits = phone[2:]
+    elif trunk_prefix and phone.startswith(trunk_prefix) and len(phone) > 10:
+        digits = country_code + phone[len(trunk_prefix) :]
+    elif phone.startswith(country_code) and len(phone) > 10:
+        digits = phone
+    else:
+        digits = country_code + phone
+    if not E164_DIGITS.match(digits):
+        raise ValueError(f'Некорректный номер телефона: {value}')
+    return f'+{digits}'
+
+
+def normalize_chat_id(value: str) -> str:
+    """Числовой ID чата или @username (имена в Telegram не зависят от регистра)"""
+    chat_id = value.strip()
+    if TELEGRAM_CHAT_ID.match(chat_id):
+        return chat_id
+    if TELEGRAM_USERNAME.match(chat_id):
+        return chat_id.lower()
+    raise ValueError(f'Некорректный Telegram ID: {value}')
+
+
+def is_valid_email(value: str) -> bool:
+    return EMAIL.match(value) is not None
+
+
+def is_valid_phone(value: str) -> bool:
+    return 7 <= len(NON_DIGITS.sub('', value)) <= 15
+
+
+def is_valid_chat_id(value: str) -> bool:
+    return TELEGRAM_CHAT_ID.match(value) is not None or TELEGRAM_USERNAME.match(value) is not None
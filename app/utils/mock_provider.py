@@ -0,0 +1,99 @@
+import asyncio
+import math
+import random
+import secrets
+
+from app.core.config import settings
+
+LATENCY_DISTRIBUTIONS = ('constant', 'uniform', 'lognormal')
+ERROR_TYPES = ('reject', 'timeout', 'unavailable')
+# Квантиль 0.99 стандартного нормального распределения
+P99_Z = 2.326
+
+
+class MockProvider:
+    """
+    Имитация провайдера канала для mock-режима и нагрузочных замеров.
+
+    Задержка пакета берётся из распределения: constant - min_ms, uniform - от min_ms до max_ms,
+    lognormal - медиана sqrt(min_ms * max_ms) и p99 около max_ms (длинный хвост). Каждое сообщение пакета
+    не доставляется с вероятностью failure_rate, тип ошибки выбирается из error_types:
+    reject - провайдер отклонил сообщение, timeout - ответ не пришёл за timeout_ms (пакет ждёт timeout_ms),
+    unavailable - провайдер недоступен. При заданном seed последовательность задержек и ошибок
+    воспроизводится; генератор у каждого канала свой, поэтому каналы не сдвигают выборки друг друга.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        *,
+        seed: int | None = None,
+        latency: str = 'uniform',
+        min_ms: float = 100.0,
+        max_ms: float = 500.0,
+        failure_rate: float = 0.2,
+        error_types: tuple[str, ...] = ('reject',),
+        timeout_ms: float = 1000.0,
+    ) -> None:
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f'Неизвестное распределение задержки: {latency}')
+        unknown = set(error_types) - set(ERROR_TYPES)
+        if unknown or not error_types:
+            raise ValueError(f'Неизвестные типы ошибок: {", ".join(sorted(unknown)) or "-"}')
+        self.channel = channel
+        self.latency = latency
+        self.min_ms = max(0.0, min_ms)
+        self.max_ms = max(self.min_ms, max_ms)
+        self.failure_rate = min(1.0, max(0.0, failure_rate))
+        self.error_types = error_types
+        self.timeout_ms = timeout_ms
+        self.rng: random.Random = (
+            random.Random(f'{seed}:{channel}')  # noqa: S311
+            if seed is not None
+            else secrets.SystemRandom()
+        )
+
+    @classmethod
+    def from_settings(cls, channel: str) -> 'MockProvider':
+        return cls(
+            channel,
+            seed=settings.MOCK_SEED,
+            latency=settings.MOCK_LATENCY,
+            min_ms=settings.MOCK_LATENCY_MIN_MS,
+            max_ms=settings.MOCK_LATENCY_MAX_MS,
+            failure_rate=settings.MOCK_FAILURE_RATE,
+            error_types=tuple(kind.strip() for kind in settings.MOCK_ERROR_TYPES.split(',') if kind.strip()),
+            timeout_ms=settings.MOCK_TIMEOUT_MS,
+        )
+
+    def delay(self) -> float:
+        """Задержка обращения к провайдеру в секундах"""
+        if self.latency == 'constant' or self.max_ms == self.min_ms:
+            return self.min_ms / 1000
+        if self.latency == 'uniform':
+            return self.rng.uniform(self.min_ms, self.max_ms) / 1000
+        median = math.sqrt(max(self.min_ms, 1.0) * self.max_ms)
+        sigma = math.log(self.max_ms / median) / P99_Z
+        return self.rng.lognormvariate(math.log(median), sigma) / 1000
+
+    def outcomes(self, count: int) -> list[str | None]:
+        """Результат по каждому сообщению: None - доставлено, иначе тип ошибки"""
+        return [
+            self.rng.choice(self.error_types) if self.rng.random() < self.failure_rate else None for _ in range(count)
+        ]
+
+    async def send(self, count: int) -> list[str | None]:
+        """Ждёт ответа провайдера на пакет из count сообщений и возвращает результаты"""
+        delay = self.delay()
+        outcomes = self.outcomes(count)
+        if 'timeout' in outcomes:
+            delay = max(delay, self.timeout_ms / 1000)
+        await asyncio.sleep(delay)
+        return outcomes
+
+    @staticmethod
+    def error(kind: str, message: str) -> Exception:
+        """Исключение для ошибки типа timeout или unavailable"""
+        if kind == 'timeout':
+            return TimeoutError(f'Mock: таймаут провайдера: {message}')
+        return ConnectionError(f'Mock: провайдер недоступен: {message}')
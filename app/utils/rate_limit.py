@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """
+    Token bucket с резервированием: reserve() сразу списывает токен и возвращает,
+    сколько нужно подождать, поэтому конкурентные вызовы выстраиваются в очередь без гонок.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def block(self, seconds: float) -> None:
+        """Запрещает выдачу токенов на seconds секунд (например, по retry_after от провайдера)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    @property
+    def idle(self) -> bool:
+        now = time.monotonic()
+        refilled = self.tokens + (now - self.updated) * self.rate
+        return refilled >= self.capacity and self.blocked_until <= now
+
+
+class TelegramRateLimiter:
+    """Глобальный лимит бота и лимит на каждый чат; число отслеживаемых чатов ограничено"""
+
+    def __init__(
+        self,
+        global_rate: float,
+        global_burst: float,
+        chat_rate: float,
+        chat_burst: float,
+        max_chats: int = 10000,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self.chats: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    async def acquire(self, chat_id: str) -> None:
+        wait = max(self._chat_bucket(chat_id).reserve(), self.global_bucket.reserve())
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def retry_after(self, chat_id: str | None, seconds: float) -> None:
+        if chat_id is None:
+            self.global_bucket.block(seconds)
+        else:
+            self._chat_bucket(chat_id).block(seconds)
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            bucket = self.chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+            if len(self.chats) > self.max_chats:
+                self._evict()
+        else:
+            self.chats.move_to_end(chat_id)
+        return bucket
+
+    def _evict(self) -> None:
+        # Полный и не заблокированный бакет эквивалентен новому, поэтому такой бакет можно забыть
+        oldest_chat, oldest = next(iter(self.chats.items()))
+        if oldest.idle or len(self.chats) > self.max_chats * 2:
+            del self.chats[oldest_chat]
@@ -0,0 +1,18 @@
+from collections.abc import Iterable
+from typing import Any
+
+from starlette.responses import Response
+
+
+class JSONArrayResponse(Response):
+    """
+    JSON-массив из заранее сериализованных элементов.
+
+    Элементы склеиваются как есть, без валидации по response_model и повторной сериализации,
+    поэтому вызывающий отвечает за то, что каждый элемент - корректный JSON.
+    """
+
+    media_type = 'application/json'
+
+    def render(self, content: Iterable[bytes] | Any) -> bytes:
+        return b'[' + b','.join(content) + b']'
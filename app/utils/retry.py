@@ -6,9 +6,14 @@ from typing import Any
 
 from loguru import logger
 
+from app.core.metrics import RETRY_ATTEMPTS_TOTAL
+
 
 def retry_async(
-    max_attempts: int = 3, delay: float = 1.0, backoff_factor: float = 2.0, exceptions: tuple[type, ...] = (Exception,)
+    max_attempts: int = 3,
+    delay: float = 1.0,
+    backoff_factor: float = 2.0,
+    exceptions: tuple[type, ...] = (Exception,),
 ) -> Callable[..., Callable[..., Any]]:
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(func)
@@ -24,6 +29,7 @@ def retry_async(
                         logger.error(f'Попытки исчерпаны для {func.__name__}: {e!s}')
                         raise
 
+                    RETRY_ATTEMPTS_TOTAL.labels(func.__name__).inc()
                     jitter_amount = secrets.SystemRandom().uniform(0.1, 0.3) * current_delay
                     sleep_time = min(current_delay + jitter_amount, 60.0)
                     logger.warning(
@@ -53,13 +59,19 @@ class RetryConfig:
         self.max_delay = max_delay
         self.jitter = jitter
 
+    def compute_delay(self, attempt: int) -> float:
+        """Пауза перед попыткой attempt + 1 после неудачной попытки attempt (нумерация с 1)"""
+        delay = self.initial_delay * self.backoff_factor ** (attempt - 1)
+        if self.jitter:
+            delay += secrets.SystemRandom().uniform(0.1, 0.3) * delay
+        return min(delay, self.max_delay)
+
 
 async def retry_with_config(func: Callable[..., Any], config: RetryConfig, *args: Any, **kwargs: dict[str, Any]) -> Any:
     last_exception = None
-    current_delay = config.initial_delay
     for attempt in range(1, config.max_attempts + 1):
         try:
-            logger.debug(f'Попытка {attempt}/{config.max_attempts} для {getattr(func, "__name__", str(func))}')
+            logger.debug('Попытка {}/{} для {}', attempt, config.max_attempts, getattr(func, '__name__', func))
             if asyncio.iscoroutinefunction(func):
                 result = await func(*args, **kwargs)
             else:
@@ -75,17 +87,12 @@ async def retry_with_config(func: Callable[..., Any], config: RetryConfig, *args
                 logger.error(f'Попытки исчерпаны для {func.__name__}: {e!s}')
                 raise
 
-            if config.jitter:
-                jitter_amount = secrets.SystemRandom().uniform(0.1, 0.3) * current_delay
-                sleep_time = min(current_delay + jitter_amount, config.max_delay)
-            else:
-                sleep_time = min(current_delay, config.max_delay)
-
+            RETRY_ATTEMPTS_TOTAL.labels(getattr(func, '__name__', 'unknown')).inc()
+            sleep_time = config.compute_delay(attempt)
             logger.warning(
                 f'Попытка {attempt} не удалась для {getattr(func, "__name__", str(func))}: {e!s}. Повтор через {
                     sleep_time:.2f}с'
             )
             await asyncio.sleep(sleep_time)
-            current_delay *= config.backoff_factor
 
     raise last_exception  # type: ignore
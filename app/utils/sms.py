@@ -0,0 +1,63 @@
+from typing import Literal
+
+# Основная таблица GSM 03.38: один септет на символ
+GSM7_BASIC = frozenset(
+    '@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞ\x1bÆæßÉ !"#¤%&\'()*+,-./0123456789:;<=>?'
+    '¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà'
+)
+# Таблица расширения: escape-септет и символ, два септета
+GSM7_EXTENSION = frozenset('^{}\\[~]|€\f')
+GSM7_CHARS = GSM7_BASIC | GSM7_EXTENSION
+
+GSM7_SINGLE, GSM7_MULTI = 160, 153
+UCS2_SINGLE, UCS2_MULTI = 70, 67
+
+SMSEncoding = Literal['gsm7', 'ucs2']
+
+
+def sms_encoding(text: str) -> SMSEncoding:
+    return 'gsm7' if GSM7_CHARS.issuperset(text) else 'ucs2'
+
+
+def sms_units(text: str, encoding: SMSEncoding) -> int:
+    """Длина в септетах для GSM-7 или в 16-битных единицах для UCS-2"""
+    if encoding == 'gsm7':
+        return len(text) + sum(text.count(ch) for ch in GSM7_EXTENSION)
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _units(ch: str, encoding: SMSEncoding) -> int:
+    if encoding == 'gsm7':
+        return 2 if ch in GSM7_EXTENSION else 1
+    return 2 if ord(ch) > 0xFFFF else 1
+
+
+def sms_segments(text: str) -> int:
+    encoding = sms_encoding(text)
+    units = sms_units(text, encoding)
+    single, multi = (GSM7_SINGLE, GSM7_MULTI) if encoding == 'gsm7' else (UCS2_SINGLE, UCS2_MULTI)
+    if units <= single:
+        return 1
+    return -(-units // multi)
+
+
+def truncate_sms(text: str, max_segments: int) -> str:
+    """
+    Обрезает текст так, чтобы он уместился в max_segments сегментов своей кодировки.
+
+    Обрезанный текст заканчивается многоточием ("..." для GSM-7, чтобы не переключить сообщение в UCS-2).
+    """
+    if max_segments <= 0 or sms_segments(text) <= max_segments:
+        return text
+    encoding = sms_encoding(text)
+    if encoding == 'gsm7':
+        capacity, marker = (GSM7_SINGLE if max_segments == 1 else GSM7_MULTI * max_segments), '...'
+    else:
+        capacity, marker = (UCS2_SINGLE if max_segments == 1 else UCS2_MULTI * max_segments), '…'
+    budget = capacity - sms_units(marker, encoding)
+    used = 0
+    for index, ch in enumerate(text):
+        used += _units(ch, encoding)
+        if used > budget:
+            return text[:index] + marker
+    return text
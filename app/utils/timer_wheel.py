@@ -0,0 +1,113 @@
+import math
+
+
+class TimerWheel[T]:
+    """
+    Иерархическое колесо таймеров.
+
+    Время делится на тики длиной tick секунд. Уровень 0 - slots ячеек по одному тику, ячейка уровня L
+    охватывает slots**L тиков. Таймер кладётся на нижний уровень, покрывающий его срок, и спускается
+    ниже, когда колесо доходит до его ячейки, поэтому постановка и отмена стоят O(1), а продвижение -
+    O(1) на тик плюс перенос таймеров из наступившей ячейки. Таймеры дальше верхнего уровня ждут
+    полного оборота колеса в отдельной ячейке. Таймер срабатывает не раньше срока и не позже чем через тик.
+    """
+
+    def __init__(self, tick: float, slots: int = 256, levels: int = 4, now: float = 0.0) -> None:
+        if tick <= 0 or slots < 2 or levels < 1:
+            raise ValueError('Некорректные параметры колеса таймеров')
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.current = math.floor(now / tick)
+        # Число тиков в ячейке каждого уровня; spans[levels] - полный оборот колеса
+        self._spans = [slots**level for level in range(levels + 1)]
+        self._wheels: list[list[set[str]]] = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._overflow: set[str] = set()
+        self._expired: set[str] = set()
+        # key -> (тик срока, значение, ячейка с ключом)
+        self._entries: dict[str, tuple[int, T, set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def schedule(self, key: str, due: float, value: T) -> None:
+        """Ставит таймер на время due (в тех же единицах, что now); таймер с тем же ключом заменяется"""
+        self.cancel(key)
+        tick = math.ceil(due / self.tick)
+        if tick <= self.current:
+            self._expired.add(key)
+            self._entries[key] = (tick, value, self._expired)
+        else:
+            self._place(key, tick, value)
+
+    def cancel(self, key: str) -> T | None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        entry[2].discard(key)
+        return entry[1]
+
+    def advance(self, now: float) -> list[tuple[str, T]]:
+        """Продвигает колесо до времени now и возвращает сработавшие таймеры в порядке сроков"""
+        target = math.floor(now / self.tick)
+        due = self._collect(self._expired)
+        wheel = self._wheels[0]
+        while self.current < target and self._entries:
+            # Пустые ячейки нижнего уровня до границы оборота (где возможен спуск) пропускаются
+            boundary = min(target, (self.current // self.slots + 1) * self.slots)
+            tick = self.current + 1
+            while tick < boundary and not wheel[tick % self.slots]:
+                tick += 1
+            self.current = tick
+            if tick % self.slots == 0:
+                # Сначала спускаются таймеры верхних уровней: за один тик таймер может пройти все уровни
+                if tick % self._spans[self.levels] == 0:
+                    self._cascade(self._overflow)
+                for level in range(self.levels - 1, 0, -1):
+                    if tick % self._spans[level] == 0:
+                        self._cascade(self._wheels[level][(tick // self._spans[level]) % self.slots])
+            due.extend(self._collect(wheel[tick % self.slots]))
+        # Пустое колесо перескакивает простой целиком
+        self.current = max(self.current, target)
+        return due
+
+    def next_deadline(self) -> float | None:
+        """Время ближайшего тика, на котором колесо выдаст или перенесёт таймеры; None - таймеров нет"""
+        if not self._entries:
+            return None
+        if self._expired:
+            return self.current * self.tick
+        boundary = (self.current // self.slots + 1) * self.slots
+        for tick in range(self.current + 1, boundary):
+            if self._wheels[0][tick % self.slots]:
+                return tick * self.tick
+        return boundary * self.tick
+
+    def _place(self, key: str, due: int, value: T) -> None:
+        # Срок не раньше текущего тика: при спуске таймер с наступившим сроком попадает в ячейку текущего тика,
+        # которая разбирается сразу после спуска
+        delta = due - self.current
+        bucket = self._overflow
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                bucket = self._wheels[level][(due // self._spans[level]) % self.slots]
+                break
+        bucket.add(key)
+        self._entries[key] = (due, value, bucket)
+
+    def _cascade(self, bucket: set[str]) -> None:
+        keys = list(bucket)
+        bucket.clear()
+        for key in keys:
+            due, value, _ = self._entries[key]
+            self._place(key, due, value)
+
+    def _collect(self, bucket: set[str]) -> list[tuple[str, T]]:
+        if not bucket:
+            return []
+        entries = sorted(((key, self._entries.pop(key)) for key in bucket), key=lambda item: item[1][0])
+        bucket.clear()
+        return [(key, entry[1]) for key, entry in entries]
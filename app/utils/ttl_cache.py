@@ -0,0 +1,50 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache[K, V]:
+    """
+    Ограниченный LRU-кэш с временем жизни записей.
+
+    Записи хранятся в порядке последнего обращения. При вставке сверх max_size вытесняется
+    давно не использованная запись, просроченные записи удаляются при чтении и при вставке
+    (с начала очереди), поэтому размер кэша не превышает max_size.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self._items: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: K) -> V | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        now = time.monotonic()
+        self._items[key] = (now + self.ttl, value)
+        self._items.move_to_end(key)
+        self._evict(now)
+
+    def pop(self, key: K) -> V | None:
+        item = self._items.pop(key, None)
+        return item[1] if item is not None else None
+
+    def _evict(self, now: float) -> None:
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+        while self._items:
+            expires_at, _ = next(iter(self._items.values()))
+            if expires_at > now:
+                break
+            self._items.popitem(last=False)
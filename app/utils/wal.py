@@ -0,0 +1,256 @@
+import asyncio
+import fcntl
+import os
+import struct
+import time
+import zlib
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.core.metrics import OUTBOX_COMMIT_RECORDS, OUTBOX_FSYNC_DURATION
+
+# Заголовок записи: длина и CRC32 полезной нагрузки
+HEADER = struct.Struct('>II')
+SEGMENT_SUFFIX = '.wal'
+# Файл блокировки директории: уплотнение удаляет чужие сегменты, поэтому журнал ведёт один процесс
+LOCK_NAME = 'LOCK'
+
+sync_data = getattr(os, 'fdatasync', os.fsync)
+
+
+def frame(payload: bytes) -> bytes:
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def read_segment(path: Path) -> Iterator[bytes]:
+    """Записи сегмента по порядку; чтение останавливается на оборванной или повреждённой записи"""
+    data = path.read_bytes()
+    offset = 0
+    while offset < len(data):
+        start = offset + HEADER.size
+        if start > len(data):
+            break
+        length, crc = HEADER.unpack_from(data, offset)
+        payload = data[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        yield payload
+        offset = start + length
+    if offset < len(data):
+        logger.warning(f'Сегмент {path.name}: отброшен повреждённый хвост ({len(data) - offset} байт)')
+
+
+class WriteAheadLog:
+    """
+    Журнал упреждающей записи из сегментов в директории.
+
+    append буферизует запись и возвращает future, который завершается после fsync. Фоновый писатель
+    сбрасывает весь накопленный буфер одной записью и одним fsync (групповая фиксация): пока идёт fsync,
+    новые записи копятся для следующей группы, поэтому стоимость fsync делится на все записи группы.
+
+    Когда активный сегмент вырастает на segment_bytes, журнал уплотняется: открывается новый сегмент,
+    в него пишутся актуальные записи из snapshot, после чего старые сегменты удаляются.
+    Директорию занимает один процесс: load и open берут эксклюзивную блокировку файла LOCK,
+    второй процесс с той же директорией получает RuntimeError.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 16 * 1024 * 1024,
+        fsync: bool = True,
+        commit_delay: float = 0.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.commit_delay = commit_delay
+        # Актуальные записи для уплотнения; назначается владельцем журнала
+        self.snapshot: Callable[[], list[bytes]] = list
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='wal')
+        self._fd: int | None = None
+        self._lock_fd: int | None = None
+        self._size = 0
+        self._compact_at = segment_bytes
+        self._broken = False
+        self._buffer: list[bytes] = []
+        self._waiters: list[asyncio.Future[None]] = []
+        self._wakeup = asyncio.Event()
+        self._writer: asyncio.Task[None] | None = None
+        self._closing = False
+        self.commits = 0
+        self.records = 0
+
+    def segments(self) -> list[Path]:
+        return sorted(self.directory.glob(f'*{SEGMENT_SUFFIX}'))
+
+    async def load(self) -> list[bytes]:
+        """Все записи существующих сегментов по порядку (вызывается до open)"""
+        await self._run(self._lock)
+        records: list[bytes] = await self._run(self._read_all)
+        return records
+
+    async def open(self) -> None:
+        """Открывает новый сегмент со snapshot и удаляет прежние; запускает писателя"""
+        if self._writer is not None:
+            return
+        self._closing = False
+        await self._run(self._lock)
+        await self._run(self._rotate, self.snapshot())
+        self._writer = asyncio.create_task(self._write_loop(), name='wal-writer')
+        logger.info(f'WriteAheadLog открыт ({self.directory})')
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await asyncio.gather(self._writer, return_exceptions=True)
+        self._writer = None
+        if self._fd is not None:
+            await self._run(os.close, self._fd)
+            self._fd = None
+        if self._lock_fd is not None:
+            # Закрытие дескриптора снимает блокировку
+            await self._run(os.close, self._lock_fd)
+            self._lock_fd = None
+
+    def append(self, payload: bytes) -> asyncio.Future[None]:
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if self._writer is None:
+            future.set_exception(RuntimeError('WriteAheadLog не открыт'))
+            return future
+        self._buffer.append(frame(payload))
+        self._waiters.append(future)
+        self._wakeup.set()
+        return future
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'segments': len(self.segments()),
+            'segment_size': self._size,
+            'commits': self.commits,
+            'records': self.records,
+            'pending': len(self._buffer),
+        }
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if self.commit_delay > 0 and not self._closing:
+                await asyncio.sleep(self.commit_delay)
+            self._wakeup.clear()
+            await self._commit()
+            if self._closing and not self._buffer:
+                return
+
+    async def _commit(self) -> None:
+        if not self._buffer:
+            return
+        data = b''.join(self._buffer)
+        waiters = self._waiters
+        self._buffer, self._waiters = [], []
+        try:
+            if self._broken:
+                await self._run(self._rotate, self.snapshot())
+            fsync_duration = await self._run(self._write, data)
+        except OSError as e:
+            # Хвост сегмента мог остаться оборванным: следующая группа пишется в новый сегмент
+            self._broken = True
+            logger.error(f'Ошибка записи WAL: {e!s}')
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        self.commits += 1
+        self.records += len(waiters)
+        OUTBOX_COMMIT_RECORDS.observe(len(waiters))
+        if self.fsync:
+            OUTBOX_FSYNC_DURATION.observe(fsync_duration)
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        if self._size >= self._compact_at:
+            try:
+                await self._run(self._rotate, self.snapshot())
+            except OSError as e:
+                self._broken = True
+                logger.error(f'Ошибка уплотнения WAL: {e!s}')
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _lock(self) -> None:
+        if self._lock_fd is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.directory / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise RuntimeError(
+                f'Директория WAL {self.directory} занята другим процессом: каждому процессу нужна своя'
+            ) from None
+        self._lock_fd = fd
+
+    def _read_all(self) -> list[bytes]:
+        return [payload for path in self.segments() for payload in read_segment(path)]
+
+    def _write(self, data: bytes) -> float:
+        """Дописывает группу записей; возвращает длительность fsync"""
+        assert self._fd is not None
+        write_all(self._fd, data)
+        self._size += len(data)
+        if not self.fsync:
+            return 0.0
+        started = time.perf_counter()
+        sync_data(self._fd)
+        return time.perf_counter() - started
+
+    def _rotate(self, snapshot: list[bytes]) -> None:
+        """
+        Новый сегмент начинается с актуальных записей, поэтому предыдущие сегменты больше не нужны.
+
+        При сбое до удаления старых сегментов при чтении они просто дублируют snapshot.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        previous = self.segments()
+        number = int(previous[-1].stem) + 1 if previous else 1
+        path = self.directory / f'{number:016d}{SEGMENT_SUFFIX}'
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            data = b''.join(frame(payload) for payload in snapshot)
+            write_all(fd, data)
+            os.fsync(fd)
+        except OSError:
+            os.close(fd)
+            raise
+        self._sync_directory()
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = fd
+        self._size = len(data)
+        # Порог растёт вместе со snapshot, чтобы большой набор актуальных записей не уплотнялся на каждой группе
+        self._compact_at = self._size + self.segment_bytes
+        self._broken = False
+        for old in previous:
+            old.unlink(missing_ok=True)
+        self._sync_directory()
+
+    def _sync_directory(self) -> None:
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
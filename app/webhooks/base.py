@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+
+from app.schemas.webhook_schemas import WebhookRegistration
+
+
+class WebhookStore(ABC):
+    """Хранилище подписок на webhooks"""
+
+    async def start(self) -> None:  # noqa: B027
+        """Открывает ресурсы хранилища"""
+
+    async def close(self) -> None:  # noqa: B027
+        """Закрывает ресурсы хранилища"""
+
+    @abstractmethod
+    async def get(self, webhook_id: str) -> WebhookRegistration | None:
+        """Подписка по ID; None, если её нет"""
+
+    @abstractmethod
+    async def by_tenant(self, tenant: str) -> list[WebhookRegistration]:
+        """Подписки клиента в порядке регистрации"""
+
+    @abstractmethod
+    async def save(self, webhook: WebhookRegistration) -> None:
+        """Сохраняет подписку, заменяя запись с тем же ID"""
+
+    @abstractmethod
+    async def delete(self, webhook_id: str) -> bool:
+        """Удаляет подписку; False, если её не было"""
@@ -0,0 +1,12 @@
+from app.core.config import settings
+from app.webhooks.base import WebhookStore
+from app.webhooks.memory import MemoryWebhookStore
+from app.webhooks.sqlite import SQLiteWebhookStore
+
+
+def create_webhook_store() -> WebhookStore:
+    if settings.WEBHOOK_BACKEND == 'sqlite':
+        return SQLiteWebhookStore(path=settings.WEBHOOK_SQLITE_PATH)
+    if settings.WEBHOOK_BACKEND == 'memory':
+        return MemoryWebhookStore()
+    raise ValueError(f'Неизвестный WEBHOOK_BACKEND: {settings.WEBHOOK_BACKEND}')
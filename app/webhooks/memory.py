@@ -0,0 +1,21 @@
+from app.schemas.webhook_schemas import WebhookRegistration
+from app.webhooks.base import WebhookStore
+
+
+class MemoryWebhookStore(WebhookStore):
+    """Подписки на webhooks в памяти процесса"""
+
+    def __init__(self) -> None:
+        self.webhooks: dict[str, WebhookRegistration] = {}
+
+    async def get(self, webhook_id: str) -> WebhookRegistration | None:
+        return self.webhooks.get(webhook_id)
+
+    async def by_tenant(self, tenant: str) -> list[WebhookRegistration]:
+        return [webhook for webhook in self.webhooks.values() if webhook.tenant == tenant]
+
+    async def save(self, webhook: WebhookRegistration) -> None:
+        self.webhooks[webhook.id] = webhook
+
+    async def delete(self, webhook_id: str) -> bool:
+        return self.webhooks.pop(webhook_id, None) is not None
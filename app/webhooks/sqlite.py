@@ -0,0 +1,84 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.schemas.webhook_schemas import WebhookRegistration
+from app.webhooks.base import WebhookStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhooks (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS webhooks_tenant ON webhooks (tenant, created_at);
+"""
+
+UPSERT = (
+    'INSERT INTO webhooks (id, tenant, created_at, data) VALUES (?, ?, ?, ?) '
+    'ON CONFLICT(id) DO UPDATE SET tenant = excluded.tenant, data = excluded.data'
+)
+
+
+class SQLiteWebhookStore(WebhookStore):
+    """Подписки на webhooks в файле SQLite (WAL), общие для всех процессов, открывших один файл"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-webhooks')
+        self._conn: sqlite3.Connection | None = None
+
+    async def start(self) -> None:
+        await self._run(self._connect)
+        logger.info(f'SQLiteWebhookStore открыт ({self.path})')
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+    async def get(self, webhook_id: str) -> WebhookRegistration | None:
+        rows = await self._run(self._fetch, 'SELECT data FROM webhooks WHERE id = ?', (webhook_id,))
+        return WebhookRegistration.model_validate_json(rows[0][0]) if rows else None
+
+    async def by_tenant(self, tenant: str) -> list[WebhookRegistration]:
+        rows = await self._run(self._fetch, 'SELECT data FROM webhooks WHERE tenant = ? ORDER BY created_at', (tenant,))
+        return [WebhookRegistration.model_validate_json(row[0]) for row in rows]
+
+    async def save(self, webhook: WebhookRegistration) -> None:
+        params = (webhook.id, webhook.tenant, webhook.created_at.isoformat(), webhook.model_dump_json())
+        await self._run(self._fetch, UPSERT, params)
+
+    async def delete(self, webhook_id: str) -> bool:
+        deleted: bool = await self._run(self._delete, webhook_id)
+        return deleted
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> None:
+        if self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    def _connection(self) -> sqlite3.Connection:
+        self._connect()
+        assert self._conn is not None
+        return self._conn
+
+    def _fetch(self, sql: str, params: tuple[Any, ...]) -> list[tuple[Any, ...]]:
+        return self._connection().execute(sql, params).fetchall()
+
+    def _delete(self, webhook_id: str) -> bool:
+        return self._connection().execute('DELETE FROM webhooks WHERE id = ?', (webhook_id,)).rowcount > 0
@@ -0,0 +1,85 @@
+"""
+Процесс доставки для DISPATCH_MODE=shared.
+
+API-процессы (uvicorn --workers N) только принимают уведомления и кладут их в общую очередь,
+а процессы доставки забирают задачи под аренду и отправляют их своими пулами воркеров.
+Число процессов доставки не зависит от числа процессов API.
+
+Запуск: python -m app.worker --processes 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+from collections.abc import Sequence
+
+from app.core.config import settings
+from app.core.logger_config import setup_logger
+from app.services.dispatcher import notification_dispatcher
+from app.services.notification_service import notification_service
+from app.services.webhook_dispatcher import webhook_dispatcher
+from app.services.webhook_service import webhook_service
+
+
+async def serve() -> None:
+    logger = setup_logger(
+        log_dir='logs',
+        log_file='worker.log',
+        log_level=settings.LOG_LEVEL,
+        rotation='100 MB',
+        retention='10 days',
+        log_format=settings.LOG_FORMAT,
+        enqueue=settings.LOG_ENQUEUE,
+        sample_rates={'INFO': settings.LOG_SAMPLE_RATE_INFO, 'DEBUG': settings.LOG_SAMPLE_RATE_DEBUG},
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info('Запуск процесса доставки...')
+    await notification_service.start()
+    await webhook_service.start()
+    await webhook_dispatcher.start()
+    await notification_dispatcher.start()
+    await stop.wait()
+    logger.info('Остановка процесса доставки...')
+    await notification_dispatcher.stop()
+    await webhook_dispatcher.stop()
+    await webhook_service.close()
+    await notification_service.close()
+
+
+def run() -> None:
+    asyncio.run(serve())
+
+
+def terminate(processes: Sequence[multiprocessing.process.BaseProcess]) -> None:
+    for process in processes:
+        process.terminate()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=settings.WORKER_PROCESSES)
+    args = parser.parse_args()
+    if settings.DISPATCH_MODE != 'shared':
+        parser.error('процессы доставки работают только при DISPATCH_MODE=shared')
+
+    if args.processes <= 1:
+        run()
+        return
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run, name=f'notification-worker-{i}') for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    # Ctrl+C получают все процессы группы, SIGTERM пересылается дочерним процессам
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: terminate(processes))
+    for process in processes:
+        process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Mapping, Sequence
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class WorkItem:
+    id: str
+    lane: str
+    payload: bytes
+    # Аренда, под которой задача выдана обработчику; None - задача ещё не выдана
+    lease: str | None = None
+    # Сколько раз задача выдавалась с момента постановки в очередь
+    deliveries: int = 0
+
+
+class WorkQueue(ABC):
+    """
+    Общая для нескольких процессов очередь задач с арендой.
+
+    claim выдаёт задачу под аренду на visibility секунд: пока аренда действует, задачу не получит
+    другой обработчик, а если обработчик не подтвердил её за это время (например, процесс упал),
+    задача снова становится доступной. Изменяющие операции ставятся в порядок выполнения в момент
+    вызова, поэтому, например, enqueue повтора всегда выполняется раньше ack, вызванного после него.
+    """
+
+    async def start(self) -> None:  # noqa: B027
+        """Открывает ресурсы очереди"""
+
+    async def close(self) -> None:  # noqa: B027
+        """Закрывает ресурсы очереди"""
+
+    @abstractmethod
+    def enqueue(self, item: WorkItem, delay: float = 0.0) -> Awaitable[None]:
+        """Ставит задачу через delay секунд; задача с тем же id заменяется, её аренда снимается"""
+
+    @abstractmethod
+    async def claim(self, quotas: Mapping[str, int], limit: int, visibility: float) -> list[WorkItem]:
+        """
+        Выдаёт до limit доступных задач под аренду.
+
+        Сначала из каждой полосы берётся до quotas[полоса] задач, остаток добирается по порядку полос.
+        """
+
+    @abstractmethod
+    def cancel(self, item_id: str) -> Awaitable[WorkItem | None]:
+        """Удаляет задачу, ещё не выданную обработчику; None - такой задачи нет или она выдана"""
+
+    @abstractmethod
+    def ack(self, item: WorkItem) -> Awaitable[None]:
+        """Удаляет выполненную задачу, если аренда ещё принадлежит обработчику"""
+
+    @abstractmethod
+    def release(self, items: Sequence[WorkItem]) -> Awaitable[None]:
+        """Возвращает задачи в очередь без ожидания окончания аренды"""
+
+    @abstractmethod
+    def extend(self, items: Sequence[WorkItem], visibility: float) -> Awaitable[None]:
+        """Продлевает аренду задач ещё на visibility секунд"""
+
+    @abstractmethod
+    async def stats(self) -> dict[str, dict[str, int]]:
+        """Число задач по полосам: ready - доступны, delayed - ждут срока, leased - в аренде"""
@@ -0,0 +1,9 @@
+from app.core.config import settings
+from app.workqueue.base import WorkQueue
+from app.workqueue.sqlite import SQLiteWorkQueue
+
+
+def create_work_queue() -> WorkQueue:
+    if settings.WORK_QUEUE_BACKEND == 'sqlite':
+        return SQLiteWorkQueue(path=settings.WORK_QUEUE_SQLITE_PATH)
+    raise ValueError(f'Неизвестный WORK_QUEUE_BACKEND: {settings.WORK_QUEUE_BACKEND}')
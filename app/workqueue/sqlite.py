@@ -0,0 +1,174 @@
+import asyncio
+import sqlite3
+import time
+import uuid
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from app.workqueue.base import WorkItem, WorkQueue
+
+# Выданная задача хранит в available_at срок окончания аренды, поэтому отдельная проверка аренды
+# при выборке не нужна: задача с истёкшей арендой выбирается как обычная доступная
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_queue (
+    id TEXT PRIMARY KEY,
+    lane TEXT NOT NULL,
+    available_at REAL NOT NULL,
+    lease TEXT,
+    deliveries INTEGER NOT NULL DEFAULT 0,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_work_queue_lane_available ON work_queue (lane, available_at);
+"""
+
+UPSERT = """
+INSERT INTO work_queue (id, lane, available_at, lease, deliveries, payload) VALUES (?, ?, ?, NULL, 0, ?)
+ON CONFLICT (id) DO UPDATE SET
+    lane = excluded.lane, available_at = excluded.available_at, lease = NULL, deliveries = 0, payload = excluded.payload
+"""
+
+CANCEL = 'DELETE FROM work_queue WHERE id = ? AND lease IS NULL RETURNING lane, payload'
+
+SELECT_READY = 'SELECT id FROM work_queue WHERE lane = ? AND available_at <= ? ORDER BY available_at LIMIT ?'
+LEASE = (
+    'UPDATE work_queue SET available_at = ?, lease = ?, deliveries = deliveries + 1 WHERE id = ? '
+    'RETURNING deliveries, payload'
+)
+
+STATS = """
+SELECT lane,
+    SUM(available_at <= :now),
+    SUM(available_at > :now AND lease IS NULL),
+    SUM(available_at > :now AND lease IS NOT NULL)
+FROM work_queue GROUP BY lane
+"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Очередь в файле SQLite (WAL), общая для всех процессов, открывших один файл.
+
+    Выдача задач - одна транзакция BEGIN IMMEDIATE, поэтому два процесса не получат одну задачу.
+    Все обращения к соединению выполняются в одном потоке в порядке вызова. Время - wall clock,
+    так как аренду проверяют разные процессы.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-work-queue')
+        self._conn: sqlite3.Connection | None = None
+
+    async def start(self) -> None:
+        await self._submit(self._connect)
+        logger.info(f'SQLiteWorkQueue открыт ({self.path})')
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._submit(self._conn.close)
+            self._conn = None
+
+    def enqueue(self, item: WorkItem, delay: float = 0.0) -> asyncio.Future[None]:
+        return self._submit(self._enqueue, item, delay)
+
+    async def claim(self, quotas: Mapping[str, int], limit: int, visibility: float) -> list[WorkItem]:
+        if limit <= 0:
+            return []
+        items: list[WorkItem] = await self._submit(self._claim, dict(quotas), limit, visibility)
+        return items
+
+    def cancel(self, item_id: str) -> asyncio.Future[WorkItem | None]:
+        return self._submit(self._cancel, item_id)
+
+    def ack(self, item: WorkItem) -> asyncio.Future[None]:
+        return self._submit(self._execute_many, 'DELETE FROM work_queue WHERE id = ? AND lease = ?', [item], None)
+
+    def release(self, items: Sequence[WorkItem]) -> asyncio.Future[None]:
+        return self._submit(
+            self._execute_many,
+            'UPDATE work_queue SET available_at = ?, lease = NULL WHERE id = ? AND lease = ?',
+            items,
+            0.0,
+        )
+
+    def extend(self, items: Sequence[WorkItem], visibility: float) -> asyncio.Future[None]:
+        return self._submit(
+            self._execute_many, 'UPDATE work_queue SET available_at = ? WHERE id = ? AND lease = ?', items, visibility
+        )
+
+    async def stats(self) -> dict[str, dict[str, int]]:
+        rows: list[tuple[Any, ...]] = await self._submit(self._query, STATS, {'now': time.time()})
+        return {lane: {'ready': ready, 'delayed': delayed, 'leased': leased} for lane, ready, delayed, leased in rows}
+
+    def _submit(self, func: Any, *args: Any) -> asyncio.Future[Any]:
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> None:
+        if self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    def _connection(self) -> sqlite3.Connection:
+        self._connect()
+        assert self._conn is not None
+        return self._conn
+
+    def _query(self, sql: str, params: Mapping[str, Any]) -> list[tuple[Any, ...]]:
+        return self._connection().execute(sql, params).fetchall()
+
+    def _enqueue(self, item: WorkItem, delay: float) -> None:
+        self._connection().execute(UPSERT, (item.id, item.lane, time.time() + max(0.0, delay), item.payload))
+
+    def _cancel(self, item_id: str) -> WorkItem | None:
+        row = self._connection().execute(CANCEL, (item_id,)).fetchone()
+        return WorkItem(item_id, row[0], row[1]) if row is not None else None
+
+    def _claim(self, quotas: dict[str, int], limit: int, visibility: float) -> list[WorkItem]:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            items: list[WorkItem] = []
+            # Сначала квоты полос, затем добор по порядку полос; выданная задача получает available_at
+            # в будущем и во второй проход уже не попадает
+            for lane_limits in (quotas, dict.fromkeys(quotas, limit)):
+                for lane, quota in lane_limits.items():
+                    count = min(quota, limit - len(items))
+                    if count <= 0:
+                        continue
+                    for (notification_id,) in conn.execute(SELECT_READY, (lane, now, count)).fetchall():
+                        lease = uuid.uuid4().hex
+                        deliveries, payload = conn.execute(LEASE, (now + visibility, lease, notification_id)).fetchone()
+                        items.append(WorkItem(notification_id, lane, payload, lease, deliveries))
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+        return items
+
+    def _execute_many(self, sql: str, items: Sequence[WorkItem], visibility: float | None) -> None:
+        if not items:
+            return
+        params: list[tuple[Any, ...]]
+        if visibility is None:
+            params = [(item.id, item.lease) for item in items]
+        else:
+            available_at = time.time() + visibility
+            params = [(available_at, item.id, item.lease) for item in items]
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(sql, params)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
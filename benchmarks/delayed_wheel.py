@@ -0,0 +1,130 @@
+"""
+Память и скорость очереди отложенных уведомлений.
+
+Уведомления со сроками, равномерно распределёнными по горизонту --horizon секунд, ставятся в очередь,
+10% из них отменяются по ID, остальные выдаются продвижением времени до конца горизонта. Строки:
+
+- heap of jobs: куча (срок, DispatchJob) с объектами pydantic, как у RetryScheduler;
+  объекты запроса и состояния живут до срока
+- timer wheel: TimerWheel с JSON запроса и состояния, как у DelayedScheduler; объекты освобождаются
+  после постановки и собираются заново при выдаче
+
+Память в ожидании - объекты, которые держит очередь, плюс её собственные структуры.
+
+Запуск: uv run python -m benchmarks.delayed_wheel --notifications 1000000
+"""
+
+import argparse
+import gc
+import heapq
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from loguru import logger
+
+from app.schemas.enum import NotificationChannel, NotificationStatus
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.services.delayed_scheduler import decode_delayed, encode_delayed
+from app.services.scheduler import DispatchJob
+from app.utils.timer_wheel import TimerWheel
+
+NOW = 1_700_000_000.0
+
+
+def build_job(index: int) -> DispatchJob:
+    request = NotificationRequest(
+        email=f'user{index}@example.com',
+        phone=f'+7900{index:07d}',
+        channels=[NotificationChannel.EMAIL, NotificationChannel.SMS],
+        subject='Напоминание о записи',
+        message=f'Здравствуйте! Напоминаем о записи на завтра, номер {index}.',
+        send_at=datetime.fromtimestamp(NOW, UTC),
+    )
+    response = NotificationResponse(id=str(uuid.uuid4()), status=NotificationStatus.PENDING)
+    return DispatchJob(response=response, request=request)
+
+
+def heap_case(jobs: list[DispatchJob], dues: list[float], cancelled: list[str], horizon: float) -> int:
+    heap = [(due, index, job) for index, (due, job) in enumerate(zip(dues, jobs, strict=True))]
+    heapq.heapify(heap)
+    # Отмена пачкой за один проход: поштучный поиск по куче при таком числе уведомлений слишком долог
+    cancel = set(cancelled)
+    heap = [entry for entry in heap if entry[2].response.id not in cancel]
+    heapq.heapify(heap)
+    released = 0
+    while heap and heap[0][0] <= NOW + horizon:
+        heapq.heappop(heap)
+        released += 1
+    return released
+
+
+def wheel_case(jobs: list[DispatchJob], dues: list[float], cancelled: list[str], horizon: float) -> int:
+    wheel: TimerWheel[bytes] = TimerWheel(0.1, now=NOW)
+    for due, job in zip(dues, jobs, strict=True):
+        wheel.schedule(job.response.id, due, encode_delayed(job))
+    for notification_id in cancelled:
+        wheel.cancel(notification_id)
+    released = 0
+    now = NOW
+    while wheel:
+        now += 1.0
+        for _, payload in wheel.advance(now):
+            decode_delayed(payload)
+            released += 1
+    return released
+
+
+def measure(case: Callable[[], int]) -> tuple[float, int, int]:
+    """Время без трассировки памяти и пик памяти отдельным прогоном (tracemalloc замедляет выделения)"""
+    gc.collect()
+    started = time.perf_counter()
+    released = case()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    tracemalloc.start()
+    case()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, released
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notifications', type=int, default=200_000)
+    parser.add_argument('--horizon', type=float, default=86_400.0, help='Горизонт сроков, с')
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    rng = random.Random(1)  # noqa: S311
+    jobs = [build_job(index) for index in range(args.notifications)]
+    dues = [NOW + rng.uniform(0, args.horizon) for _ in jobs]
+    cancelled = [job.response.id for job in rng.sample(jobs, args.notifications // 10)]
+
+    gc.collect()
+    tracemalloc.start()
+    copies = [build_job(index) for index in range(min(args.notifications, 10_000))]
+    objects_size = tracemalloc.get_traced_memory()[0] / len(copies)
+    tracemalloc.stop()
+    del copies
+
+    print(f'{args.notifications} отложенных уведомлений на {args.horizon:.0f}с, отмена 10%')
+    cases: dict[str, tuple[Callable[[], int], float]] = {
+        'heap of jobs': (lambda: heap_case(jobs, dues, cancelled, args.horizon), objects_size),
+        'timer wheel': (lambda: wheel_case(jobs, dues, cancelled, args.horizon), 0.0),
+    }
+    for name, (case, held) in cases.items():
+        elapsed, peak, released = measure(case)
+        print(
+            f'  {name:<14} {elapsed:7.2f}с  {args.notifications / elapsed:9.0f} уведомлений/с  '
+            f'в ожидании {held + peak / args.notifications:6.0f} байт/уведомление  выдано {released}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Локальная заглушка Telegram Bot API для проверки TelegramService.
+
+Поддерживает sendMessage и отвечает 429 с retry_after при превышении лимитов
+(глобального и на чат), как настоящий Bot API.
+
+Запуск: uv run python -m benchmarks.fake_telegram_api --port 8081
+Затем: TELEGRAM_BACKEND=api TELEGRAM_API_URL=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=test make run-server
+"""
+
+import argparse
+import time
+from collections import defaultdict, deque
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+class SlidingWindow:
+    def __init__(self, limit: int, window: float) -> None:
+        self.limit = limit
+        self.window = window
+        self.hits: deque[float] = deque()
+
+    def hit(self) -> float:
+        """Регистрирует запрос; возвращает retry_after, если лимит превышен"""
+        now = time.monotonic()
+        while self.hits and self.hits[0] <= now - self.window:
+            self.hits.popleft()
+        if len(self.hits) >= self.limit:
+            return self.hits[0] + self.window - now
+        self.hits.append(now)
+        return 0.0
+
+
+def create_app(global_limit: int = 30, chat_limit: int = 1) -> FastAPI:
+    app = FastAPI(title='Fake Telegram Bot API')
+    global_window = SlidingWindow(global_limit, 1.0)
+    chat_windows: defaultdict[str, SlidingWindow] = defaultdict(lambda: SlidingWindow(chat_limit, 1.0))
+    app.state.stats = {'sent': 0, 'rate_limited': 0}
+
+    @app.post('/bot{token}/sendMessage')
+    async def send_message(token: str, payload: dict[str, Any]) -> JSONResponse:
+        chat_id = str(payload.get('chat_id', ''))
+        if not chat_id or not payload.get('text'):
+            return JSONResponse({'ok': False, 'error_code': 400, 'description': 'Bad Request'}, status_code=400)
+
+        retry_after = max(chat_windows[chat_id].hit(), global_window.hit())
+        if retry_after > 0:
+            app.state.stats['rate_limited'] += 1
+            return JSONResponse(
+                {
+                    'ok': False,
+                    'error_code': 429,
+                    'description': f'Too Many Requests: retry after {retry_after:.2f}',
+                    'parameters': {'retry_after': round(retry_after, 2)},
+                },
+                status_code=429,
+            )
+
+        app.state.stats['sent'] += 1
+        return JSONResponse({'ok': True, 'result': {'chat': {'id': chat_id}, 'text': payload['text']}})
+
+    @app.get('/stats')
+    async def stats() -> dict[str, int]:
+        return dict(app.state.stats)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--global-limit', type=int, default=30)
+    parser.add_argument('--chat-limit', type=int, default=1)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.global_limit, args.chat_limit), host='127.0.0.1', port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Латентность страницы истории на индексах в сравнении с полной сортировкой.
+
+Для каждого размера хранилище заполняется синтетическими записями, после чего замеряются:
+первая страница, страница по курсору из середины истории, страница с фильтром по статусу
+и по получателю. Строка full-sort показывает прежнее поведение - сортировку всех записей на каждый запрос.
+
+Запуск: uv run python -m benchmarks.history_pagination --sizes 10000,100000,1000000 --backend memory
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+from app.schemas.enum import NotificationChannel, NotificationPriority, NotificationStatus
+from app.schemas.notification_schemas import NotificationHistory
+from app.storage.base import HistoryFilters, NotificationStore, history_key
+from app.storage.memory import MemoryNotificationStore
+from app.storage.sqlite import SQLiteNotificationStore
+
+STATUSES = [NotificationStatus.SENT] * 8 + [NotificationStatus.FAILED, NotificationStatus.PENDING]
+CHANNELS = [NotificationChannel.EMAIL, NotificationChannel.SMS, NotificationChannel.TELEGRAM]
+
+
+def build_record(index: int, base: datetime, rng: random.Random) -> NotificationHistory:
+    return NotificationHistory.model_construct(
+        id=f'{index:012d}',
+        email=f'user{index % 50_000}@example.com',
+        phone=None,
+        telegram_id=None,
+        subject='Benchmark',
+        message='История уведомлений',
+        channels=CHANNELS[: rng.randint(1, 3)],
+        priority=rng.choice(list(NotificationPriority)),
+        status=rng.choice(STATUSES),
+        successful_channels=[],
+        failed_channels=[],
+        attempts={},
+        created_at=base + timedelta(microseconds=index * 100),
+        sent_at=None,
+        error_details=None,
+        batch_id=None,
+    )
+
+
+async def fill(store: NotificationStore, size: int) -> None:
+    rng = random.Random(42)  # noqa: S311
+    base = datetime.now(UTC) - timedelta(days=1)
+    for index in range(size):
+        await store.save(build_record(index, base, rng))
+    if isinstance(store, SQLiteNotificationStore):
+        await store.flush()
+
+
+async def measure(query: Callable[[], Awaitable[object]], repeat: int) -> float:
+    """Медиана латентности запроса в миллисекундах"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await query()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def run_size(backend: str, size: int, limit: int, repeat: int, workdir: Path) -> None:
+    if backend == 'sqlite':
+        store: NotificationStore = SQLiteNotificationStore(str(workdir / f'history_{size}.db'), batch_size=10_000)
+    else:
+        store = MemoryNotificationStore(max_items=size)
+    await store.start()
+    started = time.perf_counter()
+    await fill(store, size)
+    print(f'\n{backend}, {size} записей (заполнение {time.perf_counter() - started:.1f}с)')
+
+    # Записи создаются с шагом 100 мкс, поэтому ключ ниже указывает на середину истории
+    newest = (await store.history(1))[0]
+    cursor = (newest.created_at.timestamp() - size * 50e-6, newest.id)
+    queries: dict[str, Callable[[], Awaitable[object]]] = {
+        'first page': lambda: store.history(limit),
+        'cursor page': lambda: store.history(limit, before=cursor),
+        'status=failed': lambda: store.history(limit, filters=HistoryFilters(status=NotificationStatus.FAILED)),
+        'recipient': lambda: store.history(limit, filters=HistoryFilters(recipient='user7@example.com')),
+    }
+    if isinstance(store, MemoryNotificationStore):
+        records = store.records
+
+        async def full_sort() -> object:
+            return sorted(records.values(), key=history_key, reverse=True)[:limit]
+
+        queries['full-sort'] = full_sort
+
+    for name, query in queries.items():
+        latency = await measure(query, repeat if name != 'full-sort' else max(1, repeat // 20))
+        print(f'  {name:<14} {latency:10.3f} мс')
+    await store.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='Размеры хранилища через запятую')
+    parser.add_argument('--backend', choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(value) for value in args.sizes.split(',')):
+            await run_size(args.backend, size, args.limit, args.repeat, Path(workdir))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
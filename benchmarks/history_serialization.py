@@ -0,0 +1,139 @@
+"""
+Пропускная способность GET /api/v1/notifications на страницах по --limit уведомлений.
+
+Хранилище заполняется синтетическими записями (90% в итоговых статусах), запросы идут через ASGI без сети.
+Строки:
+
+- response_model: прежний путь - список NotificationResponse, валидация и сериализация FastAPI
+- cached JSON, cold: JSONArrayResponse с пустым кэшем JSON итоговых состояний перед каждым запросом
+- cached JSON, warm: JSONArrayResponse, JSON итоговых состояний берётся из кэша
+
+Запуск: uv run python -m benchmarks.history_serialization --limit 1000 --backend memory
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from loguru import logger
+
+from app.api.v1.notifications_router import router
+from app.schemas.enum import NotificationChannel, NotificationPriority, NotificationStatus
+from app.schemas.notification_schemas import NotificationHistory, NotificationResponse
+from app.services.notification_service import notification_service
+from app.storage.memory import MemoryNotificationStore
+from app.storage.sqlite import SQLiteNotificationStore
+
+STATUSES = [NotificationStatus.SENT] * 8 + [NotificationStatus.FAILED, NotificationStatus.RETRYING]
+CHANNELS = [NotificationChannel.EMAIL, NotificationChannel.SMS, NotificationChannel.TELEGRAM]
+
+
+def build_record(index: int, base: datetime, rng: random.Random) -> NotificationHistory:
+    channels = CHANNELS[: rng.randint(1, 3)]
+    status = rng.choice(STATUSES)
+    created_at = base + timedelta(milliseconds=index)
+    return NotificationHistory(
+        id=f'{index:012d}',
+        email=f'user{index}@example.com',
+        subject='Benchmark',
+        message='История уведомлений',
+        channels=channels,
+        priority=rng.choice(list(NotificationPriority)),
+        status=status,
+        successful_channels=channels[:1] if status == NotificationStatus.SENT else [],
+        failed_channels=channels[1:] if status == NotificationStatus.SENT else channels,
+        attempts={channel.value: rng.randint(1, 3) for channel in channels},
+        created_at=created_at,
+        sent_at=created_at + timedelta(seconds=1) if status == NotificationStatus.SENT else None,
+        error_details={'sms': 'Mock ошибка отправки SMS'} if status != NotificationStatus.SENT else None,
+        next_attempt_at=created_at + timedelta(seconds=5) if status == NotificationStatus.RETRYING else None,
+    )
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(router, prefix='/api/v1')
+
+    @app.get('/legacy/notifications', response_model=list[NotificationResponse])
+    async def legacy_history(limit: int = 50) -> list[NotificationResponse]:
+        records = await notification_service.get_notification_history(limit=limit)
+        return [record.to_response() for record in records]
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, url: str, repeat: int, before: Callable[[], None]) -> tuple[float, int]:
+    """Медиана времени запроса в миллисекундах и размер ответа"""
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        before()
+        started = time.perf_counter()
+        response = await client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        size = len(response.content)
+    return statistics.median(samples), size
+
+
+async def run(backend: str, size: int, limit: int, repeat: int, workdir: Path) -> None:
+    if backend == 'sqlite':
+        notification_service.store = SQLiteNotificationStore(str(workdir / 'history.db'), batch_size=10_000)
+    else:
+        notification_service.store = MemoryNotificationStore(max_items=size)
+    store = notification_service.store
+    await store.start()
+    rng = random.Random(42)  # noqa: S311
+    base = datetime.now(UTC) - timedelta(days=1)
+    for index in range(size):
+        await store.save(build_record(index, base, rng))
+    if isinstance(store, SQLiteNotificationStore):
+        await store.flush()
+
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        legacy = await client.get(f'/legacy/notifications?limit={limit}')
+        current = await client.get(f'/api/v1/notifications?limit={limit}')
+        assert legacy.json() == current.json(), 'ответы прежнего и нового пути различаются'
+
+        cache = notification_service.response_cache
+        cases: dict[str, tuple[str, Callable[[], None]]] = {
+            'response_model': (f'/legacy/notifications?limit={limit}', lambda: None),
+            'cached JSON, cold': (f'/api/v1/notifications?limit={limit}', lambda: cache._items.clear()),
+            'cached JSON, warm': (f'/api/v1/notifications?limit={limit}', lambda: None),
+        }
+        print(f'{backend}: {size} записей, страница {limit}')
+        baseline = None
+        for name, (url, before) in cases.items():
+            median, body = await measure(client, url, repeat, before)
+            baseline = baseline or median
+            print(
+                f'  {name:<18} {median:8.2f} мс/страница  {1000 / median:7.1f} страниц/с  '
+                f'x{baseline / median:4.1f}  {body / 1024:6.0f} КБ'
+            )
+    await store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10_000)
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory')
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+    with tempfile.TemporaryDirectory() as workdir:
+        asyncio.run(run(args.backend, args.size, args.limit, args.repeat, Path(workdir)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+"""
+Нагрузочный замер сервиса с воспроизводимыми mock-провайдерами.
+
+Приложение запускается в процессе замера (--target asgi, httpx.ASGITransport, без сети) или отдельным
+процессом uvicorn (--target uvicorn). Mock-провайдеры настраиваются через MOCK_* (seed, распределение
+задержки, доля и типы ошибок), поэтому два прогона с одним --seed дают одинаковую нагрузку на сервис.
+Сценарии:
+
+- single: POST /api/v1/notifications от --concurrency одновременных клиентов
+- batch: POST /api/v1/notifications/batch пакетами по --batch-size
+- history: GET /api/v1/notifications постранично по курсору
+
+Для каждого сценария выводятся пропускная способность, p50/p95/p99 латентности запроса, для отправки -
+p50/p95/p99 сквозной латентности (created_at -> sent_at, до итогового статуса) и прирост RSS процесса сервиса
+(при --target asgi в него входит и клиент). Результаты пишутся в JSON (--output); с --baseline
+сравниваются с прошлым прогоном, и при ухудшении больше чем на --tolerance скрипт завершается с кодом 1.
+
+Запуск: uv run python -m benchmarks.load_test --target asgi --requests 2000 --seed 42 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+API = '/api/v1/notifications'
+UNFINISHED = {'pending', 'retrying'}
+# Метрика -> True, если больше - лучше; используются для сравнения с --baseline
+COMPARED = {
+    'requests_per_second': True,
+    'notifications_per_second': True,
+    'latency_ms.p95': False,
+    'latency_ms.p99': False,
+    'end_to_end_ms.p95': False,
+    'end_to_end_ms.p99': False,
+}
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    if len(samples) == 1:
+        return dict.fromkeys(('p50', 'p95', 'p99'), round(samples[0], 3))
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50': round(cuts[49], 3), 'p95': round(cuts[94], 3), 'p99': round(cuts[98], 3)}
+
+
+def rss_bytes(pid: int) -> int | None:
+    """Текущий RSS процесса; None, если /proc недоступен"""
+    try:
+        pages = int(Path(f'/proc/{pid}/statm').read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def service_env(args: argparse.Namespace) -> dict[str, str]:
+    return {
+        'LOG_LEVEL': 'WARNING',
+        'DISPATCH_MODE': 'queue',
+        'STORAGE_BACKEND': args.storage,
+        'STORAGE_SQLITE_PATH': args.sqlite_path,
+        'MOCK_SEED': str(args.seed),
+        'MOCK_LATENCY': args.latency,
+        'MOCK_LATENCY_MIN_MS': str(args.latency_min_ms),
+        'MOCK_LATENCY_MAX_MS': str(args.latency_max_ms),
+        'MOCK_FAILURE_RATE': str(args.failure_rate),
+        'MOCK_ERROR_TYPES': args.error_types,
+    }
+
+
+def build_notification(index: int, channels: list[str]) -> dict[str, Any]:
+    return {
+        'email': f'user{index}@example.com',
+        'phone': f'+7900{index % 10_000_000:07d}',
+        'telegram_id': str(100_000 + index),
+        'subject': 'Load test',
+        'message': f'Уведомление {index}',
+        'channels': channels,
+    }
+
+
+@asynccontextmanager
+async def asgi_target() -> AsyncIterator[tuple[httpx.AsyncClient, int]]:
+    # Настройки читаются при импорте приложения, поэтому импорт - после подготовки окружения
+    from app.main import app, lifespan
+
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://load-test', timeout=60) as client:
+            yield client, os.getpid()
+
+
+@asynccontextmanager
+async def uvicorn_target(env: dict[str, str]) -> AsyncIterator[tuple[httpx.AsyncClient, int]]:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(  # noqa: S603
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(port), '--log-level', 'warning'],
+        env={**os.environ, **env},
+    )
+    limits = httpx.Limits(max_connections=1000, max_keepalive_connections=1000)
+    try:
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=60, limits=limits) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get('/health')).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError('uvicorn не запустился')
+                await asyncio.sleep(0.2)
+            yield client, process.pid
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def run_clients(
+    total: int, concurrency: int, request: Callable[[int], Awaitable[None]]
+) -> tuple[float, list[float]]:
+    """Выполняет total запросов из concurrency клиентов; возвращает длительность и латентности в мс"""
+    latencies: list[float] = []
+    counter = iter(range(total))
+
+    async def client() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            await request(index)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+
+async def wait_final(client: httpx.AsyncClient, ids: set[str], timeout: float) -> dict[str, dict[str, Any]]:
+    """Ждёт итоговых статусов отправленных уведомлений, читая историю постранично"""
+    deadline = time.monotonic() + timeout
+    while True:
+        found: dict[str, dict[str, Any]] = {}
+        cursor: str | None = None
+        while True:
+            params: dict[str, str | int] = {'limit': 1000, **({'before': cursor} if cursor else {})}
+            response = await client.get(API, params=params)
+            response.raise_for_status()
+            found.update((item['id'], item) for item in response.json() if item['id'] in ids)
+            cursor = response.headers.get('X-Next-Cursor')
+            if cursor is None:
+                break
+        done = sum(1 for item in found.values() if item['status'] not in UNFINISHED)
+        if done == len(ids) or time.monotonic() > deadline:
+            return found
+        await asyncio.sleep(0.5)
+
+
+def delivery_summary(found: dict[str, dict[str, Any]], total: int) -> dict[str, Any]:
+    end_to_end = [
+        (datetime.fromisoformat(item['sent_at']) - datetime.fromisoformat(item['created_at'])).total_seconds() * 1000
+        for item in found.values()
+        if item['status'] == 'sent' and item['sent_at']
+    ]
+    statuses = Counter(item['status'] for item in found.values())
+    statuses['missing'] = total - len(found)
+    return {'statuses': dict(+statuses), 'end_to_end_ms': percentiles(end_to_end)}
+
+
+async def scenario_single(client: httpx.AsyncClient, args: argparse.Namespace) -> dict[str, Any]:
+    ids: set[str] = set()
+    codes: Counter[int] = Counter()
+    channels = args.channels.split(',')
+
+    async def send(index: int) -> None:
+        response = await client.post(API, json=build_notification(index, channels))
+        codes[response.status_code] += 1
+        if response.status_code < 300:
+            ids.add(response.json()['id'])
+
+    elapsed, latencies = await run_clients(args.requests, args.concurrency, send)
+    found = await wait_final(client, ids, args.drain_timeout)
+    return {
+        'requests': args.requests,
+        'status_codes': {str(code): count for code, count in sorted(codes.items())},
+        'requests_per_second': round(args.requests / elapsed, 1),
+        'notifications_per_second': round(len(ids) / elapsed, 1),
+        'latency_ms': percentiles(latencies),
+        **delivery_summary(found, len(ids)),
+    }
+
+
+async def scenario_batch(client: httpx.AsyncClient, args: argparse.Namespace) -> dict[str, Any]:
+    ids: set[str] = set()
+    codes: Counter[int] = Counter()
+    channels = args.channels.split(',')
+    batches = max(1, args.requests // args.batch_size)
+    offset = args.requests
+
+    async def send(index: int) -> None:
+        first = offset + index * args.batch_size
+        body = [build_notification(first + i, channels) for i in range(args.batch_size)]
+        response = await client.post(f'{API}/batch', json=body)
+        codes[response.status_code] += 1
+        if response.status_code < 300:
+            ids.update(item['id'] for item in response.json()['items'] if item['id'])
+
+    elapsed, latencies = await run_clients(batches, max(1, min(args.concurrency, batches)), send)
+    found = await wait_final(client, ids, args.drain_timeout)
+    return {
+        'requests': batches,
+        'batch_size': args.batch_size,
+        'status_codes': {str(code): count for code, count in sorted(codes.items())},
+        'requests_per_second': round(batches / elapsed, 1),
+        'notifications_per_second': round(len(ids) / elapsed, 1),
+        'latency_ms': percentiles(latencies),
+        **delivery_summary(found, len(ids)),
+    }
+
+
+async def scenario_history(client: httpx.AsyncClient, args: argparse.Namespace) -> dict[str, Any]:
+    cursors: list[str | None] = [None] * args.concurrency
+
+    async def page(index: int) -> None:
+        slot = index % args.concurrency
+        params = {'limit': args.page_size, **({'before': cursors[slot]} if cursors[slot] else {})}
+        response = await client.get(API, params=params)
+        response.raise_for_status()
+        # Дойдя до конца истории, клиент начинает с первой страницы
+        cursors[slot] = response.headers.get('X-Next-Cursor')
+
+    elapsed, latencies = await run_clients(args.requests, args.concurrency, page)
+    return {
+        'requests': args.requests,
+        'page_size': args.page_size,
+        'requests_per_second': round(args.requests / elapsed, 1),
+        'latency_ms': percentiles(latencies),
+    }
+
+
+SCENARIOS: dict[str, Callable[[httpx.AsyncClient, argparse.Namespace], Awaitable[dict[str, Any]]]] = {
+    'single': scenario_single,
+    'batch': scenario_batch,
+    'history': scenario_history,
+}
+
+
+def metric(result: dict[str, Any], path: str) -> float | None:
+    value: Any = result
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value)
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Метрики, ухудшившиеся относительно baseline больше чем на tolerance"""
+    regressions = []
+    for name, result in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        for path, higher_is_better in COMPARED.items():
+            current, before = metric(result, path), metric(previous, path)
+            if current is None or not before:
+                continue
+            change = (current - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f'{name} {path}: {before:g} -> {current:g} ({change:+.1%})')
+    return regressions
+
+
+def print_results(results: dict[str, Any]) -> None:
+    print(
+        f'\n{"сценарий":<10} {"req/s":>10} {"notif/s":>10} {"p50 мс":>9} {"p95 мс":>9} {"p99 мс":>9} '
+        f'{"e2e p95 мс":>11} {"RSS +МБ":>8}'
+    )
+    for name, result in results['scenarios'].items():
+        latency = result['latency_ms']
+        end_to_end = result.get('end_to_end_ms', {}).get('p95')
+        rss = result.get('rss_growth_bytes')
+        print(
+            f'{name:<10} {result["requests_per_second"]:>10.1f} {result.get("notifications_per_second", 0):>10.1f} '
+            f'{latency["p50"]:>9.2f} {latency["p95"]:>9.2f} {latency["p99"]:>9.2f} '
+            f'{f"{end_to_end:.1f}" if end_to_end is not None else "-":>11} '
+            f'{f"{rss / 2**20:.1f}" if rss is not None else "-":>8}'
+        )
+        if 'statuses' in result:
+            print(f'{"":<10} статусы: {result["statuses"]}, коды ответов: {result["status_codes"]}')
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=('asgi', 'uvicorn'), default='asgi')
+    parser.add_argument('--scenarios', default='single,batch,history', help='Сценарии через запятую')
+    parser.add_argument('--requests', type=int, default=2000, help='Запросов на сценарий (для batch - уведомлений)')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--channels', default='email,sms')
+    parser.add_argument('--storage', choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument('--sqlite-path', default='data/load_test.db')
+    parser.add_argument('--drain-timeout', type=float, default=120.0, help='Ожидание итоговых статусов, с')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', choices=('constant', 'uniform', 'lognormal'), default='uniform')
+    parser.add_argument('--latency-min-ms', type=float, default=10.0)
+    parser.add_argument('--latency-max-ms', type=float, default=50.0)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    parser.add_argument('--error-types', default='reject', help='reject, timeout, unavailable через запятую')
+    parser.add_argument('--output', type=Path, help='Файл для результатов в JSON')
+    parser.add_argument('--baseline', type=Path, help='Результаты прошлого прогона для сравнения')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Допустимое ухудшение метрик (доля)')
+    args = parser.parse_args()
+
+    env = service_env(args)
+    if args.storage == 'sqlite':
+        Path(args.sqlite_path).unlink(missing_ok=True)
+    if args.target == 'asgi':
+        os.environ.update(env)
+        target = asgi_target()
+    else:
+        target = uvicorn_target(env)
+
+    results: dict[str, Any] = {
+        'meta': {
+            'started_at': datetime.now(UTC).isoformat(),
+            'target': args.target,
+            'python': platform.python_version(),
+            'options': {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        },
+        'scenarios': {},
+    }
+    async with target as (client, pid):
+        for name in args.scenarios.split(','):
+            rss_before = rss_bytes(pid)
+            result = await SCENARIOS[name](client, args)
+            rss_after = rss_bytes(pid)
+            result['rss_growth_bytes'] = rss_after - rss_before if rss_before and rss_after else None
+            results['scenarios'][name] = result
+            print(f'{name}: готово')
+
+    print_results(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+        print()
+        print(f'Результаты записаны в {args.output}')
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f'Ухудшение: {line}')
+        if regressions:
+            return 1
+        print(f'Ухудшений относительно {args.baseline} больше {args.tolerance:.0%} нет')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,99 @@
+"""
+Стоимость логирования на одно уведомление.
+
+Имитирует записи, которые пишет путь отправки одного уведомления (приём запроса, регистрация,
+начало отправки, отправка через канал, результат провайдера, итог), в двух вариантах:
+
+- f-string: прежний стиль - сообщения форматируются f-строкой до вызова логгера
+- lazy: шаблон с аргументами через hot_logger, контекст через bind
+
+Каждый вариант прогоняется в нескольких конфигурациях sink (консоль и файл во временной
+директории, stdout перенаправлен в /dev/null). caller - время в вызывающем коде,
+total - вместе с дозаписью очереди enqueue.
+
+Запуск: uv run python -m benchmarks.logging_overhead --count 20000
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from loguru import logger
+
+from app.core.logger_config import hot_logger, setup_logger
+
+EMAIL = 'user@example.com'
+MESSAGE = 'Текст уведомления, который уходит во все каналы. ' * 4
+
+
+def fstring_notification(notification_id: str) -> None:
+    logger.info(f'Получен запрос на отправку уведомления: {EMAIL}')
+    logger.info(f'Уведомление {notification_id} зарегистрировано (priority: normal)')
+    logger.info(f'Начинаем отправку уведомления {notification_id}')
+    logger.info(f'Получатель: {EMAIL}')
+    logger.info(f'Каналы: {["email", "sms"]}')
+    logger.info(f'Отправка email to={EMAIL} subject=Тема')
+    logger.debug(f'Сообщение: {MESSAGE[:100]}...')
+    logger.info(f'Email успешно отправлен to={EMAIL}')
+    logger.info(f'Уведомление {notification_id} успешно отправлено')
+
+
+def lazy_notification(notification_id: str) -> None:
+    hot_logger.info('Получен запрос на отправку уведомления: {}', EMAIL)
+    log = hot_logger.bind(notification_id=notification_id)
+    log.info('Уведомление {} зарегистрировано (priority: {})', notification_id, 'normal')
+    log.info('Начинаем отправку уведомления {}', notification_id)
+    log.opt(lazy=True).debug('Получатель: {}, каналы: {}', lambda: EMAIL, lambda: ['email', 'sms'])
+    hot_logger.info('Отправка email to={} subject={}', EMAIL, 'Тема')
+    hot_logger.debug('Сообщение: {}...', MESSAGE[:100])
+    hot_logger.info('Email успешно отправлен to={}', EMAIL)
+    log.info('Уведомление {} успешно отправлено', notification_id)
+
+
+CONFIGS: dict[str, dict[str, Any]] = {
+    'text+enqueue (по умолчанию)': {'log_format': 'text', 'enqueue': True},
+    'text': {'log_format': 'text', 'enqueue': False},
+    'json': {'log_format': 'json', 'enqueue': False},
+    'json+sample 0.1': {'log_format': 'json', 'enqueue': False, 'sample_rates': {'INFO': 0.1}},
+    'json+enqueue+sample 0.1': {'log_format': 'json', 'enqueue': True, 'sample_rates': {'INFO': 0.1}},
+}
+STYLES: dict[str, Callable[[str], None]] = {'f-string': fstring_notification, 'lazy': lazy_notification}
+
+
+def run(config: dict[str, Any], emit: Callable[[str], None], count: int, workdir: str) -> tuple[float, float]:
+    """Микросекунды на уведомление: в вызывающем коде и с учётом дозаписи очереди"""
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        setup_logger(log_dir=workdir, log_file=f'bench_{uuid.uuid4().hex}.log', log_level='INFO', **config)
+        started = time.perf_counter()
+        for notification_id in ids:
+            emit(notification_id)
+        caller = time.perf_counter() - started
+        logger.complete()
+        total = time.perf_counter() - started
+        logger.remove()
+    return caller / count * 1e6, total / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=20_000, help='Число имитируемых уведомлений')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f'{"конфигурация":<26}{"стиль":<10}{"caller, мкс":>13}{"total, мкс":>13}')
+        for name, config in CONFIGS.items():
+            for style, emit in STYLES.items():
+                caller, total = run(config, emit, args.count, workdir)
+                print(f'{name:<26}{style:<10}{caller:>13.1f}{total:>13.1f}')
+    logger.add(sys.stderr, level='WARNING')
+
+
+if __name__ == '__main__':
+    main()
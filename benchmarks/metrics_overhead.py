@@ -0,0 +1,97 @@
+"""
+Накладные расходы метрик на горячем пути.
+
+Замеряется стоимость отдельных операций (inc, labels().inc, observe) и полного набора
+записей, который делает одно уведомление, и сравнивается с временем deliver()
+при мгновенно отвечающих провайдерах.
+
+Запуск: uv run python -m benchmarks.metrics_overhead --number 200000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import timeit
+from collections.abc import Callable
+
+from loguru import logger
+
+from app.core.metrics import Counter, Gauge, Histogram
+from app.schemas.notification_schemas import NotificationRequest
+from app.services.notification_service import NotificationService
+from app.storage.memory import MemoryNotificationStore
+
+counter = Counter('bench_total', 'bench')
+labelled = Counter('bench_labelled_total', 'bench', ['channel', 'priority', 'result'])
+gauge = Gauge('bench_in_flight', 'bench')
+histogram = Histogram('bench_seconds', 'bench', ['channel'])
+depth = Histogram('bench_depth', 'bench', ['status'], buckets=(1, 2, 3))
+delivered = Counter('bench_delivered_total', 'bench', ['status', 'priority'])
+
+
+def noop() -> None:
+    pass
+
+
+def instrumented_notification() -> None:
+    """Те же записи, что делает одно уведомление, доставленное с первой попытки"""
+    gauge.inc()
+    started = time.perf_counter()
+    histogram.labels('email').observe(time.perf_counter() - started)
+    labelled.labels('email', 'normal', 'success').inc()
+    histogram.labels('normal').observe(0.001)
+    gauge.dec()
+    depth.labels('sent').observe(1)
+    delivered.labels('sent', 'normal').inc()
+
+
+async def deliver_cost(notifications: int) -> float:
+    """Среднее время deliver() в микросекундах при мгновенных провайдерах"""
+    service = NotificationService(store=MemoryNotificationStore(max_items=notifications))
+
+    async def instant(to_email: str, subject: str, message: str, html: str | None = None) -> bool:
+        return True
+
+    service.email_service.send_email = instant  # type: ignore[method-assign]
+    request = NotificationRequest(
+        email='user@example.com',
+        phone='+79990000000',
+        telegram_id='1',
+        subject='Benchmark',
+        message='Метрики',
+    )
+    responses = [await service.create_notification(request) for _ in range(notifications)]
+    started = time.perf_counter()
+    for response in responses:
+        await service.deliver(response, request)
+    return (time.perf_counter() - started) / notifications * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=200_000)
+    parser.add_argument('--notifications', type=int, default=20_000)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    cases: dict[str, Callable[[], object]] = {
+        'noop call': noop,
+        'counter.inc': counter.inc,
+        'labels().inc': lambda: labelled.labels('email', 'normal', 'success').inc(),
+        'histogram.observe': lambda: histogram.labels('email').observe(0.042),
+        'per notification': instrumented_notification,
+    }
+    results = {}
+    for name, func in cases.items():
+        results[name] = min(timeit.repeat(func, number=args.number, repeat=5)) / args.number * 1e9
+        print(f'{name:<18} {results[name]:8.1f} нс/оп')
+
+    per_deliver = asyncio.run(deliver_cost(args.notifications))
+    overhead = results['per notification'] / 1000
+    print(f'\ndeliver() без сети: {per_deliver:.1f} мкс; метрики: {overhead:.2f} мкс ({overhead / per_deliver:.1%})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Пропускная способность приёма уведомлений в outbox с fsync.
+
+Каждый производитель в цикле записывает принятое уведомление (запрос и состояние в JSON, как
+NotificationOutbox.accept) и ждёт подтверждения fsync. Строки:
+
+- producers=1: каждое уведомление фиксируется своим fsync (как без групповой фиксации)
+- producers=N: N одновременных запросов, записи, накопленные за время fsync, фиксируются одним fsync
+
+Для каждого варианта выводятся уведомления в секунду, число групповых фиксаций и записей в группе.
+Директория по умолчанию - временная в текущей директории (tmpfs в /tmp не делает настоящий fsync).
+
+Запуск: uv run python -m benchmarks.outbox_group_commit --count 20000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import uuid
+
+from loguru import logger
+
+from app.schemas.enum import NotificationStatus
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.services.outbox import accept_payload
+from app.utils.wal import WriteAheadLog
+
+REQUEST = NotificationRequest(
+    email='user@example.com',
+    phone='+79001234567',
+    telegram_id='123456789',
+    subject='Заказ готов к выдаче',
+    message='Здравствуйте! Ваш заказ ждёт вас в пункте выдачи до конца недели.',
+)
+
+
+def build_payloads(count: int) -> list[bytes]:
+    request_json = REQUEST.model_dump_json().encode()
+    return [
+        accept_payload(
+            request_json,
+            NotificationResponse(id=str(uuid.uuid4()), status=NotificationStatus.PENDING).model_dump_json().encode(),
+        )
+        for _ in range(count)
+    ]
+
+
+async def run(directory: str, payloads: list[bytes], producers: int, fsync: bool) -> tuple[float, int]:
+    wal = WriteAheadLog(directory, fsync=fsync)
+    await wal.open()
+
+    async def produce(chunk: list[bytes]) -> None:
+        for payload in chunk:
+            await wal.append(payload)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(produce(payloads[i::producers]) for i in range(producers)))
+    elapsed = time.perf_counter() - started
+    await wal.close()
+    return elapsed, wal.commits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=20_000)
+    parser.add_argument('--dir', default='.', help='где создать временную директорию журнала')
+    parser.add_argument('--producers', type=int, nargs='+', default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    payloads = build_payloads(args.count)
+    print(f'{args.count} уведомлений, {len(payloads[0])} байт на запись')
+    for fsync in (True, False):
+        for producers in args.producers:
+            # Без групповой фиксации каждая запись ждёт свой fsync: ограничиваем объём, чтобы не ждать минутами
+            count = min(len(payloads), 2000) if producers == 1 and fsync else len(payloads)
+            with tempfile.TemporaryDirectory(dir=args.dir, prefix='outbox-bench-') as directory:
+                elapsed, commits = asyncio.run(run(directory, payloads[:count], producers, fsync))
+            print(
+                f'  fsync={fsync!s:<5} producers={producers:<5} {count / elapsed:10.0f} уведомлений/с  '
+                f'{commits:6d} групп  {count / max(commits, 1):7.1f} записей на группу'
+            )
+
+
+if __name__ == '__main__':
+    main()
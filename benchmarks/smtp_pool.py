@@ -0,0 +1,108 @@
+"""
+Сравнение пула SMTP-соединений с подключением на каждое письмо.
+
+В качестве SMTP-сервера поднимается локальный aiosmtpd; --handshake-delay-ms
+имитирует сетевую задержку рукопожатия (EHLO) реального провайдера.
+
+Запуск: uv run python -m benchmarks.smtp_pool --messages 500 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from email.message import EmailMessage
+from typing import Any
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+from loguru import logger
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+HOST = '127.0.0.1'
+
+
+class DelayedSink:
+    def __init__(self, handshake_delay: float) -> None:
+        self.handshake_delay = handshake_delay
+        self.received = 0
+
+    async def handle_EHLO(  # noqa: N802
+        self, _server: Any, session: Any, _envelope: Any, hostname: str, responses: list[str]
+    ) -> list[str]:
+        await asyncio.sleep(self.handshake_delay)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, _server: Any, _session: Any, _envelope: Any) -> str:  # noqa: N802
+        self.received += 1
+        return '250 OK'
+
+
+def build_message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message['From'] = 'bench@example.com'
+    message['To'] = f'user{index}@example.com'
+    message['Subject'] = 'Benchmark'
+    message.set_content('Тестовое письмо для замера пропускной способности')
+    return message
+
+
+async def run_per_message(port: int, messages: int, concurrency: int) -> tuple[float, int]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(index: int) -> None:
+        async with semaphore:
+            smtp = aiosmtplib.SMTP(hostname=HOST, port=port, start_tls=False)
+            await smtp.connect()
+            await smtp.send_message(build_message(index))
+            await smtp.quit()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(messages)))
+    return time.perf_counter() - started, messages
+
+
+async def run_pooled(port: int, messages: int, concurrency: int) -> tuple[float, int]:
+    pool = SMTPConnectionPool(hostname=HOST, port=port, max_size=concurrency, max_messages=10_000)
+
+    async def send(index: int) -> None:
+        async with pool.connection() as conn:
+            await conn.smtp.send_message(build_message(index))
+            conn.messages_sent += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(messages)))
+    elapsed = time.perf_counter() - started
+    await pool.close()
+    return elapsed, pool.connections_created
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--handshake-delay-ms', type=float, default=5.0)
+    parser.add_argument('--port', type=int, default=8025)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    handler = DelayedSink(args.handshake_delay_ms / 1000)
+    controller = Controller(handler, hostname=HOST, port=args.port)
+    controller.start()
+    try:
+        for name, runner in (('per-message', run_per_message), ('pooled', run_pooled)):
+            elapsed, connections = await runner(args.port, args.messages, args.concurrency)
+            print(
+                f'{name:<12} {args.messages} писем за {elapsed:.3f}с '
+                f'({args.messages / elapsed:.0f} msg/s), соединений: {connections}'
+            )
+    finally:
+        controller.stop()
+    print(f'Сервер принял писем: {handler.received}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
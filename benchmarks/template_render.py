@@ -0,0 +1,121 @@
+"""
+Пропускная способность рендера шаблонов на пакете получателей.
+
+Для каждого получателя рендерятся тема и текст (как при приёме уведомления) и варианты для каналов
+(HTML письма, SMS с обрезкой по сегментам, Telegram MarkdownV2 с экранированием). Строки:
+
+- re.sub: разбор шаблона регулярным выражением на каждый рендер
+- compile per render: разбор в строку формата на каждый рендер, без кэша
+- cached: скомпилированный шаблон из LRU-кэша (как в TemplateService)
+
+Запуск: uv run python -m benchmarks.template_render --recipients 100000
+"""
+
+import argparse
+import html
+import sys
+import time
+from collections.abc import Callable, Mapping
+
+from loguru import logger
+
+from app.schemas.enum import NotificationChannel
+from app.schemas.notification_schemas import NotificationRequest
+from app.schemas.template_schemas import TemplateCreate
+from app.services.template_service import (
+    PLACEHOLDER,
+    CompiledTemplate,
+    compile_template,
+    escape_markdown_v2,
+    template_service,
+)
+from app.utils.sms import truncate_sms
+
+TEMPLATE = TemplateCreate(
+    subject='Заказ {{ order }} готов к выдаче',
+    text='Здравствуйте, {{ name }}! Ваш заказ {{ order }} на сумму {{ amount }} ждёт вас в пункте {{ point }}.',
+    html='<p>Здравствуйте, <b>{{ name }}</b>!</p><p>Заказ {{ order }} на {{ amount }} ждёт вас в {{ point }}.</p>',
+    sms='{{ name }}, заказ {{ order }} готов: {{ point }}',
+    telegram='*{{ name }}*, заказ `{{ order }}` на {{ amount }} ждёт вас в _{{ point }}_',
+)
+CHANNELS = (NotificationChannel.EMAIL, NotificationChannel.SMS, NotificationChannel.TELEGRAM)
+
+
+def build_variables(count: int) -> list[dict[str, str]]:
+    return [
+        {'name': f'Клиент {i}', 'order': f'A-{i:07d}', 'amount': f'{i % 9000 + 100}.00 ₽', 'point': f'ПВЗ №{i % 500}'}
+        for i in range(count)
+    ]
+
+
+def regex_render(source: str, variables: Mapping[str, str], escape: Callable[[str], str] | None = None) -> str:
+    return PLACEHOLDER.sub(lambda m: escape(variables[m[1]]) if escape else variables[m[1]], source)
+
+
+def uncached_render(source: str, variables: Mapping[str, str], escape: Callable[[str], str] | None = None) -> str:
+    return CompiledTemplate(source).render(variables, escape)
+
+
+def cached_render(source: str, variables: Mapping[str, str], escape: Callable[[str], str] | None = None) -> str:
+    return compile_template(source).render(variables, escape)
+
+
+def render_all(render: Callable[..., str], batch: list[dict[str, str]]) -> None:
+    html_source, sms_source, telegram_source = TEMPLATE.html or '', TEMPLATE.sms or '', TEMPLATE.telegram or ''
+    for variables in batch:
+        render(TEMPLATE.subject, variables)
+        render(TEMPLATE.text, variables)
+        render(html_source, variables, html.escape)
+        truncate_sms(render(sms_source, variables), 3)
+        render(telegram_source, variables, escape_markdown_v2)
+
+
+def build_requests(template_id: str, batch: list[dict[str, str]]) -> list[NotificationRequest]:
+    return [
+        NotificationRequest.model_construct(
+            email='user@example.com',
+            phone='+79990000000',
+            telegram_id='1',
+            channels=list(CHANNELS),
+            subject='',
+            message='',
+            template_id=template_id,
+            variables=variables,
+        )
+        for variables in batch
+    ]
+
+
+def service_pipeline(requests: list[NotificationRequest]) -> None:
+    """Полный путь TemplateService: apply при приёме и render для каждого канала"""
+    for request in requests:
+        template_service.apply(request)
+        for channel in CHANNELS:
+            template_service.render(request, channel)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=100_000)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    batch = build_variables(args.recipients)
+    requests = build_requests(template_service.register(TEMPLATE).id, batch)
+    cases: dict[str, Callable[[], None]] = {
+        're.sub': lambda: render_all(regex_render, batch),
+        'compile per render': lambda: render_all(uncached_render, batch),
+        'cached': lambda: render_all(cached_render, batch),
+        'TemplateService': lambda: service_pipeline(requests),
+    }
+    print(f'{args.recipients} получателей, 5 рендеров на получателя')
+    for name, case in cases.items():
+        started = time.perf_counter()
+        case()
+        elapsed = time.perf_counter() - started
+        print(f'  {name:<20} {elapsed:7.2f}с  {args.recipients / elapsed:10.0f} получателей/с')
+
+
+if __name__ == '__main__':
+    main()
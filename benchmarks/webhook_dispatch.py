@@ -0,0 +1,80 @@
+"""
+Скорость отправки итоговых статусов на webhooks.
+
+Итоговые статусы --notifications уведомлений клиента с одной подпиской проходят через WebhookDispatcher
+на заглушку получателя (benchmarks.webhook_receiver). Строки - размер пакета: 1 статус на запрос
+против пакетов до --batch-size статусов через тот же пул keep-alive соединений.
+
+Запуск: uv run python -m benchmarks.webhook_receiver --port 8082
+Затем: uv run python -m benchmarks.webhook_dispatch --url http://127.0.0.1:8082/webhook
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+from loguru import logger
+
+from app.core.metrics import WEBHOOK_DELIVERIES_TOTAL
+from app.schemas.enum import NotificationChannel, NotificationStatus
+from app.schemas.notification_schemas import NotificationRequest, NotificationResponse
+from app.schemas.webhook_schemas import WebhookCreate
+from app.services.webhook_dispatcher import WebhookDispatcher
+from app.services.webhook_service import WebhookService
+from app.webhooks.memory import MemoryWebhookStore
+
+TENANT = 'benchmark'
+
+
+async def received(url: str) -> int:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url.rsplit('/', 1)[0] + '/stats')
+        return int(response.json()['notifications'])
+
+
+async def run_case(url: str, secret: str, notifications: int, batch_size: int) -> tuple[float, int, int]:
+    service = WebhookService(MemoryWebhookStore())
+    await service.register(TENANT, WebhookCreate(url=url, secret=secret))
+    dispatcher = WebhookDispatcher(service, batch_size=batch_size, queue_size=notifications, shutdown_timeout=600)
+    request = NotificationRequest(
+        email='user@example.com', channels=[NotificationChannel.EMAIL], subject='s', message='m', tenant=TENANT
+    )
+    responses = [
+        NotificationResponse(id=str(index), status=NotificationStatus.SENT, successful_channels=request.channels)
+        for index in range(notifications)
+    ]
+    before, requests_before = await received(url), WEBHOOK_DELIVERIES_TOTAL.labels('success').value
+    await dispatcher.start()
+    started = time.perf_counter()
+    for response in responses:
+        dispatcher.notify(response, request)
+    # stop дожидается отправки всех принятых статусов
+    await dispatcher.stop()
+    elapsed = time.perf_counter() - started
+    requests = int(WEBHOOK_DELIVERIES_TOTAL.labels('success').value - requests_before)
+    return elapsed, requests, await received(url) - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8082/webhook')
+    parser.add_argument('--secret', default='test-webhook-secret')
+    parser.add_argument('--notifications', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    print(f'{args.notifications} итоговых статусов на {args.url}')
+    for batch_size in (1, args.batch_size):
+        elapsed, requests, delivered = asyncio.run(run_case(args.url, args.secret, args.notifications, batch_size))
+        print(
+            f'  пакет до {batch_size:>4}  {elapsed:7.2f}с  {args.notifications / elapsed:8.0f} статусов/с  '
+            f'запросов {requests:6d}  получено {delivered}'
+        )
+
+
+if __name__ == '__main__':
+    main()
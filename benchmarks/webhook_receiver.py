@@ -0,0 +1,68 @@
+"""
+Локальная заглушка получателя webhooks для проверки отправки итоговых статусов.
+
+Проверяет подпись X-Webhook-Signature (ответ 401 при несовпадении), учитывает повторы по X-Webhook-Id
+и с вероятностью --failure-rate отвечает 503, чтобы проверить повторные отправки.
+
+Запуск: uv run python -m benchmarks.webhook_receiver --port 8082 --secret test-webhook-secret
+Затем: POST /api/v1/webhooks с X-API-Key и {"url": "http://127.0.0.1:8082/webhook", "secret": "test-webhook-secret"}
+"""
+
+import argparse
+import hmac
+import json
+import random
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from app.services.webhook_dispatcher import sign
+
+
+def create_app(secret: str, failure_rate: float = 0.0, seed: int | None = None) -> FastAPI:
+    app = FastAPI(title='Fake webhook receiver')
+    rng = random.Random(seed)  # noqa: S311
+    deliveries: set[str] = set()
+    app.state.stats = {'requests': 0, 'notifications': 0, 'duplicates': 0, 'bad_signature': 0, 'failed': 0}
+
+    @app.post('/webhook')
+    async def receive(request: Request) -> Response:
+        stats = app.state.stats
+        stats['requests'] += 1
+        body = await request.body()
+        expected = sign(secret, request.headers.get('X-Webhook-Timestamp', ''), body)
+        if not hmac.compare_digest(expected, request.headers.get('X-Webhook-Signature', '')):
+            stats['bad_signature'] += 1
+            return Response(status_code=401)
+        if rng.random() < failure_rate:
+            stats['failed'] += 1
+            return Response(status_code=503)
+
+        delivery_id = request.headers.get('X-Webhook-Id', '')
+        if delivery_id in deliveries:
+            stats['duplicates'] += 1
+        else:
+            deliveries.add(delivery_id)
+            stats['notifications'] += len(json.loads(body)['notifications'])
+        return Response(status_code=204)
+
+    @app.get('/stats')
+    async def get_stats() -> dict[str, int]:
+        return dict(app.state.stats)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8082)
+    parser.add_argument('--secret', default='test-webhook-secret')
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    app = create_app(args.secret, args.failure_rate, args.seed)
+    uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()